@@ -3,18 +3,22 @@ import sqlite3
 from werkzeug.security import generate_password_hash, check_password_hash
 from pathlib import Path
 from datetime import datetime, timedelta
+import json
 import os
+import sys
+import time
 from functools import wraps
 
 BASE_DIR = Path(__file__).parent
+# project root, so the chatbot's ``app`` package (not this file) is importable
+ROOT_DIR = BASE_DIR.resolve().parent
+sys.path.insert(0, str(ROOT_DIR))
+from app.vectorstore.admin_content import ADMIN_UPLOAD_ROOT
+
 DB_PATH = BASE_DIR / 'admin.db'
-PREFERRED_UPLOAD_ROOT = Path(r"C:\Users\Seratul Mustakim\Desktop\Ai saves\College_chatbot\admin\uploads")
-UPLOAD_ROOT = PREFERRED_UPLOAD_ROOT
-try:
-    UPLOAD_ROOT.mkdir(parents=True, exist_ok=True)
-except Exception:
-    UPLOAD_ROOT = BASE_DIR / 'uploads'
-    UPLOAD_ROOT.mkdir(parents=True, exist_ok=True)
+# same root the chatbot indexes uploads from (ADMIN_UPLOAD_ROOT overrides it)
+UPLOAD_ROOT = ADMIN_UPLOAD_ROOT
+UPLOAD_ROOT.mkdir(parents=True, exist_ok=True)
 
 app = Flask(__name__, static_folder=str(BASE_DIR / 'static'), static_url_path='/static')
 app.config['MAX_CONTENT_LENGTH'] = 500 * 1024 * 1024  # 500 MB limit
@@ -52,6 +56,18 @@ SESSION_CATEGORY_RULES = {
 }
 
 
+_SESSION_ROUTER = None
+
+
+def get_session_router():
+    """Compiled single-pass matcher for SESSION_CATEGORY_RULES (shared with the chatbot's intent router)."""
+    global _SESSION_ROUTER
+    if _SESSION_ROUTER is None:
+        from app.core.intent_router import IntentRouter
+        _SESSION_ROUTER = IntentRouter.from_keywords(SESSION_CATEGORY_RULES, default='others')
+    return _SESSION_ROUTER
+
+
 def init_db(force=False):
     if force and DB_PATH.exists():
         try:
@@ -178,8 +194,29 @@ def init_db(force=False):
         category TEXT,
         PRIMARY KEY (session_id, category)
     );
+    CREATE TABLE IF NOT EXISTS index_jobs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        status TEXT,
+        stage TEXT,
+        total INTEGER DEFAULT 0,
+        processed INTEGER DEFAULT 0,
+        unchanged INTEGER DEFAULT 0,
+        deleted INTEGER DEFAULT 0,
+        docs_per_sec REAL,
+        failures TEXT,
+        error TEXT,
+        generation INTEGER,
+        requested_by TEXT,
+        created_at TEXT,
+        started_at TEXT,
+        finished_at TEXT
+    );
     ''')
 
+    # jobs that were running when the panel stopped will never finish
+    cur.execute("UPDATE index_jobs SET status='failed', stage='failed', error='interrupted' "
+                "WHERE status IN ('queued', 'running')")
+
     # seed admin user
     now = datetime.utcnow().isoformat()
     admin_pass = generate_password_hash('password123')
@@ -621,17 +658,10 @@ def classify_sessions():
     conn = get_db_connection()
     rows = conn.execute('SELECT id, transcript FROM sessions').fetchall()
     cur = conn.cursor()
+    router = get_session_router()
     for r in rows:
         sid = r['id']
-        text = (r['transcript'] or '').lower()
-        assigned = set()
-        for cat, keys in SESSION_CATEGORY_RULES.items():
-            for k in keys:
-                if k in text:
-                    assigned.add(cat)
-                    break
-        if not assigned:
-            assigned.add('others')
+        assigned = router.intents(r['transcript'] or '') or {'others'}
         # remove existing categories for session
         cur.execute('DELETE FROM session_categories WHERE session_id=?', (sid,))
         for cat in assigned:
@@ -1028,15 +1058,141 @@ def reseed():
     return jsonify({'ok': True, 'message': 'reseeded'})
 
 
+_SNAPSHOTS = None
+
+
+def get_snapshots():
+    """Snapshot manager shared with the chatbot (imported lazily: it pulls in the embedder)."""
+    global _SNAPSHOTS
+    if _SNAPSHOTS is None:
+        from app.vectorstore.snapshots import SnapshotManager
+        _SNAPSHOTS = SnapshotManager()
+    return _SNAPSHOTS
+
+
+def load_index_documents(failures=None):
+    """File corpus plus this panel's KB / FAQ / custom replies / uploads."""
+    from app.vectorstore.admin_content import load_index_documents as load_all
+    return load_all(ROOT_DIR, DB_PATH, UPLOAD_ROOT, failures)
+
+
+def update_job(job_id, **fields):
+    conn = get_db_connection()
+    cols = ', '.join(f'{k}=?' for k in fields)
+    conn.execute(f'UPDATE index_jobs SET {cols} WHERE id=?', (*fields.values(), job_id))
+    conn.commit()
+    conn.close()
+
+
+def start_reindex_job(admin_email):
+    """Queue a reindex job and run it on the snapshot builder thread.
+
+    Returns ``(job_id, started)``; ``started`` is False when another reindex
+    is still running. All embedding happens off the request thread; the job
+    row is updated as documents are collected, embedded and published.
+    """
+    conn = get_db_connection()
+    cur = conn.execute('INSERT INTO index_jobs (status, stage, requested_by, created_at) VALUES (?, ?, ?, ?)',
+                       ('queued', 'queued', admin_email, datetime.utcnow().isoformat()))
+    job_id = cur.lastrowid
+    conn.commit()
+    conn.close()
+
+    failures = []
+    timing = {}
+
+    def load_docs():
+        update_job(job_id, status='running', stage='collecting', started_at=datetime.utcnow().isoformat())
+        docs = load_index_documents(failures)
+        update_job(job_id, stage='embedding', failures=json.dumps(failures))
+        timing['embed_started'] = time.time()
+        return docs
+
+    def progress(done, total):
+        elapsed = max(time.time() - timing['embed_started'], 1e-6)
+        update_job(job_id, stage='publishing' if done == total else 'embedding',
+                   total=total, processed=done, docs_per_sec=round(done / elapsed, 2))
+
+    def on_done(status):
+        ok = status['state'] == 'done'
+        update_job(job_id,
+                   status=status['state'],
+                   stage='published' if ok else 'failed',
+                   generation=status.get('generation'),
+                   unchanged=status.get('unchanged', 0),
+                   deleted=status.get('deleted', 0),
+                   error=status.get('error'),
+                   finished_at=datetime.utcnow().isoformat())
+
+    started = get_snapshots().rebuild_async(load_docs, progress=progress, on_done=on_done)
+    if not started:
+        update_job(job_id, status='skipped', stage='skipped', error='another reindex is running',
+                   finished_at=datetime.utcnow().isoformat())
+    return job_id, started
+
+
+def job_dict(row):
+    item = dict(row)
+    item['failures'] = json.loads(item['failures']) if item.get('failures') else []
+    return item
+
+
 @app.route('/api/reindex', methods=['POST'])
 @login_required
 def reindex():
-    # Stub for re-indexing knowledge base / vectors
+    """Start a background reindex job; poll /api/reindex/jobs/<id> for progress.
+
+    The job publishes a new index generation that the chatbot swaps in on
+    its next request; until then it keeps serving the current one.
+    """
+    job_id, started = start_reindex_job(session.get('admin_email'))
+    try:
+        log_action(session.get('admin_email'), 'reindex', f'job {job_id}' + ('' if started else ' (already running)'))
+    except Exception:
+        pass
+    message = 'reindex started' if started else 'reindex already running'
+    return jsonify({'ok': True, 'message': message, 'started': started, 'job_id': job_id,
+                    **get_snapshots().status()}), (202 if started else 200)
+
+
+@app.route('/api/reindex/jobs', methods=['GET'])
+@login_required
+def reindex_jobs():
+    conn = get_db_connection()
+    rows = conn.execute('SELECT * FROM index_jobs ORDER BY id DESC LIMIT 50').fetchall()
+    conn.close()
+    return jsonify([job_dict(r) for r in rows])
+
+
+@app.route('/api/reindex/jobs/<int:job_id>', methods=['GET'])
+@login_required
+def reindex_job(job_id):
+    conn = get_db_connection()
+    row = conn.execute('SELECT * FROM index_jobs WHERE id=?', (job_id,)).fetchone()
+    conn.close()
+    if not row:
+        return jsonify({'error': 'not found'}), 404
+    return jsonify(job_dict(row))
+
+
+@app.route('/api/reindex/status', methods=['GET'])
+@login_required
+def reindex_status():
+    return jsonify(get_snapshots().status())
+
+
+@app.route('/api/reindex/rollback', methods=['POST'])
+@login_required
+def reindex_rollback():
+    try:
+        generation = get_snapshots().rollback()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 409
     try:
-        log_action(session.get('admin_email'), 'reindex', 'manual trigger')
+        log_action(session.get('admin_email'), 'reindex_rollback', f'generation {generation}')
     except Exception:
         pass
-    return jsonify({'ok': True, 'message': 'reindex started (stub)'})
+    return jsonify({'ok': True, **get_snapshots().status()})
 
 
 @app.route('/api/audit', methods=['GET'])
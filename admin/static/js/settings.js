@@ -15,3 +15,48 @@ document.getElementById('reseed-btn')?.addEventListener('click', async ()=>{
     }
   }catch(e){ alert('Reseed failed'); }
 });
+
+// Search index - background reindex jobs
+function esc(s){ return String(s ?? '').replace(/[&<>"]/g, c => ({'&':'&amp;','<':'&lt;','>':'&gt;','"':'&quot;'}[c])); }
+
+let pollTimer = null;
+
+async function loadIndexStatus(){
+  const el = document.getElementById('index-status');
+  if (!el) return;
+  try{
+    const st = await api('/reindex/status');
+    el.textContent = `Live generation: ${st.live_generation ?? 'none'} (${st.chunks ?? 0} passages)` +
+      (st.history && st.history.length ? ` - rollback to ${st.history[0]} available` : '');
+    const jobs = await api('/reindex/jobs');
+    const tbody = document.querySelector('#jobs-table tbody');
+    tbody.innerHTML = jobs.map(j => `<tr>
+      <td>${j.id}</td><td>${esc(j.status)}</td><td>${esc(j.stage)}</td>
+      <td>${j.processed}/${j.total}</td><td>${j.docs_per_sec ?? ''}</td>
+      <td>${j.generation ?? ''}</td>
+      <td title="${esc(j.failures.map(f => f.source + ': ' + f.error).join('\n'))}">${j.failures.length}${j.error ? ' - ' + esc(j.error) : ''}</td>
+      <td>${esc(j.started_at || j.created_at)}</td></tr>`).join('');
+    const running = jobs.some(j => j.status === 'queued' || j.status === 'running');
+    clearTimeout(pollTimer);
+    if (running) pollTimer = setTimeout(loadIndexStatus, 1000);
+  }catch(e){ el.textContent = 'Index status unavailable'; }
+}
+
+document.getElementById('reindex-btn')?.addEventListener('click', async ()=>{
+  try{
+    const r = await api('/reindex','POST');
+    if (!r.started) alert('A reindex is already running');
+  }catch(e){ alert('Reindex failed to start'); }
+  loadIndexStatus();
+});
+
+document.getElementById('rollback-btn')?.addEventListener('click', async ()=>{
+  if (!confirm('Serve the previous index generation again?')) return;
+  try{
+    const r = await api('/reindex/rollback','POST');
+    if (r.error) alert(r.error);
+  }catch(e){ alert('Rollback failed'); }
+  loadIndexStatus();
+});
+
+loadIndexStatus();
@@ -6,31 +6,27 @@ from pathlib import Path
 
 from app.core.intent import detect_intent, find_scholarship, SCHOLARSHIP_ID_TO_SLUG
 from app.core.retriever import retrieve
-from app.core.prompt_builder import build_prompt
-from app.vectorstore.index import VectorIndex
-from app.llm.gemini_client import ask_gemini
+from app.core.prompt_builder import SYSTEM_INSTRUCTION, build_user_prompt
+from app.vectorstore.corpus import load_documents
+from app.vectorstore.snapshots import SnapshotManager
+from app.llm.gemini_client import ask_gemini, GeminiError
 
 app = Flask(__name__)
 CORS(app)
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
-# Load all JSON documents
+# Load all JSON documents (the corpus loader skips .index_snapshots, whose
+# meta.json files would otherwise change the corpus on every start)
+DOCUMENTS = load_documents(BASE_DIR)
+
 def load_docs():
-    docs = []
-    for p in BASE_DIR.rglob("*.json"):
-        try:
-            with open(p, "r", encoding="utf-8") as f:
-                docs.append(json.dumps(json.load(f)))
-        except Exception:
-            pass
-    return docs
+    return [doc["text"] for doc in DOCUMENTS]
 
 ALL_DOCS = load_docs()
 
-# Build vector index ONCE
-VECTOR_INDEX = VectorIndex()
-VECTOR_INDEX.build(ALL_DOCS)
+# Serve the saved index generation (shared with new_app; embeds only on changes)
+VECTOR_INDEX = SnapshotManager().start(lambda: DOCUMENTS)
 
 @app.route("/chat", methods=["POST"])
 def chat():
@@ -83,9 +79,17 @@ def chat():
     else:
         context = str(context_items)
 
-    prompt = build_prompt(query, context)
-
-    answer = ask_gemini(prompt)
+    prompt = build_user_prompt(query, context)
+
+    try:
+        answer = ask_gemini(prompt, system=SYSTEM_INSTRUCTION)
+    except GeminiError as e:
+        print(f"[ERROR] Gemini request failed ({type(e).__name__}): {e}")
+        return jsonify({
+            "intent": intent,
+            "response": "Sorry, I couldn't answer that right now. Please try again shortly.",
+            "error": type(e).__name__
+        }), 503
 
     return jsonify({
         "intent": intent,
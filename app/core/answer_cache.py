@@ -0,0 +1,308 @@
+"""
+Answer cache – Gemini answers reused for repeated questions.
+
+Campus questions repeat ("holiday list", "who is the hod"), and for the
+authoritative intents the same files give the same context, so the same
+prompt gets a fresh generation every time. Answers are cached under
+
+    (intent, normalized question, hash of the context, PROMPT_VERSION)
+
+in an in-memory LRU with a TTL, backed by an SQLite file that survives
+restarts. Each entry records the content key of every source file its
+context came from (``retriever.source_files``): when a file changes, the
+entries built from it stop matching and are deleted. The context hash
+covers vector-search answers, whose passages change with the index.
+
+With ANSWER_CACHE_SIMILARITY set (e.g. 0.92), a miss also looks for an
+entry with the same intent, context and prompt whose question embedding is
+that close ("list of holidays" -> "holiday list").
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+
+from app.core.resource_cache import RESOURCES
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+
+ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE", "1") == "1"
+ANSWER_CACHE_TTL = float(os.getenv("ANSWER_CACHE_TTL", str(24 * 3600)))
+ANSWER_CACHE_SIZE = int(os.getenv("ANSWER_CACHE_SIZE", "2000"))
+ANSWER_CACHE_DISK_SIZE = int(os.getenv("ANSWER_CACHE_DISK_SIZE", "20000"))
+# empty: memory only
+ANSWER_CACHE_PATH = os.getenv("ANSWER_CACHE_PATH", str(BASE_DIR / ".index_cache" / "answers.sqlite3"))
+# cosine similarity for near-duplicate questions; 0 = exact matches only
+ANSWER_CACHE_SIMILARITY = float(os.getenv("ANSWER_CACHE_SIMILARITY", "0"))
+
+_PUNCT = re.compile(r"[^\w\s]")
+_SPACE = re.compile(r"\s+")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS answers (
+    key TEXT PRIMARY KEY,
+    intent TEXT,
+    query TEXT,
+    context_hash TEXT,
+    prompt_version TEXT,
+    answer TEXT,
+    sources TEXT,
+    created REAL,
+    last_used REAL,
+    llm_seconds REAL
+)
+"""
+_COLUMNS = ["key", "intent", "query", "context_hash", "prompt_version", "answer", "sources",
+            "created", "last_used", "llm_seconds"]
+
+
+def normalize_question(query):
+    """"Who is the HOD?" -> "who is the hod"."""
+    return _SPACE.sub(" ", _PUNCT.sub(" ", str(query).lower())).strip()
+
+
+def context_hash(context):
+    return hashlib.sha1(str(context).encode("utf-8")).hexdigest()
+
+
+def source_versions(paths):
+    """``{path: content key}`` of the existing files among ``paths``."""
+    versions = {}
+    for path in paths:
+        doc = RESOURCES.get_document(path)
+        if doc is not None:
+            versions[str(path)] = doc["key"]
+    return versions
+
+
+def _embed(text):
+    from app.vectorstore.embeddings import embed_queries
+    vec = np.asarray(embed_queries([text])[0], dtype=np.float32)
+    norm = float(np.linalg.norm(vec))
+    return vec / norm if norm else vec
+
+
+class AnswerCache:
+    def __init__(self, path=ANSWER_CACHE_PATH, size=ANSWER_CACHE_SIZE, disk_size=ANSWER_CACHE_DISK_SIZE,
+                 ttl=ANSWER_CACHE_TTL, similarity=ANSWER_CACHE_SIMILARITY):
+        self.size = size
+        self.disk_size = disk_size
+        self.ttl = ttl
+        self.similarity = similarity
+        # key -> entry; entries of one (intent, context, prompt) group share a
+        # group key for the near-duplicate search
+        self._entries = OrderedDict()
+        self._groups = {}
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "similar_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0,
+                       "expired": 0, "invalidated": 0, "saved_seconds": 0.0}
+        self._db = None
+        if path:
+            try:
+                Path(path).parent.mkdir(parents=True, exist_ok=True)
+                self._db = sqlite3.connect(str(path), check_same_thread=False)
+                self._db.execute(_SCHEMA)
+                self._db.commit()
+            except sqlite3.Error as e:
+                print(f"[WARNING] Answer cache is memory-only, could not open {path}: {e}")
+                self._db = None
+
+    # ----- KEYS -----
+
+    @staticmethod
+    def key(intent, query, context, prompt_version):
+        parts = [intent, normalize_question(query), context_hash(context), prompt_version]
+        return hashlib.sha1(json.dumps(parts).encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _group(entry):
+        return (entry["intent"], entry["context_hash"], entry["prompt_version"])
+
+    # ----- MEMORY TIER -----
+
+    def _remember(self, entry):
+        """Add ``entry`` to the LRU (lock held)."""
+        key = entry["key"]
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self._entries[key] = entry
+            return
+        self._entries[key] = entry
+        self._groups.setdefault(self._group(entry), set()).add(key)
+        while len(self._entries) > self.size:
+            _, old = self._entries.popitem(last=False)
+            self._discard_group(old)
+
+    def _discard_group(self, entry):
+        keys = self._groups.get(self._group(entry))
+        if keys is not None:
+            keys.discard(entry["key"])
+            if not keys:
+                del self._groups[self._group(entry)]
+
+    def _forget(self, entry, reason):
+        """Drop a stale entry from both tiers (lock held)."""
+        if self._entries.pop(entry["key"], None) is not None:
+            self._discard_group(entry)
+        if self._db is not None:
+            self._db.execute("DELETE FROM answers WHERE key = ?", (entry["key"],))
+            self._db.commit()
+        self._stats[reason] += 1
+
+    def _fresh(self, entry, now):
+        if now - entry["created"] > self.ttl:
+            return "expired"
+        for path, version in entry["sources"].items():
+            doc = RESOURCES.get_document(path)
+            if doc is None or doc["key"] != version:
+                return "invalidated"
+        return None
+
+    # ----- DISK TIER -----
+
+    def _load(self, key):
+        if self._db is None:
+            return None
+        row = self._db.execute(f"SELECT {', '.join(_COLUMNS)} FROM answers WHERE key = ?", (key,)).fetchone()
+        return self._entry(row) if row else None
+
+    @staticmethod
+    def _entry(row):
+        entry = dict(zip(_COLUMNS, row))
+        entry["sources"] = json.loads(entry["sources"] or "{}")
+        entry["embedding"] = None
+        return entry
+
+    def _store(self, entry):
+        if self._db is None:
+            return
+        self._db.execute(
+            f"INSERT OR REPLACE INTO answers ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})",
+            [json.dumps(entry["sources"]) if c == "sources" else entry[c] for c in _COLUMNS])
+        count = self._db.execute("SELECT COUNT(*) FROM answers").fetchone()[0]
+        if count > self.disk_size:
+            self._db.execute("DELETE FROM answers WHERE key IN (SELECT key FROM answers ORDER BY last_used LIMIT ?)",
+                             (count - self.disk_size,))
+        self._db.commit()
+
+    # ----- LOOKUP -----
+
+    def get(self, intent, query, context, prompt_version):
+        """Cached entry (``answer``, ``llm_seconds``, ``match``) or None."""
+        key = self.key(intent, query, context, prompt_version)
+        now = time.time()
+        with self._lock:
+            entry, match = self._entries.get(key), "exact"
+            if entry is None:
+                entry = self._load(key)
+                if entry is not None:
+                    match = "disk"
+            if entry is not None:
+                stale = self._fresh(entry, now)
+                if stale:
+                    self._forget(entry, stale)
+                    entry = None
+            group = (intent, context_hash(context), prompt_version)
+            candidates = [self._entries[k] for k in self._groups.get(group, ())] if entry is None else []
+
+        if entry is None and self.similarity > 0 and candidates:
+            entry, match = self._similar(query, candidates), "similar"
+
+        with self._lock:
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            entry["last_used"] = now
+            self._remember(entry)
+            if match == "disk" and self._db is not None:
+                self._db.execute("UPDATE answers SET last_used = ? WHERE key = ?", (now, entry["key"]))
+                self._db.commit()
+            self._stats["hits"] += 1
+            if match != "exact":
+                self._stats[f"{match}_hits"] += 1
+            self._stats["saved_seconds"] += entry["llm_seconds"] or 0.0
+        return dict(entry, match=match)
+
+    def _similar(self, query, candidates):
+        """The candidate whose question is closest to ``query``, if close enough."""
+        vec = _embed(normalize_question(query))
+        best, best_score = None, self.similarity
+        now = time.time()
+        for entry in candidates:
+            if entry["embedding"] is None:
+                entry["embedding"] = _embed(entry["query"])
+            score = float(np.dot(vec, entry["embedding"]))
+            if score >= best_score and not self._fresh(entry, now):
+                best, best_score = entry, score
+        return best
+
+    def put(self, intent, query, context, prompt_version, answer, llm_seconds=0.0, sources=()):
+        """Cache ``answer``; ``sources`` are the files its context came from."""
+        now = time.time()
+        entry = {
+            "key": self.key(intent, query, context, prompt_version),
+            "intent": intent,
+            "query": normalize_question(query),
+            "context_hash": context_hash(context),
+            "prompt_version": prompt_version,
+            "answer": answer,
+            "sources": source_versions(sources),
+            "created": now,
+            "last_used": now,
+            "llm_seconds": float(llm_seconds),
+            "embedding": None,
+        }
+        with self._lock:
+            self._remember(entry)
+            self._store(entry)
+            self._stats["stores"] += 1
+
+    # ----- MAINTENANCE -----
+
+    def warm(self):
+        """Load disk entries into memory (most recently used last, so they
+        survive the LRU), dropping those that expired or whose source files
+        changed. Returns the number kept in memory."""
+        if self._db is None:
+            return 0
+        with self._lock:
+            rows = self._db.execute(f"SELECT {', '.join(_COLUMNS)} FROM answers ORDER BY last_used").fetchall()
+            now = time.time()
+            for row in rows:
+                entry = self._entry(row)
+                stale = self._fresh(entry, now)
+                if stale:
+                    self._forget(entry, stale)
+                    continue
+                self._remember(entry)
+            return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._groups.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM answers")
+                self._db.commit()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_entries"] = len(self._entries)
+            if self._db is not None:
+                stats["disk_entries"] = self._db.execute("SELECT COUNT(*) FROM answers").fetchone()[0]
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = round(stats["hits"] / lookups, 4) if lookups else None
+        stats["saved_seconds"] = round(stats["saved_seconds"], 2)
+        return stats
+
+
+ANSWER_CACHE = AnswerCache() if ANSWER_CACHE_ENABLED else None
@@ -3,7 +3,11 @@ Context Extraction – Faculty-safe, deterministic extraction
 """
 
 import json
+import os
 import re
+import threading
+
+from app.core.document_parser import RENDER_MODE, render_compact
 
 
 # --------------------------------------------------
@@ -17,59 +21,251 @@ def normalize_name(text: str) -> str:
 
 
 # --------------------------------------------------
-# FACULTY EXTRACTION (SINGLE RESPONSIBILITY)
+# FACULTY INDEX
 # --------------------------------------------------
 
-def extract_faculty_info(query, docs):
-    """
-    Rules:
-    1. Name-based match ALWAYS has priority
-    2. HOD match ONLY if explicitly asked
-    3. Return type is ALWAYS dict
+# query words that never identify a faculty member by name
+NAME_STOPWORDS = frozenset("""
+a about an and any are at can contact department dept details do does email
+faculty for from give hod head how i in info information is know list maam
+madam me member members miss mobile my number of office on or phone please
+room sir tell teacher teachers teaches teaching that the their to what when
+where which who whom whose with works
+""".split())
+
+RESEARCH_STOPWORDS = frozenset("a an and for in of on the to using with".split())
+
+# a misspelt name token matches when trigram Jaccard similarity reaches this
+FUZZY_NAME_THRESHOLD = float(os.getenv("FACULTY_FUZZY_THRESHOLD", "0.5"))
+
+# partial names ("Dr. Ghosh") matching more members than this are ambiguous
+MAX_NAME_MATCHES = 3
+MAX_RESEARCH_MATCHES = 5
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def _name_tokens(text):
+    return _WORD.findall(normalize_name(text))
+
+
+def _trigrams(token):
+    padded = f" {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _position_keys(position):
+    position = position.lower()
+    keys = {" ".join(_WORD.findall(part)) for part in re.split(r"[&,/]|\band\b", position)}
+    keys.update(_WORD.findall(position))
+    if "hod" in position or "head" in position:
+        keys.add("hod")
+    keys.discard("")
+    return keys
+
+
+class FacultyIndex:
+    """Lookup tables over one faculty directory, built once.
+
+    Members are numbered in directory order; every table maps a key to a
+    tuple of member numbers:
+
+        names      normalized full name            "shivnath ghosh"
+        tokens     single name token               "podder", "sen"
+        trigrams   trigram -> name tokens          (misspelt names)
+        positions  position phrase / word, "hod"   "assistant professor"
+        research   research-area phrase / word     "iot", "machine learning"
     """
 
-    query_norm = normalize_name(query)
-    want_hod = any(t in query.lower() for t in ["hod", "head of department", "head of dept"])
+    def __init__(self, data):
+        self.department = data.get("department", "Unknown Department")
+        self.members = [info for info in data.get("faculty", {}).values() if isinstance(info, dict)]
+        # "computer science faculty" names the department, not a research area
+        self.department_words = frozenset(_WORD.findall(self.department.lower()))
+        # formatted once; lookups only pick entries
+        self.texts = [format_faculty_member(info, self.department) for info in self.members]
+
+        names, tokens, trigrams, positions, research = {}, {}, {}, {}, {}
+        self.max_name_len = 0
+        for i, info in enumerate(self.members):
+            parts = _name_tokens(info.get("name", ""))
+            if parts:
+                names.setdefault(" ".join(parts), []).append(i)
+                self.max_name_len = max(self.max_name_len, len(parts))
+            for tok in set(parts):
+                if len(tok) < 3:
+                    continue
+                tokens.setdefault(tok, []).append(i)
+                for tri in _trigrams(tok):
+                    trigrams.setdefault(tri, set()).add(tok)
+
+            for key in _position_keys(info.get("position", "")):
+                positions.setdefault(key, []).append(i)
+
+            areas = info.get("research_area") or []
+            if isinstance(areas, str):
+                areas = [areas]
+            keys = set()
+            for area in areas:
+                words = [w for w in _WORD.findall(str(area).lower()) if w not in RESEARCH_STOPWORDS]
+                if words:
+                    keys.add(" ".join(words))
+                    keys.update(words)
+            for key in keys:
+                research.setdefault(key, []).append(i)
+
+        self.names = {k: tuple(v) for k, v in names.items()}
+        self.tokens = {k: tuple(v) for k, v in tokens.items()}
+        self.trigrams = {k: tuple(sorted(v)) for k, v in trigrams.items()}
+        self.positions = {k: tuple(v) for k, v in positions.items()}
+        self.research = {k: tuple(v) for k, v in research.items()}
+
+    def __len__(self):
+        return len(self.members)
 
-    for doc_text in docs:
-        if not isinstance(doc_text, str):
-            continue
+    def _fuzzy_token(self, token):
+        """The indexed name token closest to a misspelt ``token`` (or None)."""
+        grams = _trigrams(token)
+        shared = {}
+        for tri in grams:
+            for cand in self.trigrams.get(tri, ()):
+                shared[cand] = shared.get(cand, 0) + 1
+        best, best_score = None, FUZZY_NAME_THRESHOLD
+        for cand, n in shared.items():
+            score = n / (len(grams) + len(cand) + 2 - n)
+            if score >= best_score:
+                best, best_score = cand, score
+        return best
 
-        if not doc_text.strip().startswith("{"):
-            continue
+    def find_name(self, query):
+        """Members named in ``query``, best match first.
 
+        A full name wins; otherwise members are ranked by how many of their
+        name tokens the query mentions ("podder sir", "Dr. Sen"), with
+        misspelt tokens resolved through the trigram index.
+        """
+        words = _name_tokens(query)
+
+        # 1. full name: probe every span of the query up to the longest name
+        for size in range(min(self.max_name_len, len(words)), 0, -1):
+            for start in range(len(words) - size + 1):
+                hit = self.names.get(" ".join(words[start:start + size]))
+                if hit:
+                    return list(hit[:1])
+
+        # 2. partial / misspelt name tokens
+        scores = {}
+        for word in dict.fromkeys(words):
+            if len(word) < 3 or word in NAME_STOPWORDS:
+                continue
+            hit = self.tokens.get(word)
+            if hit is None and len(word) >= 4:
+                fuzzy = self._fuzzy_token(word)
+                hit = self.tokens.get(fuzzy) if fuzzy else None
+            for i in hit or ():
+                scores[i] = scores.get(i, 0) + 1
+        if not scores:
+            return []
+        best = max(scores.values())
+        matches = [i for i, n in scores.items() if n == best]
+        return sorted(matches) if len(matches) <= MAX_NAME_MATCHES else []
+
+    def find_position(self, key):
+        return list(self.positions.get(key, ()))
+
+    def find_research(self, query):
+        """Members whose research areas the query mentions, best match first."""
+        words = [w for w in _WORD.findall(query.lower())
+                 if w not in RESEARCH_STOPWORDS and w not in self.department_words]
+        scores = {}
+        keys = set(words) | {" ".join(words[i:i + 2]) for i in range(len(words) - 1)}
+        for key in keys:
+            for i in self.research.get(key, ()):
+                scores[i] = scores.get(i, 0) + 1
+        if not scores:
+            return []
+        best = max(scores.values())
+        matches = [i for i, n in scores.items() if n == best]
+        return sorted(matches)[:MAX_RESEARCH_MATCHES]
+
+
+# prepared-document key -> FacultyIndex (None for documents without faculty)
+_FACULTY_INDEXES = {}
+_FACULTY_INDEX_LIMIT = 1024
+_faculty_lock = threading.Lock()
+
+
+def get_faculty_index(doc):
+    """FacultyIndex for a prepared document or JSON string (None if not a directory)."""
+    if isinstance(doc, dict):
+        key, data = doc.get("key"), doc.get("data")
+    elif isinstance(doc, str) and doc.strip().startswith("{"):
+        key = doc
         try:
-            data = json.loads(doc_text)
+            data = json.loads(doc)
         except Exception:
-            continue
+            return None
+    else:
+        return None
+
+    if key is not None and key in _FACULTY_INDEXES:
+        return _FACULTY_INDEXES[key]
 
-        if "faculty" not in data:
-            continue
+    index = None
+    if isinstance(data, dict) and isinstance(data.get("faculty"), dict):
+        index = FacultyIndex(data)
+    if key is not None:
+        with _faculty_lock:
+            if len(_FACULTY_INDEXES) >= _FACULTY_INDEX_LIMIT:
+                _FACULTY_INDEXES.clear()
+            _FACULTY_INDEXES[key] = index
+    return index
 
-        department = data.get("department", "Unknown Department")
 
+# --------------------------------------------------
+# FACULTY EXTRACTION (SINGLE RESPONSIBILITY)
+# --------------------------------------------------
+
+def extract_faculty_info(query, docs):
+    """
+    Rules:
+    1. Name-based match ALWAYS has priority
+    2. HOD match ONLY if explicitly asked
+    3. Research-area match when no one is named
+    4. Return type is ALWAYS dict
+    """
+
+    want_hod = any(t in query.lower() for t in ["hod", "head of department", "head of dept"])
+    indexes = [ix for ix in (get_faculty_index(doc) for doc in docs) if ix is not None]
+
+    for index in indexes:
         # -------------------------------
         # 1️⃣ NAME MATCH (HIGHEST PRIORITY)
         # -------------------------------
-        for info in data["faculty"].values():
-            faculty_name = info.get("name", "")
-            if normalize_name(faculty_name) and normalize_name(faculty_name) in query_norm:
-                return {
-                    "matched": True,
-                    "data": [format_faculty_member(info, department)]
-                }
+        members = index.find_name(query)
 
         # -------------------------------
         # 2️⃣ HOD MATCH (ONLY IF ASKED)
         # -------------------------------
-        if want_hod:
-            for info in data["faculty"].values():
-                position = info.get("position", "").lower()
-                if "hod" in position or "head" in position:
-                    return {
-                        "matched": True,
-                        "data": [format_faculty_member(info, department)]
-                    }
+        if not members and want_hod:
+            members = index.find_position("hod")[:1]
+
+        if members:
+            return {
+                "matched": True,
+                "data": [index.texts[i] for i in members]
+            }
+
+    # -------------------------------
+    # 3️⃣ RESEARCH AREA MATCH
+    # -------------------------------
+    for index in indexes:
+        members = index.find_research(query)
+        if members:
+            return {
+                "matched": True,
+                "data": [index.texts[i] for i in members]
+            }
 
     # -------------------------------
     # ❌ NOTHING FOUND
@@ -84,7 +280,18 @@ def extract_faculty_info(query, docs):
 # FORMATTER
 # --------------------------------------------------
 
-def format_faculty_member(info, department):
+def format_faculty_member(info, department, mode=None):
+    if (mode or RENDER_MODE) == "compact":
+        return render_compact({
+            "faculty member": info.get("name", "Unknown"),
+            "department": department,
+            "position": info.get("position"),
+            "qualification": info.get("qualification"),
+            "research areas": info.get("research_area"),
+            "email": info.get("email"),
+            "phone": info.get("phone"),
+        })
+
     parts = [
         "=" * 60,
         f"Faculty Member: {info.get('name', 'Unknown')}",
@@ -0,0 +1,181 @@
+"""
+Context packer – fit retrieved passages into a per-intent token budget.
+
+/chat used to join the first three retrieved items whatever their size, so
+a long rules file blew the prompt up while a short faculty record left
+room unused. ``pack_context`` takes the passages in score order (the
+retriever's order unless scores are given), drops duplicates, adds whole
+passages while they fit and cuts the first one that does not at a sentence
+or line boundary.
+
+Token counts are estimated from characters (Gemini averages about four
+characters per token on English text); ``estimate_cost`` prices them with
+the project's Gemini pricing table (Resources/json/gemini_2_5_flash_costs.json).
+Input tokens served from a Gemini context cache are billed at
+CACHED_INPUT_RATIO of the input price unless the table has its own
+``cached_input_usd``.
+"""
+
+import json
+import math
+import os
+import re
+
+from app.core.resource_map import JSON_PATH
+
+CHARS_PER_TOKEN = float(os.getenv("CHARS_PER_TOKEN", "4"))
+
+# tokens of context per intent; CONTEXT_TOKEN_BUDGET_<INTENT> overrides one,
+# CONTEXT_TOKEN_BUDGET the default for intents not listed
+DEFAULT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "800"))
+INTENT_TOKEN_BUDGETS = {
+    "faculty": 800,
+    "subject": 1200,
+    # one semester listing (the largest is ~1.3k tokens) fits whole
+    "semester": 1300,
+    "rules": 1200,
+    "exam": 1000,
+    "about": 800,
+    "holiday": 600,
+    "library": 400,
+    "general": 800,
+}
+
+# a truncated passage shorter than this is not worth sending
+MIN_PARTIAL_TOKENS = 48
+
+SEPARATOR = "\n\n"
+PRICING_FILE = JSON_PATH / "gemini_2_5_flash_costs.json"
+# Gemini 2.5 bills cached input tokens at a quarter of the input price
+CACHED_INPUT_RATIO = float(os.getenv("CACHED_INPUT_RATIO", "0.25"))
+
+_SPACE = re.compile(r"\s+")
+# sentence ends and line breaks, the places a passage may be cut
+_BOUNDARY = re.compile(r"(?<=[.!?])\s+|\n+")
+
+
+def estimate_tokens(text):
+    if not text:
+        return 0
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def token_budget(intent):
+    override = os.getenv(f"CONTEXT_TOKEN_BUDGET_{str(intent).upper()}")
+    if override:
+        return int(override)
+    return INTENT_TOKEN_BUDGETS.get(intent, DEFAULT_TOKEN_BUDGET)
+
+
+def truncate_to_tokens(text, max_tokens):
+    """Longest prefix of ``text`` within ``max_tokens`` that ends at a
+    sentence or line boundary (a word boundary if there is none)."""
+    limit = int(max_tokens * CHARS_PER_TOKEN)
+    if len(text) <= limit:
+        return text
+    cut = 0
+    for m in _BOUNDARY.finditer(text, 0, limit + 1):
+        cut = m.start()
+    if cut == 0:
+        # one long sentence: cut between words instead
+        cut = max(text.rfind(" ", 0, limit), 0)
+    return text[:cut].rstrip()
+
+
+def _fingerprint(text):
+    return _SPACE.sub(" ", text).strip().lower()
+
+
+def pack_context(items, intent, budget=None, scores=None):
+    """Pack ``items`` (strings) into the intent's token budget.
+
+    ``scores`` (one per item, e.g. from ``retrieve(..., with_scores=True)``)
+    puts the highest-scoring items first; without them, or when an item has
+    no score (None), the retriever's order is kept.
+
+    Returns ``{"context", "tokens", "budget", "items", "dropped",
+    "truncated", "duplicates"}``; ``items`` are the packed passages in
+    score order.
+    """
+    budget = token_budget(intent) if budget is None else budget
+    order = range(len(items))
+    if scores is not None and None not in scores:
+        order = sorted(order, key=lambda i: -scores[i])
+
+    packed, seen = [], []
+    used = dropped = truncated = duplicates = 0
+    sep_tokens = estimate_tokens(SEPARATOR)
+    for i in order:
+        text = str(items[i]).strip()
+        if not text:
+            continue
+        fp = _fingerprint(text)
+        # the same passage from two sources, or one contained in another
+        if any(fp in kept for kept in seen):
+            duplicates += 1
+            continue
+        cost = estimate_tokens(text) + (sep_tokens if packed else 0)
+        remaining = budget - used
+        if cost <= remaining:
+            packed.append(text)
+            seen.append(fp)
+            used += cost
+            continue
+        room = remaining - (sep_tokens if packed else 0)
+        part = truncate_to_tokens(text, room) if room > 0 else ""
+        # the cut lands on a line / sentence boundary, often far below ``room``:
+        # a heading-only fragment would spend budget for nothing
+        if estimate_tokens(part) >= MIN_PARTIAL_TOKENS:
+            packed.append(part)
+            seen.append(fp)
+            used += estimate_tokens(part) + (sep_tokens if len(packed) > 1 else 0)
+            truncated += 1
+        else:
+            dropped += 1
+
+    context = SEPARATOR.join(packed)
+    return {
+        "context": context,
+        "tokens": estimate_tokens(context),
+        "budget": budget,
+        "items": packed,
+        "dropped": dropped,
+        "truncated": truncated,
+        "duplicates": duplicates,
+    }
+
+
+# ----- PRICING -----
+
+_PRICING = None
+
+
+def load_pricing(path=PRICING_FILE):
+    """``{"model", "input_usd", "cached_input_usd", "output_usd"}`` per 1M tokens
+    from the pricing table."""
+    global _PRICING
+    if _PRICING is None:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                table = json.load(f)
+            per_1m = table.get("pricing_per_1M", {})
+            input_usd = float(per_1m.get("input_usd", 0))
+            _PRICING = {
+                "model": table.get("model"),
+                "input_usd": input_usd,
+                "cached_input_usd": float(per_1m.get("cached_input_usd", input_usd * CACHED_INPUT_RATIO)),
+                "output_usd": float(per_1m.get("output_usd", 0)),
+                "table": table,
+            }
+        except Exception as e:
+            print(f"[WARNING] Could not load Gemini pricing table: {e}")
+            _PRICING = {"model": None, "input_usd": 0.0, "cached_input_usd": 0.0, "output_usd": 0.0, "table": {}}
+    return _PRICING
+
+
+def estimate_cost(input_tokens, output_tokens=0, cached_tokens=0):
+    """USD for one request at the table's per-1M-token prices; ``cached_tokens``
+    are input tokens read from a context cache (not part of ``input_tokens``)."""
+    pricing = load_pricing()
+    return (input_tokens * pricing["input_usd"] + cached_tokens * pricing["cached_input_usd"]
+            + output_tokens * pricing["output_usd"]) / 1_000_000
@@ -0,0 +1,225 @@
+"""
+Course catalog – every course JSON and semester listing, indexed once.
+
+Subject questions used to be resolved with a regex on the query that only
+knew ``bscm|escm|pcc|pec`` directly followed by digits, then a filesystem
+lookup of ``<CODE>.json``. PCC-CSM501, PEC-CSM501A, HSMCM101 or AUM-1 never
+resolved, and neither did a course asked for by name.
+
+The catalog is built at import from ``Resources/json/<CODE>.json`` and
+``sem_json/sem_*.json`` and maps
+
+- compact codes ("pcccsm501", "aum1") -> course
+- course names ("semiconductor physics") -> course
+- module titles ("storage strategies transaction processing") -> course + module
+
+so ``lookup`` is a few dictionary probes per query token. Every course
+carries its semester and module list, and the catalog note passed to the
+LLM next to the course file is rendered here, ahead of time.
+"""
+
+import json
+import re
+
+from app.core.document_parser import prepare_document
+from app.core.resource_cache import RESOURCES
+from app.core.resource_map import JSON_PATH, SEM_JSON_PATH
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+# course files are named after their code: BSCM301.json, PEC-CSM501A.json, AUM-1.json
+_CODE_FILE = re.compile(r"^[A-Z]{2,6}(?:-[A-Z]{2,4})?-?\d+[A-Z]?$")
+
+_SEMESTER = re.compile(r"semester\s*[-–]?\s*(\w+)", re.IGNORECASE)
+_MODULE = re.compile(r"\b(?:module|unit|mod)\s*[-#]?\s*(\d+)\b")
+
+# "calculus & linear algebra" is asked as "calculus and linear algebra"
+_CONNECTORS = frozenset(["and"])
+
+# module titles ("machine learning", "functions") are ordinary words too;
+# they only select a course when the query is about a course
+COURSE_CUES = frozenset("""
+module modules unit units syllabus subject subjects course courses topic topics
+chapter chapters paper lab semester sem
+""".split())
+
+MIN_MODULE_TITLE_TOKENS = 2
+MAX_SUBJECT_MATCHES = 3
+
+
+def code_key(code):
+    """"PCC-CSM501" / "pcc csm 501" -> "pcccsm501"."""
+    return "".join(_WORD.findall(str(code).lower()))
+
+
+def _phrase(text):
+    return tuple(t for t in _WORD.findall(str(text).lower()) if t not in _CONNECTORS)
+
+
+def _name_variants(name):
+    """The name plus the name without a parenthetical ("Image Processing (Elective-I Option A)")."""
+    variants = {_phrase(name)}
+    if "(" in name:
+        variants.add(_phrase(name.split("(", 1)[0]))
+    return [v for v in variants if v]
+
+
+class CourseCatalog:
+    """Codes, course names and module titles -> course records."""
+
+    def __init__(self, json_path=JSON_PATH, sem_path=SEM_JSON_PATH):
+        self.json_path = json_path
+        self.sem_path = sem_path
+        self.courses = {}     # code key -> course record
+        self.codes = {}       # code key -> canonical code ("PCC-CSM501")
+        self._first = {}      # first phrase token -> [(tokens, kind, code key, module)], longest first
+        self.build()
+
+    # ----- BUILD -----
+
+    def _semesters(self):
+        """code key -> (semester, subject entry) from sem_json/sem_*.json."""
+        listed = {}
+        try:
+            paths = sorted(self.sem_path.glob("sem_*.json"))
+        except OSError:
+            paths = []
+        for path in paths:
+            doc = RESOURCES.get_document(path)
+            data = doc["data"] if doc else None
+            if not isinstance(data, dict):
+                continue
+            m = _SEMESTER.search(str(data.get("semester", "")))
+            semester = m.group(1) if m else str(data.get("semester", "")).strip()
+            for subject in data.get("subjects", []):
+                if isinstance(subject, dict) and subject.get("course_code"):
+                    listed[code_key(subject["course_code"])] = (semester, subject)
+        return listed
+
+    def _add_phrase(self, tokens, kind, key, module=None):
+        self._first.setdefault(tokens[0], []).append((tokens, kind, key, module))
+
+    def build(self):
+        listed = self._semesters()
+        courses = {}
+        try:
+            paths = [p for p in self.json_path.glob("*.json") if _CODE_FILE.match(p.stem)]
+        except OSError:
+            paths = []
+        for path in sorted(paths):
+            doc = RESOURCES.get_document(path)
+            data = doc["data"] if doc else None
+            if isinstance(data, dict) and data.get("course_code"):
+                courses[code_key(data["course_code"])] = (data, path)
+        # courses only listed in a semester file are served from that listing
+        for key, (_, subject) in listed.items():
+            courses.setdefault(key, (subject, None))
+
+        self.courses, self.codes, self._first = {}, {}, {}
+        for key, (data, path) in courses.items():
+            semester = listed.get(key, (None, None))[0]
+            modules = {}
+            for module in data.get("modules", []):
+                if isinstance(module, dict) and module.get("module_number") is not None:
+                    modules[int(module["module_number"])] = str(module.get("title", ""))
+            course = {
+                "code": data["course_code"],
+                "name": data.get("course_name", ""),
+                "semester": semester,
+                "modules": modules,
+                "path": path,
+                # listing-only courses have no file; their entry is the document
+                "doc": None if path else prepare_document(json.dumps(data, ensure_ascii=False)),
+            }
+            course["notes"] = {None: prepare_document(_note(course, None))}
+            for number in modules:
+                course["notes"][number] = prepare_document(_note(course, number))
+            self.courses[key] = course
+            self.codes[key] = course["code"]
+
+            for tokens in _name_variants(course["name"]):
+                self._add_phrase(tokens, "name", key)
+            for number, title in modules.items():
+                tokens = _phrase(title)
+                if len(tokens) >= MIN_MODULE_TITLE_TOKENS:
+                    self._add_phrase(tokens, "module", key, number)
+
+        for cands in self._first.values():
+            # longest phrase first; course names before module titles of equal length
+            cands.sort(key=lambda c: (-len(c[0]), c[1] != "name"))
+        print(f"[INFO] Course catalog: {len(self.courses)} courses, {len(self.codes)} codes")
+
+    # ----- LOOKUP -----
+
+    def lookup(self, query):
+        """Courses a query is about, most specific first.
+
+        Returns ``[{"course", "module", "matched"}]``: ``matched`` is "code",
+        "name" or "module"; ``module`` is the module number asked for
+        ("module 3", or the matched module title) or None.
+        """
+        text = query.lower()
+        words = _WORD.findall(text)
+        found = {}
+
+        def add(key, matched, module=None):
+            if key not in found:
+                found[key] = {"course": self.courses[key], "module": module, "matched": matched}
+
+        # codes are typed with or without separators: "pcc-csm501", "pcc csm 501"
+        for i in range(len(words)):
+            compact, hit = "", None
+            for word in words[i:i + 3]:
+                compact += word
+                if compact in self.codes:
+                    hit = compact
+            if hit:
+                add(hit, "code")
+
+        tokens = [w for w in words if w not in _CONNECTORS]
+        cued = not COURSE_CUES.isdisjoint(tokens)
+        i = 0
+        while i < len(tokens):
+            step = 1
+            for seq, kind, key, module in self._first.get(tokens[i], ()):
+                if kind == "module" and not cued:
+                    continue
+                if tuple(tokens[i:i + len(seq)]) == seq:
+                    add(key, kind, module)
+                    step = len(seq)
+                    break
+            i += step
+
+        hits = list(found.values())[:MAX_SUBJECT_MATCHES]
+        m = _MODULE.search(text)
+        if m:
+            number = int(m.group(1))
+            for hit in hits:
+                if number in hit["course"]["modules"]:
+                    hit["module"] = number
+        return hits
+
+    def documents(self, hits):
+        """Prepared documents for ``hits``: the catalog note, then the course itself."""
+        docs = []
+        for hit in hits:
+            course = hit["course"]
+            docs.append(course["notes"].get(hit["module"]) or course["notes"][None])
+            doc = RESOURCES.get_document(course["path"]) if course["path"] else course["doc"]
+            if doc is not None:
+                docs.append(doc)
+        return docs
+
+
+def _note(course, module):
+    lines = [f"Course: {course['code']} - {course['name']}"]
+    if course["semester"]:
+        lines.append(f"Semester: {course['semester']}")
+    if module is not None:
+        lines.append(f"Requested module: Module {module} - {course['modules'][module]}")
+    elif course["modules"]:
+        lines.append(f"Modules: {len(course['modules'])}")
+    return "\n".join(lines)
+
+
+COURSE_CATALOG = CourseCatalog()
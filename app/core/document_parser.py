@@ -1,9 +1,19 @@
 """
-Document Parser - Converts JSON documents into human-readable text format
-This ensures the LLM receives structured, parseable context instead of raw JSON
+Document Parser - Converts JSON documents into text for the LLM
+
+Two renderings:
+- compact (default, RENDER_MODE=compact): terse lowercase labels, no
+  separator rules, empty / placeholder fields left out, lists on one line
+  and lists of records as one row each. This is what goes into prompts.
+- readable (RENDER_MODE=readable): the original per-type layouts with
+  headers and rules, kept for debugging.
 """
+import hashlib
 import json
+import os
 import re
+import threading
+from collections import OrderedDict
 
 
 def parse_faculty_document(data):
@@ -11,7 +21,7 @@ def parse_faculty_document(data):
     if not isinstance(data, dict):
         return None
     
-    if "faculty" not in data and "department" not in data:
+    if not isinstance(data.get("faculty"), dict):
         return None
     
     text_parts = []
@@ -21,40 +31,42 @@ def parse_faculty_document(data):
         text_parts.append(f"DEPARTMENT: {data['department']}\n")
     
     # Parse each faculty member
-    if "faculty" in data:
-        for faculty_id, info in data["faculty"].items():
-            text_parts.append("\n" + "="*60)
-            text_parts.append(f"Faculty Member: {info.get('name', 'Unknown')}")
-            text_parts.append("="*60)
-            
-            if "position" in info:
-                text_parts.append(f"Position: {info['position']}")
-            
-            if "qualification" in info:
-                text_parts.append(f"Qualification: {info['qualification']}")
-            
-            if "research_area" in info and isinstance(info["research_area"], list):
-                text_parts.append(f"Research Areas: {', '.join(info['research_area'])}")
-            
-            if "email" in info:
-                text_parts.append(f"Email: {info['email']}")
-            
-            if "phone" in info:
-                text_parts.append(f"Phone: {info['phone']}")
+    for faculty_id, info in data["faculty"].items():
+        text_parts.append("\n" + "="*60)
+        text_parts.append(f"Faculty Member: {info.get('name', 'Unknown')}")
+        text_parts.append("="*60)
+        
+        if "position" in info:
+            text_parts.append(f"Position: {info['position']}")
+        
+        if "qualification" in info:
+            text_parts.append(f"Qualification: {info['qualification']}")
+        
+        if "research_area" in info and isinstance(info["research_area"], list):
+            text_parts.append(f"Research Areas: {', '.join(info['research_area'])}")
+        
+        if "email" in info:
+            text_parts.append(f"Email: {info['email']}")
+        
+        if "phone" in info:
+            text_parts.append(f"Phone: {info['phone']}")
     
     return "\n".join(text_parts)
 
 
+SCHOLARSHIP_FIELDS = [
+    "scholarship_name", "scholarship_id", "scholarship_type",
+    "offered_by", "eligibility", "benefits"
+]
+
+
 def parse_scholarship_document(data):
     """Parse scholarship JSON into human-readable format"""
     if not isinstance(data, dict):
         return None
     
     # Check if this is a scholarship document
-    has_scholarship_fields = any(k in data for k in [
-        "scholarship_name", "scholarship_id", "scholarship_type",
-        "offered_by", "eligibility", "benefits"
-    ])
+    has_scholarship_fields = any(k in data for k in SCHOLARSHIP_FIELDS)
     
     if not has_scholarship_fields:
         return None
@@ -129,7 +141,8 @@ def parse_holiday_document(data):
         text_parts.append("-"*60)
         
         for holiday in data["holidays"]:
-            text_parts.append(f"\n• {holiday.get('name', 'Unknown Holiday')}")
+            # holiday.json names the holiday under "event"
+            text_parts.append(f"\n• {holiday.get('event') or holiday.get('name') or 'Unknown Holiday'}")
             text_parts.append(f"  Date: {holiday.get('date', 'TBD')}")
             if "day" in holiday:
                 text_parts.append(f"  Day: {holiday['day']}")
@@ -175,6 +188,71 @@ def parse_exam_document(data):
     return "\n".join(text_parts)
 
 
+def parse_placement_document(data):
+    """Parse placement JSON into human-readable format"""
+    text_parts = []
+    text_parts.append("="*60)
+    text_parts.append(f"PLACEMENTS: {data.get('department', 'All Departments')}")
+    text_parts.append("="*60)
+
+    for placement in data["placements"]:
+        if not isinstance(placement, dict):
+            continue
+        text_parts.append(f"• {placement.get('name', 'Unknown')} - {placement.get('company', 'Not specified')}")
+
+    return "\n".join(text_parts)
+
+
+def parse_events_document(data):
+    """Parse events JSON into human-readable format"""
+    text_parts = []
+    text_parts.append("="*60)
+    text_parts.append(str(data.get("category", "Events")).upper())
+    text_parts.append("="*60)
+
+    for event in data["events"]:
+        if not isinstance(event, dict):
+            continue
+        text_parts.append(f"\n• {event.get('name', 'Unknown Event')}")
+        text_parts.append(f"  Date: {event.get('date', 'TBD')}")
+        if "department" in event:
+            text_parts.append(f"  Organised By: {event['department']}")
+
+    return "\n".join(text_parts)
+
+
+def _helpline_contacts(category):
+    """A helpline category's contacts as [(name, phone)] (one person or a list)."""
+    people = category.get("contact_persons")
+    if not isinstance(people, list):
+        people = [{"name": category.get("contact_person"), "phone": category.get("phone")}]
+    return [(p.get("name") or "Unknown", p.get("phone") or "Not specified")
+            for p in people if isinstance(p, dict)]
+
+
+def parse_helpline_document(data):
+    """Parse helpline JSON into human-readable format"""
+    text_parts = []
+    text_parts.append("="*60)
+    text_parts.append("HELPLINES")
+    text_parts.append("="*60)
+
+    for category in data["categories"]:
+        if not isinstance(category, dict):
+            continue
+        text_parts.append(f"\n• {category.get('department', 'Helpline')}")
+        for name, phone in _helpline_contacts(category):
+            text_parts.append(f"  Contact: {name}, Phone: {phone}")
+        if isinstance(category.get("keywords"), list):
+            text_parts.append(f"  Topics: {', '.join(category['keywords'])}")
+
+    fallback = data.get("fallback_contact")
+    if isinstance(fallback, dict):
+        text_parts.append(f"\nOther Queries: {fallback.get('name', 'Unknown')}, Phone: {fallback.get('phone', 'Not specified')}")
+
+    return "\n".join(text_parts)
+
+
 def parse_generic_document(data):
     """Parse generic JSON into readable key-value format"""
     if not isinstance(data, dict):
@@ -207,33 +285,326 @@ def parse_generic_document(data):
     return "\n".join(text_parts)
 
 
-def parse_document(json_string):
+# --------------------------------------------------
+# COMPACT RENDERING (LLM CONTEXT)
+# --------------------------------------------------
+
+# "compact" for prompts, "readable" for debugging
+RENDER_MODE = os.getenv("RENDER_MODE", "compact").lower()
+
+_MARKDOWN_EMPHASIS = re.compile(r"\*\*|__")
+
+# placeholder values that carry no information
+EMPTY_VALUES = frozenset(["", "-", "--", "n/a", "na", "nil", "none", "null", "not specified",
+                          "not available", "tbd", "unknown"])
+
+
+def is_empty_value(value):
+    if value is None:
+        return True
+    if isinstance(value, str):
+        return value.strip().lower() in EMPTY_VALUES
+    if isinstance(value, dict):
+        return all(is_empty_value(v) for v in value.values())
+    if isinstance(value, list):
+        return all(is_empty_value(v) for v in value)
+    return False
+
+
+def _label(key):
+    return str(key).strip("_").replace("_", " ").lower()
+
+
+def _text(value):
+    return _MARKDOWN_EMPHASIS.sub("", str(value)).strip()
+
+
+def _is_scalar(value):
+    return not isinstance(value, (dict, list))
+
+
+def _cell(value):
+    """One record field on one line: scalars as-is, scalar lists joined."""
+    if isinstance(value, list):
+        return ", ".join(_text(v) for v in value if not is_empty_value(v))
+    return _text(value)
+
+
+def _flat_record(record):
+    return all(_is_scalar(v) or all(_is_scalar(x) for x in v)
+               for v in record.values() if not is_empty_value(v))
+
+
+def _compact(value, label, depth, out):
+    if is_empty_value(value):
+        return
+    pad = " " * depth
+
+    if isinstance(value, dict):
+        rows = list(value.values())
+        # {"id1": {...}, "id2": {...}}: a list of records keyed by an id
+        if len(rows) > 1 and all(isinstance(r, dict) for r in rows):
+            _compact(rows, label, depth, out)
+            return
+        if label:
+            out.append(f"{pad}{label}:")
+            depth += 1
+        for key, sub in value.items():
+            _compact(sub, _label(key), depth, out)
+        return
+
+    if isinstance(value, list):
+        items = [v for v in value if not is_empty_value(v)]
+        prefix = f"{pad}{label}: " if label else pad
+        if all(_is_scalar(v) for v in items):
+            out.append(prefix + "; ".join(_text(v) for v in items))
+            return
+        if all(isinstance(v, dict) and _flat_record(v) for v in items):
+            keys = list(items[0])
+            if all(list(v) == keys for v in items):
+                # same fields everywhere: label them once, one row per record
+                keys = [k for k in keys if any(not is_empty_value(v[k]) for v in items)]
+                out.append(f"{prefix}({' | '.join(_label(k) for k in keys)})")
+                out.extend(f"{pad}- {' | '.join(_cell(v[k]) if not is_empty_value(v[k]) else '' for k in keys)}"
+                           for v in items)
+            else:
+                if label:
+                    out.append(f"{pad}{label}:")
+                out.extend(f"{pad}- " + "; ".join(f"{_label(k)}: {_cell(x)}" for k, x in v.items()
+                                                   if not is_empty_value(x)) for v in items)
+            return
+        if label:
+            out.append(f"{pad}{label}:")
+            depth += 1
+        for item in items:
+            _compact(item, None, depth, out)
+        return
+
+    text = _text(value)
+    out.append(f"{pad}{label}: {text}" if label else f"{pad}{text}")
+
+
+def render_compact(data):
+    """Compact text for a parsed JSON value (see module docstring)."""
+    out = []
+    _compact(data, None, 0, out)
+    return "\n".join(out)
+
+
+# The compact layouts keep the fields the readable parsers above select
+# for each document type; only the rendering changes.
+
+def compact_faculty_document(data):
+    if not isinstance(data, dict) or not isinstance(data.get("faculty"), dict):
+        return None
+    members = []
+    for info in data["faculty"].values():
+        research = info.get("research_area")
+        members.append({
+            "name": info.get("name", "Unknown"),
+            "position": info.get("position"),
+            "qualification": info.get("qualification"),
+            "research areas": research if isinstance(research, list) else None,
+            "email": info.get("email"),
+            "phone": info.get("phone"),
+        })
+    return render_compact({"department": data.get("department"), "faculty": members})
+
+
+def compact_scholarship_document(data):
+    if not isinstance(data, dict) or not any(k in data for k in SCHOLARSHIP_FIELDS):
+        return None
+    fields = ["official_name", "scholarship_type", "offered_by", "target_group", "academic_level",
+              "introduction", "eligibility", "benefits", "application_process", "important_dates", "website"]
+    selected = {"scholarship": data.get("scholarship_name", "Unknown")}
+    selected.update((k, data[k]) for k in fields if k in data)
+    return render_compact(selected)
+
+
+def compact_holiday_document(data):
+    if not isinstance(data, dict) or "_metadata" not in data or "holidays" not in data:
+        return None
+    meta = data["_metadata"] if isinstance(data["_metadata"], dict) else {}
+    holidays = [{"name": h.get("event") or h.get("name") or "Unknown Holiday", "date": h.get("date", "TBD"),
+                 "day": h.get("day"), "type": h.get("type")}
+                for h in data["holidays"] if isinstance(h, dict)]
+    return render_compact({"title": meta.get("title", "University Holiday Calendar"),
+                           "description": meta.get("description"), "holidays": holidays})
+
+
+def compact_helpline_document(data):
+    rows = [{"department": c.get("department"),
+             "contact": [f"{name} ({phone})" for name, phone in _helpline_contacts(c)],
+             "topics": c.get("keywords")}
+            for c in data["categories"] if isinstance(c, dict)]
+    fallback = data.get("fallback_contact")
+    if isinstance(fallback, dict):
+        fallback = f"{fallback.get('name', 'Unknown')} ({fallback.get('phone', 'Not specified')})"
+    return render_compact({"helplines": rows, "other queries": fallback})
+
+
+# --------------------------------------------------
+# PARSER REGISTRY
+# --------------------------------------------------
+# Every document family declares the schema it handles: keys that must all
+# be present, keys of which one must be present, and the type a key must
+# have when present. A document's top-level key set is its fingerprint; the
+# families whose signature it satisfies are worked out once per fingerprint
+# and memoized, so rendering is one frozenset plus one dict probe instead of
+# a probe per family, and registering a family costs nothing to documents
+# it does not match.
+#
+# Signatures are necessary, not sufficient: a renderer may still return
+# nothing (an empty "faculty" map without a department), and the next matching
+# family – finally the generic renderer – is used instead.
+
+PARSERS = []
+
+DISPATCH_CACHE_SIZE = int(os.getenv("DISPATCH_CACHE_SIZE", "4096"))
+
+_DISPATCH = {}  # fingerprint -> matching registry entries, in priority order
+
+
+def register_parser(name, readable, compact=None, required=(), any_of=(), types=None, priority=100):
     """
-    Main parser function - converts JSON string to human-readable text
-    Returns formatted text that the LLM can easily understand
+    Register a document family. ``readable`` / ``compact`` render a parsed
+    document (``compact=None``: the generic compact rendering); families
+    are tried in ``priority`` order, lowest first.
     """
-    try:
-        data = json.loads(json_string)
-    except json.JSONDecodeError:
-        return json_string  # Return as-is if not valid JSON
-    
-    # Try specialized parsers first
-    parsers = [
-        parse_faculty_document,
-        parse_scholarship_document,
-        parse_holiday_document,
-        parse_exam_document
-    ]
-    
-    for parser in parsers:
-        result = parser(data)
+    entry = {
+        "name": name,
+        "readable": readable,
+        "compact": compact,
+        "required": frozenset(required),
+        "any_of": frozenset(any_of),
+        "types": dict(types or {}),
+        "priority": priority,
+    }
+    PARSERS[:] = [p for p in PARSERS if p["name"] != name] + [entry]
+    PARSERS.sort(key=lambda p: p["priority"])
+    _DISPATCH.clear()
+    return entry
+
+
+def schema_fingerprint(data):
+    """The top-level key set of a JSON object (None for anything else)."""
+    return frozenset(data) if isinstance(data, dict) else None
+
+
+def _signature_matches(entry, keys):
+    if not entry["required"] <= keys:
+        return False
+    return not entry["any_of"] or not entry["any_of"].isdisjoint(keys)
+
+
+def dispatch(data):
+    """Registry entries whose signature ``data`` satisfies, in priority order."""
+    keys = schema_fingerprint(data)
+    if keys is None:
+        return ()
+    entries = _DISPATCH.get(keys)
+    if entries is None:
+        entries = tuple(p for p in PARSERS if _signature_matches(p, keys))
+        if len(_DISPATCH) >= DISPATCH_CACHE_SIZE:
+            _DISPATCH.clear()
+        _DISPATCH[keys] = entries
+    return [p for p in entries
+            if all(isinstance(data[k], t) for k, t in p["types"].items() if k in data)]
+
+
+register_parser("placement", parse_placement_document, render_compact,
+                required=["placements"], types={"placements": list}, priority=10)
+register_parser("events", parse_events_document, render_compact,
+                required=["events"], types={"events": list}, priority=10)
+register_parser("helplines", parse_helpline_document, compact_helpline_document,
+                required=["categories", "fallback_contact"], types={"categories": list}, priority=10)
+register_parser("faculty", parse_faculty_document, compact_faculty_document,
+                required=["faculty"], types={"faculty": dict}, priority=20)
+register_parser("scholarship", parse_scholarship_document, compact_scholarship_document,
+                any_of=SCHOLARSHIP_FIELDS, priority=30)
+register_parser("holiday", parse_holiday_document, compact_holiday_document,
+                required=["_metadata", "holidays"], priority=40)
+register_parser("exam", parse_exam_document,
+                any_of=["exam_schedule", "examinations", "exam"], priority=50)
+
+
+def render_data(data, mode=None):
+    """Text for an already parsed JSON object in ``mode`` (default RENDER_MODE)"""
+    compact = (mode or RENDER_MODE) == "compact"
+    for entry in dispatch(data):
+        render = entry["compact"] if compact else entry["readable"]
+        if render is None:
+            continue
+        result = render(data)
         if result:
             return result
-    
-    # Fallback to generic parser
-    return parse_generic_document(data)
+
+    # Fallback to generic rendering
+    return render_compact(data) if compact else parse_generic_document(data)
+
+
+# --------------------------------------------------
+# PARSED DOCUMENT CACHE
+# --------------------------------------------------
+# Documents are parsed and rendered once, when they are ingested (resource
+# files, index chunks), and kept as records
+#     {"key": content hash, "raw": text, "data": JSON object or None, "text": rendering}
+# so the request path never repeats json.loads or the parser cascade.
+
+RENDER_CACHE_SIZE = int(os.getenv("RENDER_CACHE_SIZE", "20000"))
+
+_RENDER_CACHE = OrderedDict()
+_RENDER_LOCK = threading.Lock()
+
+
+def prepare_document(text):
+    """
+    Parse and render a document once; later calls with the same content are
+    served from the cache keyed by its content hash.
+    """
+    key = hashlib.sha1(text.encode("utf-8")).hexdigest()
+    with _RENDER_LOCK:
+        doc = _RENDER_CACHE.get(key)
+        if doc is not None:
+            _RENDER_CACHE.move_to_end(key)
+            return doc
+
+    try:
+        data = json.loads(text)
+    except (ValueError, TypeError):
+        data = None
+    doc = {
+        "key": key,
+        "raw": text,
+        "data": data,
+        "text": text if data is None else render_data(data),  # not JSON: use as-is
+    }
+
+    with _RENDER_LOCK:
+        _RENDER_CACHE[key] = doc
+        while len(_RENDER_CACHE) > RENDER_CACHE_SIZE:
+            _RENDER_CACHE.popitem(last=False)
+    return doc
+
+
+def prepare_documents(texts):
+    return [prepare_document(t) for t in texts]
+
+
+def parse_document(json_string, mode=None):
+    """
+    Main parser function - converts JSON string to text for the LLM
+    (``mode="readable"`` for the debugging layout)
+    """
+    return _doc_text(prepare_document(json_string), mode)
+
+
+def parse_documents(docs, mode=None):
+    """Render multiple documents (prepared records or raw strings)"""
+    return [_doc_text(doc, mode) if isinstance(doc, dict) else parse_document(doc, mode) for doc in docs]
 
 
-def parse_documents(json_strings):
-    """Parse multiple JSON documents"""
-    return [parse_document(doc) for doc in json_strings]
+def _doc_text(doc, mode):
+    if mode is None or mode == RENDER_MODE or doc.get("data") is None:
+        return doc["text"]
+    return render_data(doc["data"], mode)
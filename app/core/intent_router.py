@@ -0,0 +1,145 @@
+"""
+Intent router – one pass over the query instead of a regex cascade.
+
+The query is split into tokens once and every token is a single dictionary
+probe into a table of trigger phrases keyed by their first token (a
+token-level Aho-Corasick: multi-word phrases are confirmed by comparing the
+following tokens). The few triggers that really are patterns (course codes)
+share one compiled regex. The winning intent is the highest-priority one
+that matched anywhere, which is what the old sequence of ``re.search`` calls
+returned; ``route`` also reports every matched trigger and its span.
+
+The chat path routes with INTENT_RULES; the admin panel builds its own
+router from SESSION_CATEGORY_RULES (``IntentRouter.from_keywords``).
+"""
+
+import re
+
+_TOKEN = re.compile(r"\w+|[^\w\s]")
+
+# Priority order: the first intent with a matching trigger wins.
+# Triggers are phrases matched on whole tokens (case-insensitive, any
+# whitespace between words) or compiled regexes for pattern triggers.
+INTENT_RULES = [
+    ("faculty", ["hod", "faculty", "professor", "teacher", "dr."]),
+    ("subject", [re.compile(r"\b(?:aum|bscm|escm|hsmcm|pcc|pec)(?:-[a-z]+)?[-\s]?\d+[a-z]?\b")]),
+    ("events", ["hackathon", "event", "tech fest", "techfest", "competition", "seminar", "workshop"]),
+    ("placement", ["placement", "placed", "offer", "offers", "recruitment", "job offer", "joboffer", "hired"]),
+    ("scholarship", ["scholarship", "stipend", "grant", "svmcm", "kanyashree", "nabanna", "aikyashree", "mcm"]),
+    ("holiday", ["holiday", "vacation", "leave"]),
+    ("exam", ["exam", "attendance"]),
+    ("library", ["library", "reading room"]),
+    ("rules", ["rule", "policy", "fine", "allowed", "banned"]),
+    ("about", ["brainware university", "chancellor", "vice chancellor", "vc", "founder",
+               "campus", "address", "location", "established"]),
+]
+
+DEFAULT_INTENT = "general"
+
+
+class IntentRouter:
+    """Single-pass matcher over prioritized ``(intent, [trigger, ...])`` rules.
+
+    With ``plurals`` a trigger also matches with an "s" on its last word
+    ("book" matches "books").
+    """
+
+    def __init__(self, rules, default=DEFAULT_INTENT, plurals=False):
+        self.default = default
+        self.priority = {}
+        self._first = {}          # first token -> [(tokens, intent, phrase), ...], longest first
+        self._pattern_intents = {}
+        patterns = []
+        for intent, triggers in rules:
+            self.priority.setdefault(intent, len(self.priority))
+            for trigger in triggers:
+                if isinstance(trigger, re.Pattern):
+                    name = f"p{len(self._pattern_intents)}"
+                    self._pattern_intents[name] = intent
+                    patterns.append(f"(?P<{name}>{trigger.pattern})")
+                    continue
+                tokens = tuple(_TOKEN.findall(trigger.lower()))
+                if not tokens:
+                    continue
+                variants = [tokens]
+                if plurals:
+                    variants.append(tokens[:-1] + (tokens[-1] + "s",))
+                for seq in variants:
+                    self._first.setdefault(seq[0], []).append((seq, intent, trigger))
+        for cands in self._first.values():
+            cands.sort(key=lambda c: -len(c[0]))
+        self._pattern = re.compile("|".join(patterns)) if patterns else None
+
+    @classmethod
+    def from_keywords(cls, rules, default=None):
+        """Router for ``{intent: [keyword, ...]}`` (insertion order is priority)."""
+        return cls(list(rules.items()), default=default, plurals=True)
+
+    def _scan(self, text):
+        """``[(token index, token count, intent, phrase)]`` of the phrase triggers in ``text``."""
+        tokens = _TOKEN.findall(text)
+        first = self._first
+        hits = []
+        for i, tok in enumerate(tokens):
+            cands = first.get(tok)
+            if cands is None:
+                continue
+            for seq, intent, phrase in cands:
+                n = len(seq)
+                if n == 1 or tuple(tokens[i:i + n]) == seq:
+                    hits.append((i, n, intent, phrase))
+        return hits
+
+    def intents(self, query):
+        """Set of every intent with at least one matching trigger."""
+        text = query.lower()
+        tokens = _TOKEN.findall(text)
+        found = set()
+        joined = None
+        # set intersection finds the candidate phrases without a Python loop per token
+        for tok in self._first.keys() & set(tokens):
+            for seq, intent, _ in self._first[tok]:
+                if len(seq) > 1:
+                    if joined is None:
+                        joined = " " + " ".join(tokens) + " "
+                    if " " + " ".join(seq) + " " not in joined:
+                        continue
+                found.add(intent)
+        if self._pattern is not None:
+            found.update(self._pattern_intents[m.lastgroup] for m in self._pattern.finditer(text))
+        return found
+
+    def intent(self, query):
+        """Winning intent only (no spans): the fast path behind detect_intent."""
+        found = self.intents(query)
+        if not found:
+            return self.default
+        return min(found, key=self.priority.__getitem__)
+
+    def matches(self, query):
+        """Every ``{"intent", "trigger", "span"}`` found in ``query``, in text order."""
+        text = query.lower()
+        found = []
+        hits = self._scan(text)
+        if hits:
+            spans = [m.span() for m in _TOKEN.finditer(text)]
+            for i, n, intent, phrase in hits:
+                found.append({"intent": intent, "trigger": phrase,
+                              "span": (spans[i][0], spans[i + n - 1][1])})
+        if self._pattern is not None:
+            for m in self._pattern.finditer(text):
+                found.append({"intent": self._pattern_intents[m.lastgroup], "trigger": m.group(),
+                              "span": m.span()})
+        found.sort(key=lambda f: f["span"])
+        return found
+
+    def route(self, query):
+        """``{"intent": winner, "matches": [...]}`` for ``query``."""
+        found = self.matches(query)
+        if not found:
+            return {"intent": self.default, "matches": []}
+        winner = min(found, key=lambda f: self.priority[f["intent"]])["intent"]
+        return {"intent": winner, "matches": found}
+
+
+INTENT_ROUTER = IntentRouter(INTENT_RULES)
@@ -1,5 +1,16 @@
-def build_prompt(query, context):    
-    return f"""
+"""
+Prompt for the campus assistant.
+
+The rules (identity, classification, formatting) are the same for every
+request and go to Gemini once as the system instruction
+(``SYSTEM_INSTRUCTION``, registered as cached content by the Gemini
+client); only ``build_user_prompt`` - the context and the question -
+travels per request. ``build_prompt`` is the single-string form of both.
+"""
+
+import hashlib
+
+SYSTEM_INSTRUCTION = """
 SYSTEM IDENTITY AND ROLE
 ------------------------
 
@@ -233,7 +244,9 @@ You are always acting as:
 Campus Assistant
 Brainware University
 
+""".strip()
 
+USER_PROMPT = """
 --------------------------------------------------
 CONTEXT:
 {context}
@@ -243,3 +256,18 @@ QUESTION:
 
 ANSWER:
 """.strip()
+
+
+def build_user_prompt(query, context):
+    """The per-request part: retrieved context and the student's question."""
+    return USER_PROMPT.format(context=context, query=query)
+
+
+def build_prompt(query, context):
+    """System instruction and user prompt as one string (for callers that
+    send a single prompt)."""
+    return SYSTEM_INSTRUCTION + "\n\n\n" + build_user_prompt(query, context)
+
+
+# Changes whenever the instruction or the template does; cached answers are keyed by it
+PROMPT_VERSION = hashlib.sha1((SYSTEM_INSTRUCTION + USER_PROMPT).encode("utf-8")).hexdigest()[:12]
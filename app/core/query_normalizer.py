@@ -0,0 +1,318 @@
+"""
+Query normalizer – typo and course-code cleanup in front of detect_intent.
+
+"kannyashree", "scolarship" or "bscm 301" miss the keyword intents and the
+subject-file lookup, fall through to ``general`` and cost a vector search
+plus an LLM call. ``QueryNormalizer.normalize`` rewrites them first:
+
+- course codes are canonicalized to the codes in the course catalog
+  ("bscm 301", "Bscm-301" -> "bscm301"; "pcc csm 401" -> "pcc-csm401")
+- unknown words are corrected against the project's own vocabulary
+  (scholarship keywords, intent trigger words, faculty and course names)
+  with a symmetric-delete (SymSpell) index: all deletes of every
+  vocabulary word are precomputed, so a lookup is a handful of dictionary
+  probes plus an edit-distance check of the few candidates
+
+Words that occur in the indexed corpus are not "corrected" (save rare
+misspellings the data itself carries), so ordinary English ("hold",
+"fees", "date") stays as typed.
+"""
+
+import re
+
+from app.core.course_catalog import COURSE_CATALOG, code_key
+from app.core.intent_router import INTENT_RULES
+from app.core.resource_map import JSON_PATH, RESOURCE_MAP
+from app.core.resource_cache import RESOURCES
+from app.core.scholarship_matcher import SCHOLARSHIPS
+
+_WORD = re.compile(r"[a-z]+")
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+# a code as students type it: letters, optional second letter group, digits
+_CODE = re.compile(r"\b([a-z]{2,6})(?:[-\s]?([a-z]{2,4}))?[-\s]?(\d{1,3}[a-z]?)\b")
+
+
+# shortest word considered for correction, and the edit distance allowed
+MIN_WORD_LENGTH = 4
+
+# a corpus word is still corrected when it is a slip (dropped, doubled or
+# swapped letter) of a long vocabulary word that is this many times more
+# frequent in the corpus: the data itself spells "kannyashree" a few times
+# next to many "kanyashree". Short words and one-letter substitutions are
+# left alone, they are mostly real words ("role" / "rule", "date" / "data").
+RARE_SPELLING_RATIO = 3
+RARE_SPELLING_MIN_LENGTH = 8
+
+# inflections are not typos: "teaches" is not "teacher", "students" not "student"
+_SUFFIXES = ("ing", "es", "ed", "er", "s")
+
+CORRECTION_CACHE_SIZE = 10000
+
+
+def max_distance(word):
+    return 1 if len(word) < 7 else 2
+
+
+def edit_distance(a, b, limit):
+    """Optimal string alignment distance, or ``limit + 1`` once it exceeds ``limit``."""
+    # a typo touches a few characters; the shared prefix / suffix costs nothing
+    start = 0
+    while start < len(a) and start < len(b) and a[start] == b[start]:
+        start += 1
+    end = 0
+    while end < len(a) - start and end < len(b) - start and a[-1 - end] == b[-1 - end]:
+        end += 1
+    a, b = a[start:len(a) - end], b[start:len(b) - end]
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    if not a or not b:
+        return max(len(a), len(b))
+    # only cells within ``limit`` of the diagonal can stay within ``limit``
+    big = limit + 1
+    la, lb = len(a), len(b)
+    prev2 = None
+    prev = [j if j <= limit else big for j in range(lb + 1)]
+    for i in range(1, la + 1):
+        cur = [big] * (lb + 1)
+        if i <= limit:
+            cur[0] = i
+        best = cur[0]
+        ai = a[i - 1]
+        for j in range(max(1, i - limit), min(lb, i + limit) + 1):
+            v = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ai != b[j - 1]))
+            if i > 1 and j > 1 and ai == b[j - 2] and a[i - 2] == b[j - 1]:
+                v = min(v, prev2[j - 2] + 1)
+            cur[j] = v
+            if v < best:
+                best = v
+        if best > limit:
+            return big
+        prev2, prev = prev, cur
+    return min(prev[lb], big)
+
+
+def _stem(word):
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            return word[:-len(suffix)]
+    return word
+
+
+def _slip(a, b):
+    """True when ``a`` and ``b`` differ by one dropped, doubled or swapped letter."""
+    if len(a) == len(b):
+        diff = [i for i in range(len(a)) if a[i] != b[i]]
+        return (len(diff) == 2 and diff[1] == diff[0] + 1
+                and a[diff[0]] == b[diff[1]] and a[diff[1]] == b[diff[0]])
+    short, long_ = sorted((a, b), key=len)
+    if len(long_) - len(short) != 1:
+        return False
+    return any(long_[:i] + long_[i + 1:] == short for i in range(len(long_)))
+
+
+class SpellingIndex:
+    """Symmetric-delete spelling index (SymSpell) over a small vocabulary.
+
+    As in SymSpell, deletes are generated from the first ``prefix_length``
+    characters only; candidates are then checked on the whole word.
+    """
+
+    def __init__(self, distance=2, prefix_length=7):
+        self.distance = distance
+        self.prefix_length = prefix_length
+        self.words = {}       # word -> frequency
+        self.deletes = {}     # delete variant of the prefix -> [words]
+
+    def __len__(self):
+        return len(self.words)
+
+    @staticmethod
+    def _variants(word, distance):
+        variants = {word}
+        frontier = {word}
+        for _ in range(distance):
+            frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))} - variants
+            variants |= frontier
+        return variants
+
+    def add(self, word, count=1):
+        if word in self.words:
+            self.words[word] += count
+            return
+        self.words[word] = count
+        for variant in self._variants(word[:self.prefix_length], self.distance):
+            self.deletes.setdefault(variant, []).append(word)
+
+    def lookup(self, word, distance=None):
+        """Closest vocabulary word as ``(word, distance)``, or None.
+
+        Ties on distance go to the more frequent word.
+        """
+        distance = self.distance if distance is None else min(distance, self.distance)
+        if word in self.words:
+            return word, 0
+        best = None
+        seen = set()
+        for variant in self._variants(word[:self.prefix_length], distance):
+            for cand in self.deletes.get(variant, ()):
+                if cand in seen:
+                    continue
+                seen.add(cand)
+                d = edit_distance(word, cand, distance)
+                if d > distance:
+                    continue
+                key = (d, -self.words[cand], cand)
+                if best is None or key < best[0]:
+                    best = (key, cand, d)
+        return (best[1], best[2]) if best else None
+
+
+def course_codes(catalog=COURSE_CATALOG):
+    """Compact code ("pcccsm401") -> canonical code ("pcc-csm401") of every catalogued course."""
+    return {key: code.lower() for key, code in catalog.codes.items()}
+
+
+def _faculty_names():
+    names = []
+    for doc in RESOURCES.get_documents(RESOURCE_MAP.get("faculty", [])):
+        data = doc.get("data")
+        if isinstance(data, dict) and isinstance(data.get("faculty"), dict):
+            names.extend(str(info.get("name", "")) for info in data["faculty"].values()
+                         if isinstance(info, dict))
+    return names
+
+
+def project_vocabulary():
+    """``{word: weight}`` from scholarship keywords, intent triggers, faculty names,
+    course names and the resource file names ("library_and_reading_room")."""
+    vocab = {}
+
+    def add(text, weight):
+        for word in _WORD.findall(text.lower()):
+            if len(word) >= MIN_WORD_LENGTH:
+                vocab[word] = vocab.get(word, 0) + weight
+
+    for scholarship in SCHOLARSHIPS:
+        for keyword in scholarship.get("keywords", []):
+            add(keyword, 3)
+    for _, triggers in INTENT_RULES:
+        for trigger in triggers:
+            if isinstance(trigger, str):
+                add(trigger, 5)
+    for name in _faculty_names():
+        add(name, 1)
+    for course in COURSE_CATALOG.courses.values():
+        add(course["name"], 2)
+    try:
+        stems = [p.stem for p in JSON_PATH.glob("*.json")]
+    except OSError:
+        stems = []
+    for stem in stems:
+        if code_key(stem) not in COURSE_CATALOG.codes:
+            add(stem.replace("_", " "), 2)
+    return vocab
+
+
+class QueryNormalizer:
+    """Rewrites misspelt words and loosely typed course codes in a query."""
+
+    def __init__(self, vocabulary=None, known_words=None, codes=None):
+        vocabulary = project_vocabulary() if vocabulary is None else vocabulary
+        self.codes = course_codes() if codes is None else codes
+        self.spelling = SpellingIndex(distance=2)
+        for word, count in vocabulary.items():
+            self.spelling.add(word, count)
+        # corpus word -> occurrences; corpus words are (mostly) spelled right
+        self.known = dict(known_words or {})
+        # a typo closer to an ordinary corpus word than to the vocabulary
+        # ("learing": "learning" vs "reading") is not ours to fix
+        self.corpus = SpellingIndex(distance=1)
+        for word, count in self.known.items():
+            if len(word) >= MIN_WORD_LENGTH:
+                self.corpus.add(word, count)
+        self._cache = {}
+
+    @classmethod
+    def from_texts(cls, texts, **kwargs):
+        """Normalizer whose known words are the words of ``texts`` (the corpus)."""
+        known = {}
+        for text in texts:
+            for word in _WORD.findall(text.lower()):
+                known[word] = known.get(word, 0) + 1
+        return cls(known_words=known, **kwargs)
+
+    def _code(self, m):
+        """``(start, canonical code)`` for a ``_CODE`` match, or None.
+
+        "of escm 301" matches as a whole; the code is then its tail.
+        """
+        prefix, middle, number = m.groups()
+        code = self.codes.get(prefix + (middle or "") + number)
+        if code:
+            return m.start(), code
+        if middle:
+            code = self.codes.get(middle + number)
+            if code:
+                return m.start(2), code
+        return None
+
+    def correct(self, word):
+        """Vocabulary spelling of ``word``, or None when it should stay."""
+        if len(word) < MIN_WORD_LENGTH or word in self.spelling.words:
+            return None
+        if word in self._cache:
+            return self._cache[word]
+
+        fixed = None
+        hit = self.spelling.lookup(word, max_distance(word))
+        if hit is not None and _stem(hit[0]) != _stem(word):
+            cand = hit[0]
+            seen = self.known.get(word, 0)
+            if not seen:
+                if hit[1] == 1 or self.corpus.lookup(word, hit[1] - 1) is None:
+                    fixed = cand
+            elif (len(cand) >= RARE_SPELLING_MIN_LENGTH and _slip(word, cand)
+                  and self.known.get(cand, 0) >= RARE_SPELLING_RATIO * seen):
+                fixed = cand
+
+        if len(self._cache) >= CORRECTION_CACHE_SIZE:
+            self._cache.clear()
+        self._cache[word] = fixed
+        return fixed
+
+    def normalize(self, query):
+        """``{"query": rewritten, "corrections": [{"from", "to", "span"}]}``.
+
+        The rewritten query is lower-cased only where something changed;
+        everything else is kept as typed.
+        """
+        # spans found in ``text`` are cut out of ``query``: a character whose
+        # lower case is longer ("İ" -> "i̇") stays as typed so offsets agree
+        text = "".join(c if len(c.lower()) != 1 else c.lower() for c in query)
+        edits = []
+        for m in _CODE.finditer(text):
+            found = self._code(m)
+            if found and text[found[0]:m.end()] != found[1]:
+                edits.append((found[0], m.end(), found[1]))
+
+        covered = [(a, b) for a, b, _ in edits]
+        for m in _TOKEN.finditer(text):
+            word = m.group()
+            if not word.isalpha() or any(a <= m.start() < b for a, b in covered):
+                continue
+            fixed = self.correct(word)
+            if fixed:
+                edits.append((m.start(), m.end(), fixed))
+
+        if not edits:
+            return {"query": query, "corrections": []}
+        edits.sort()
+        out, pos, corrections = [], 0, []
+        for start, end, replacement in edits:
+            out.append(query[pos:start])
+            out.append(replacement)
+            corrections.append({"from": query[start:end], "to": replacement, "span": (start, end)})
+            pos = end
+        out.append(query[pos:])
+        return {"query": "".join(out), "corrections": corrections}
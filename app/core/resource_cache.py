@@ -0,0 +1,106 @@
+"""
+Resource cache – in-memory copies of the authoritative resource files.
+
+Every file in RESOURCE_MAP is read, parsed and rendered once at start-up
+(``preload``) and then served from memory. A file is re-read only when its
+mtime or size changed, and that is checked at most once per
+RESOURCE_CHECK_INTERVAL seconds, so faculty / exam / holiday / rules /
+library queries do no filesystem I/O on the hot path.
+"""
+
+import os
+import threading
+import time
+from pathlib import Path
+
+from app.core.document_parser import prepare_document
+from app.core.resource_map import RESOURCE_MAP, BASE_RESOURCE_PATH
+
+# seconds between stat() checks of a cached file (0 = check on every access)
+RESOURCE_CHECK_INTERVAL = float(os.getenv("RESOURCE_CHECK_INTERVAL", "2"))
+
+
+class ResourceCache:
+    def __init__(self, check_interval=RESOURCE_CHECK_INTERVAL):
+        self.check_interval = check_interval
+        # path -> {"text", "doc", "mtime", "size", "checked"}; "text" is None for
+        # missing files, "doc" is the prepared (parsed + rendered) document
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.reads = 0
+
+    def _stat(self, path):
+        try:
+            st = path.stat()
+        except OSError:
+            return None, None
+        return st.st_mtime_ns, st.st_size
+
+    def _read(self, path, mtime, size):
+        text = None
+        if mtime is not None:
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    text = f.read()
+                self.reads += 1
+            except Exception:
+                text = None
+        doc = prepare_document(text) if text is not None else None
+        return {"text": text, "doc": doc, "mtime": mtime, "size": size, "checked": time.monotonic()}
+
+    def get(self, path):
+        """Return the text of ``path``, or None if it does not exist / is unreadable."""
+        entry = self._entry(path)
+        return entry["text"]
+
+    def get_document(self, path):
+        """Return the prepared document for ``path`` (or None)."""
+        return self._entry(path)["doc"]
+
+    def _entry(self, path):
+        path = Path(path)
+        entry = self._entries.get(path)
+        now = time.monotonic()
+        if entry is not None and now - entry["checked"] < self.check_interval:
+            return entry
+
+        mtime, size = self._stat(path)
+        if entry is not None and (mtime, size) == (entry["mtime"], entry["size"]):
+            entry["checked"] = now
+            return entry
+
+        with self._lock:
+            entry = self._read(path, mtime, size)
+            self._entries[path] = entry
+        return entry
+
+    def get_documents(self, paths):
+        """Prepared documents of the existing files among ``paths``, in order."""
+        docs = []
+        for path in paths:
+            doc = self.get_document(path)
+            if doc is not None:
+                docs.append(doc)
+        return docs
+
+    def preload(self, resource_map=RESOURCE_MAP):
+        """Read every mapped file into memory. Returns the missing paths."""
+        missing = []
+        for intent, paths in resource_map.items():
+            for path in paths:
+                if self.get(path) is None:
+                    missing.append(path)
+                    print(f"[WARNING] Resource for intent '{intent}' is missing: {path}")
+        loaded = sum(len(paths) for paths in resource_map.values()) - len(missing)
+        print(f"[INFO] Preloaded {loaded} resource files from {BASE_RESOURCE_PATH}")
+        return missing
+
+    def stats(self):
+        return {
+            "files": sum(1 for e in self._entries.values() if e["text"] is not None),
+            "missing": sum(1 for e in self._entries.values() if e["text"] is None),
+            "disk_reads": self.reads,
+        }
+
+
+RESOURCES = ResourceCache()
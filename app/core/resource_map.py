@@ -1,12 +1,17 @@
+import os
 from pathlib import Path
 
-BASE_RESOURCE_PATH = Path(
-    r"C:\Users\Seratul Mustakim\Desktop\Ai saves\College_chatbot\Resources"
-)
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+
+# Resources live inside the project; RESOURCE_PATH overrides for deployments
+BASE_RESOURCE_PATH = Path(os.getenv("RESOURCE_PATH", str(BASE_DIR / "Resources")))
 
 JSON_PATH = BASE_RESOURCE_PATH / "json"
 PDF_PATH = BASE_RESOURCE_PATH / "pdf"
 
+# per-semester course listings (sem_1.json ... sem_5.json)
+SEM_JSON_PATH = Path(os.getenv("SEM_JSON_PATH", str(BASE_DIR / "sem_json")))
+
 RESOURCE_MAP = {
     "faculty": [
         JSON_PATH / "brainware_cse_ai_faculty.json"
@@ -8,55 +8,55 @@ RULES ENFORCED:
 - Vector search is allowed ONLY for general / vague queries
 """
 
-import re
+import os
 from pathlib import Path
 from typing import List
 
-from app.core.document_parser import parse_documents
+from app.core.document_parser import parse_documents, prepare_document
 from app.core.context_extractor import extract_relevant_context
-from app.core.resource_map import RESOURCE_MAP, JSON_PATH
+from app.core.course_catalog import COURSE_CATALOG
+from app.core.resource_map import RESOURCE_MAP
+from app.core.resource_cache import RESOURCES
+
+# Passages scoring below this cosine similarity are not sent to the LLM.
+# Unset by default: every top-k passage is kept.
+VECTOR_MIN_SCORE = float(os.environ["VECTOR_MIN_SCORE"]) if os.environ.get("VECTOR_MIN_SCORE") else None
+
+# "hybrid" (BM25 + vector, see VectorIndex.search_hybrid) or "vector" only
+RETRIEVAL_MODE = os.environ.get("RETRIEVAL_MODE", "hybrid").lower()
 
 
 # --------------------------------------------------
 # LOW-LEVEL FILE LOADER
 # --------------------------------------------------
 
-def _load_files(file_paths: List[Path]) -> List[str]:
-    """Load raw text from a list of file paths."""
-    docs = []
-
-    for path in file_paths:
-        if not path.exists():
-            continue
-
-        try:
-            with open(path, "r", encoding="utf-8") as f:
-                docs.append(f.read())
-        except Exception:
-            continue
-
-    return docs
+def _load_documents(file_paths: List[Path]) -> List[dict]:
+    """Return prepared (parsed + rendered) documents of the existing files."""
+    return RESOURCES.get_documents(file_paths)
 
 
 # --------------------------------------------------
-# SUBJECT CODE RESOLUTION (BSCM / ESCM / PCC / PEC)
+# SUBJECT RESOLUTION (COURSE CATALOG: CODES, NAMES, MODULES)
 # --------------------------------------------------
 
-def _resolve_subject_file(query: str) -> List[str]:
+def _resolve_subject_file(query: str) -> List[dict]:
     """
-    Resolve subject JSON dynamically from subject code.
-    Example: BSCM301 → BSCM301.json
+    Resolve the course(s) a query is about through the course catalog.
+    Example: "pcc csm 501" → PCC-CSM501.json,
+             "module 3 of semiconductor physics" → BSCM101.json (+ module note)
     """
-    match = re.search(r"\b(bscm|escm|pcc|pec)[-\s]?\d+\b", query.lower())
-    if not match:
-        return []
+    return COURSE_CATALOG.documents(COURSE_CATALOG.lookup(query))
 
-    code = match.group(0).upper().replace(" ", "")
-    file_path = JSON_PATH / f"{code}.json"
-
-    if file_path.exists():
-        return _load_files([file_path])
 
+def source_files(query: str, intent: str) -> List[Path]:
+    """
+    Files the context for ``query`` is built from (the intent's resource
+    files or the subject's course files); empty for vector search.
+    """
+    if intent in RESOURCE_MAP and RESOURCE_MAP[intent]:
+        return list(RESOURCE_MAP[intent])
+    if intent == "subject":
+        return [hit["course"]["path"] for hit in COURSE_CATALOG.lookup(query) if hit["course"]["path"]]
     return []
 
 
@@ -64,22 +64,27 @@ def _resolve_subject_file(query: str) -> List[str]:
 # MAIN RETRIEVER (AUTHORITATIVE)
 # --------------------------------------------------
 
-def retrieve(query: str, intent: str, vector_index=None, fallback_docs=None):
+def retrieve(query: str, intent: str, vector_index=None, fallback_docs=None, with_scores=False):
     """
     Retrieve context for a query based on strict authority rules.
 
+    With ``with_scores`` the result is ``(text, score)`` pairs; the score is
+    the search score of a vector / hybrid passage and None for fixed files
+    and extracted records, which are already in authority order.
+
     NOTE:
     - fallback_docs is intentionally accepted for backward compatibility
     - fallback_docs is NOT used for authoritative queries
     """
 
     raw_docs = []
+    scores = None
 
     # --------------------------------------------------
     # 1. AUTHORITATIVE INTENT → FIXED FILES
     # --------------------------------------------------
     if intent in RESOURCE_MAP and RESOURCE_MAP[intent]:
-        raw_docs = _load_files(RESOURCE_MAP[intent])
+        raw_docs = _load_documents(RESOURCE_MAP[intent])
 
     # --------------------------------------------------
     # 2. SUBJECT CODE → DYNAMIC FILE
@@ -91,13 +96,18 @@ def retrieve(query: str, intent: str, vector_index=None, fallback_docs=None):
     # 3. GENERAL / NON-AUTHORITATIVE → VECTOR SEARCH
     # --------------------------------------------------
     elif intent == "general" and vector_index is not None:
-        semantic_results = vector_index.search(query, k=5)
-        if semantic_results:
-            raw_docs = semantic_results
+        if RETRIEVAL_MODE == "vector":
+            hits = vector_index.search_batch([query], k=5, min_score=VECTOR_MIN_SCORE)[0]
+        else:
+            # BM25 + vector fusion; exact codes / names may skip embedding
+            hits = vector_index.search_hybrid(query, k=5, min_score=VECTOR_MIN_SCORE)
+        if hits:
+            raw_docs = [prepare_document(hit["text"]) for hit in hits]
+            scores = [hit["score"] for hit in hits]
 
         # optional fallback (only for general intent)
         elif fallback_docs:
-            raw_docs = fallback_docs
+            raw_docs = [prepare_document(doc) for doc in fallback_docs]
 
     # --------------------------------------------------
     # 4. NO DATA FOUND
@@ -106,7 +116,7 @@ def retrieve(query: str, intent: str, vector_index=None, fallback_docs=None):
         return []
 
     # --------------------------------------------------
-    # 5. CONTEXT EXTRACTION FIRST (needs raw JSON for faculty/HOD)
+    # 5. CONTEXT EXTRACTION FIRST (needs the parsed JSON for faculty/HOD)
     # --------------------------------------------------
     extracted_docs = extract_relevant_context(query, raw_docs)
 
@@ -114,6 +124,12 @@ def retrieve(query: str, intent: str, vector_index=None, fallback_docs=None):
         return []
 
     # --------------------------------------------------
-    # 6. PARSE TO HUMAN-READABLE TEXT FOR THE LLM
+    # 6. HUMAN-READABLE TEXT FOR THE LLM (rendered at ingest time)
     # --------------------------------------------------
-    return parse_documents(extracted_docs)
+    texts = parse_documents(extracted_docs)
+    if not with_scores:
+        return texts
+    if scores is None or extracted_docs is not raw_docs:
+        # no search scores, or extraction replaced the passages
+        scores = [None] * len(texts)
+    return list(zip(texts, scores))
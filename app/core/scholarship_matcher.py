@@ -1,4 +1,5 @@
 import json
+import re
 from pathlib import Path
 
 # Mapping between scholarship_id and slug
@@ -32,24 +33,88 @@ def load_scholarship_quick_data():
         print(f"Error loading scholarship quick data: {e}")
         return []
 
+
+_TOKEN = re.compile(r"\w+")
+
+
+class ScholarshipMatcher:
+    """
+    Keyword automaton over the scholarship keywords, built once.
+
+    Keywords are matched on whole tokens ("mcm" no longer matches inside
+    "svmcm"). Keywords are keyed by their first token; scanning the query
+    left to right, the longest keyword starting at a token wins and the scan
+    continues after it, so "aikyashree svmcm" is one match for SVMCM rather
+    than Aikyashree + SVMCM. A keyword also matches with an "s" on its last
+    word ("reliance scholarships").
+    """
+
+    def __init__(self, scholarships):
+        self.scholarships = scholarships
+        # first token -> [(tokens, keyword, scholarship index), ...], longest first
+        self._first = {}
+        for i, scholarship in enumerate(scholarships):
+            for keyword in scholarship.get('keywords', []):
+                tokens = tuple(_TOKEN.findall(keyword.lower()))
+                if not tokens:
+                    continue
+                for seq in (tokens, tokens[:-1] + (tokens[-1] + "s",)):
+                    self._first.setdefault(seq[0], []).append((seq, keyword, i))
+        for cands in self._first.values():
+            cands.sort(key=lambda c: (-len(c[0]), -len(c[1])))
+
+    def match(self, query):
+        """
+        Every scholarship named in ``query``, most specific first.
+
+        Returns ``[{"scholarship", "slug", "keyword", "span"}, ...]``: one
+        entry per scholarship, ranked by the number of keyword tokens matched
+        (then keyword length, then position). ``span`` is the character range
+        of the keyword in ``query``.
+        """
+        text = query.lower()
+        spans = [m.span() for m in _TOKEN.finditer(text)]
+        tokens = [text[a:b] for a, b in spans]
+        best = {}
+        i = 0
+        while i < len(tokens):
+            hits = [(seq, keyword, idx) for seq, keyword, idx in self._first.get(tokens[i], ())
+                    if tuple(tokens[i:i + len(seq)]) == seq]
+            if not hits:
+                i += 1
+                continue
+            # candidates are longest first; every scholarship sharing that
+            # longest keyword matches here
+            n = len(hits[0][0])
+            span = (spans[i][0], spans[i + n - 1][1])
+            for seq, keyword, idx in hits:
+                if len(seq) != n:
+                    break
+                rank = (-n, -len(keyword), i)
+                if idx not in best or rank < best[idx][0]:
+                    best[idx] = (rank, keyword, span)
+            i += n
+
+        ranked = sorted(best.items(), key=lambda item: item[1][0])
+        return [{
+            "scholarship": self.scholarships[idx],
+            "slug": SCHOLARSHIP_ID_TO_SLUG.get(self.scholarships[idx].get('scholarship_id', ''), ''),
+            "keyword": keyword,
+            "span": span,
+        } for idx, (rank, keyword, span) in ranked]
+
+
+SCHOLARSHIPS = load_scholarship_quick_data()
+SCHOLARSHIP_MATCHER = ScholarshipMatcher(SCHOLARSHIPS)
+
+
 def match_scholarship(query):
     """
     Match user query with scholarship keywords and return matched scholarship data.
     Returns None if no match found.
     """
-    scholarships = load_scholarship_quick_data()
-    query_lower = query.lower()
-    
-    # Try to find a match based on keywords
-    for scholarship in scholarships:
-        keywords = scholarship.get('keywords', [])
-        
-        # Check if any keyword is in the query
-        for keyword in keywords:
-            if keyword.lower() in query_lower:
-                return scholarship
-    
-    return None
+    matches = SCHOLARSHIP_MATCHER.match(query)
+    return matches[0]["scholarship"] if matches else None
 
 def get_scholarship_response(scholarship_data):
     """
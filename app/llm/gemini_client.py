@@ -1,7 +1,41 @@
+"""
+Gemini client – one pooled, retrying HTTP client for generateContent and
+streamGenerateContent.
+
+``ask_gemini`` used to open a fresh connection (TCP + TLS handshake) per
+request, try once with a fixed 30 s timeout and hand error strings back to
+be shown to students. ``GeminiClient`` keeps a ``requests.Session`` whose
+connection pool is reused across requests, retries 429 / 5xx / connection
+errors with jittered exponential backoff (or the server's ``Retry-After``)
+as long as the per-request deadline allows, and raises ``GeminiError``
+subclasses that callers turn into their own responses. ``stream`` yields
+the answer as Gemini's server-sent events arrive.
+
+Identical prompts asked at the same time (everyone asking about the same
+announcement) share one generateContent call: ``SingleFlight`` lets the
+first caller make it and hands its answer, or its error, to the others.
+
+A ``system`` instruction (the assistant's fixed rules) is registered once
+as Gemini cached content (``cachedContents``) and referenced by name, so
+only the per-request prompt is sent and billed at the full input price.
+When the cache cannot be created (prompt below the model's minimum, API
+not available) or has expired upstream, the instruction is sent inline as
+``system_instruction`` instead.
+"""
+
+import hashlib
+import json
 import os
-import requests
+import random
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from email.utils import parsedate_to_datetime
 from pathlib import Path
+
+import requests
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
 
 # Load environment variables from .env file
 env_path = Path(__file__).resolve().parent.parent.parent / '.env'
@@ -9,62 +43,486 @@ load_dotenv(dotenv_path=env_path)
 
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 GEMINI_URL = os.getenv("GEMINI_API_URL")
+# default: GEMINI_API_URL with :generateContent -> :streamGenerateContent
+GEMINI_STREAM_URL = os.getenv("GEMINI_STREAM_URL")
 
-def ask_gemini(prompt: str) -> str:
-    # 1. Check if Key exists
-    if not GEMINI_API_KEY:
-        return "Configuration Error: GEMINI_API_KEY is missing."
+# whole request, retries and backoff included
+GEMINI_DEADLINE = float(os.getenv("GEMINI_DEADLINE", "30"))
+GEMINI_CONNECT_TIMEOUT = float(os.getenv("GEMINI_CONNECT_TIMEOUT", "5"))
+GEMINI_MAX_RETRIES = int(os.getenv("GEMINI_MAX_RETRIES", "3"))
+GEMINI_POOL_SIZE = int(os.getenv("GEMINI_POOL_SIZE", "10"))
+# backoff before retry n is uniform in [0, min(MAX, BASE * 2**n)] seconds
+GEMINI_BACKOFF_BASE = float(os.getenv("GEMINI_BACKOFF_BASE", "0.5"))
+GEMINI_BACKOFF_MAX = float(os.getenv("GEMINI_BACKOFF_MAX", "8"))
+# share one in-flight generateContent call among identical concurrent prompts
+GEMINI_SINGLE_FLIGHT = os.getenv("GEMINI_SINGLE_FLIGHT", "1") == "1"
+# explicit context caching of system instructions; default cachedContents URL
+# is derived from GEMINI_API_URL (.../v1beta/models/<model>:generateContent)
+GEMINI_CONTEXT_CACHE = os.getenv("GEMINI_CONTEXT_CACHE", "1") == "1"
+GEMINI_CACHE_URL = os.getenv("GEMINI_CACHE_URL")
+GEMINI_CONTEXT_CACHE_TTL = int(os.getenv("GEMINI_CONTEXT_CACHE_TTL", "3600"))
+# after a failed cache creation, send the instruction inline this long before trying again
+GEMINI_CONTEXT_CACHE_RETRY = float(os.getenv("GEMINI_CONTEXT_CACHE_RETRY", "600"))
 
-    payload = {
-        "contents": [
-            {
-                "parts": [{"text": prompt}]
-            }
-        ],
-        "safety_settings": [
-            {
-                "category": "HARM_CATEGORY_DANGEROUS_CONTENT",
-                "threshold": "BLOCK_NONE"
-            },
-            {
-                "category": "HARM_CATEGORY_HARASSMENT",
-                "threshold": "BLOCK_NONE"
-            },
-            {
-                "category": "HARM_CATEGORY_HATE_SPEECH",
-                "threshold": "BLOCK_NONE"
-            },
-            {
-                "category": "HARM_CATEGORY_SEXUALLY_EXPLICIT",
-                "threshold": "BLOCK_NONE"
-            }
-        ]
-    }
+RETRY_STATUSES = frozenset([429, 500, 502, 503, 504])
 
-    headers = {
-        "Content-Type": "application/json"
+SAFETY_SETTINGS = [
+    {
+        "category": "HARM_CATEGORY_DANGEROUS_CONTENT",
+        "threshold": "BLOCK_NONE"
+    },
+    {
+        "category": "HARM_CATEGORY_HARASSMENT",
+        "threshold": "BLOCK_NONE"
+    },
+    {
+        "category": "HARM_CATEGORY_HATE_SPEECH",
+        "threshold": "BLOCK_NONE"
+    },
+    {
+        "category": "HARM_CATEGORY_SEXUALLY_EXPLICIT",
+        "threshold": "BLOCK_NONE"
     }
+]
+
+
+# ----- ERRORS -----
+
+class GeminiError(Exception):
+    """A Gemini request that produced no answer.
+
+    ``status`` is the last HTTP status (None for transport errors) and
+    ``retry_after`` the seconds the server asked to wait, if it did.
+    """
+
+    def __init__(self, message, status=None, retry_after=None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+class GeminiConfigError(GeminiError):
+    """GEMINI_API_KEY / GEMINI_API_URL missing."""
+
+
+class GeminiRequestError(GeminiError):
+    """Rejected request (400, 401, 403, 404): retrying will not help."""
+
+
+class GeminiRateLimitError(GeminiError):
+    """Still rate limited (429) when retries or the deadline ran out."""
+
 
+class GeminiUnavailableError(GeminiError):
+    """5xx or connection failures until retries or the deadline ran out."""
+
+
+class GeminiTimeoutError(GeminiError):
+    """The request deadline passed before an answer arrived."""
+
+
+class GeminiResponseError(GeminiError):
+    """A 200 response without answer text (blocked prompt, unexpected format)."""
+
+
+def _stream_url(url):
+    if url and ":generateContent" in url:
+        return url.replace(":generateContent", ":streamGenerateContent")
+    return None
+
+
+def _cache_target(url):
+    """(cachedContents URL, "models/<model>") for a generateContent URL."""
+    if not url or "/models/" not in url:
+        return None, None
+    base, rest = url.split("/models/", 1)
+    return base + "/cachedContents", "models/" + rest.split(":", 1)[0]
+
+
+def _retry_after(response):
+    """Seconds from a ``Retry-After`` header (delta seconds or HTTP date), or None."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
     try:
-        # 2. Make the request ONCE (No retry loop)
-        response = requests.post(
-            f"{GEMINI_URL}?key={GEMINI_API_KEY}",
-            headers=headers,
-            json=payload,
-            timeout=30
-        )
-
-        # 3. If it failed (400, 429, 500, etc.), return the RAW text from Google
-        if response.status_code != 200:
-            return f"GOOGLE API ERROR ({response.status_code}): {response.text}"
-
-        # 4. Parse success response
-        data = response.json()
-        if "candidates" in data and data["candidates"]:
-            return data["candidates"][0]["content"]["parts"][0]["text"]
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def _payload(prompt, system=None, cached_content=None):
+    payload = {
+        "contents": [{"parts": [{"text": prompt}]}],
+        "safety_settings": SAFETY_SETTINGS,
+    }
+    # the cached content already carries the system instruction
+    if cached_content:
+        payload["cachedContent"] = cached_content
+    elif system:
+        payload["system_instruction"] = {"parts": [{"text": system}]}
+    return payload
+
+
+def _chunk_text(data):
+    """Text of one streamed chunk ("" for chunks without any, e.g. usage only)."""
+    candidates = data.get("candidates") if isinstance(data, dict) else None
+    if not candidates:
+        return ""
+    parts = (candidates[0].get("content") or {}).get("parts") or []
+    return "".join(p.get("text", "") for p in parts if isinstance(p, dict))
+
+
+def _answer_text(data):
+    candidates = data.get("candidates") if isinstance(data, dict) else None
+    if not candidates:
+        feedback = data.get("promptFeedback") if isinstance(data, dict) else None
+        raise GeminiResponseError(f"No candidates in response (prompt feedback: {feedback})", status=200)
+    parts = (candidates[0].get("content") or {}).get("parts") or []
+    text = "".join(p.get("text", "") for p in parts if isinstance(p, dict))
+    if not text:
+        reason = candidates[0].get("finishReason")
+        raise GeminiResponseError(f"Empty candidate (finish reason: {reason})", status=200)
+    return text
+
+
+def _copy_error(error):
+    """A fresh instance of a shared GeminiError for another waiting thread."""
+    return type(error)(str(error), status=error.status, retry_after=error.retry_after)
+
+
+# ----- SINGLE FLIGHT -----
+
+class SingleFlight:
+    """At most one call per key at a time; concurrent callers of the same key
+    wait for it and get its result or its exception."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._stats = {"leaders": 0, "followers": 0, "follower_timeouts": 0}
+
+    def do(self, key, fn, timeout=None):
+        """``fn()``, or the result of the call already running for ``key``.
+
+        Followers wait at most ``timeout`` seconds (GeminiTimeoutError);
+        the call itself carries on for the others. A failed call is not
+        remembered: the next caller after it tries again.
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+            self._stats["leaders" if leader else "followers"] += 1
+
+        if leader:
+            try:
+                result = fn()
+            except BaseException as e:
+                self._finish(key)
+                future.set_exception(e)
+                raise
+            self._finish(key)
+            future.set_result(result)
+            return result
+
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            with self._lock:
+                self._stats["follower_timeouts"] += 1
+            raise GeminiTimeoutError("Timed out waiting for an identical Gemini request")
+        except GeminiError as e:
+            # every waiter raises its own instance (tracebacks are per raise)
+            raise _copy_error(e) from None
+
+    def _finish(self, key):
+        # later callers start a new call instead of joining a finished one
+        with self._lock:
+            del self._calls[key]
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["in_flight"] = len(self._calls)
+        return stats
+
+
+class GeminiClient:
+    """generateContent over a pooled keep-alive session, with retries."""
+
+    def __init__(self, api_key=GEMINI_API_KEY, url=GEMINI_URL, stream_url=GEMINI_STREAM_URL,
+                 deadline=GEMINI_DEADLINE,
+                 connect_timeout=GEMINI_CONNECT_TIMEOUT, max_retries=GEMINI_MAX_RETRIES,
+                 pool_size=GEMINI_POOL_SIZE, backoff_base=GEMINI_BACKOFF_BASE,
+                 backoff_max=GEMINI_BACKOFF_MAX, single_flight=GEMINI_SINGLE_FLIGHT,
+                 context_cache=GEMINI_CONTEXT_CACHE, cache_url=GEMINI_CACHE_URL,
+                 cache_ttl=GEMINI_CONTEXT_CACHE_TTL, cache_retry=GEMINI_CONTEXT_CACHE_RETRY):
+        self.api_key = api_key
+        self.url = url
+        self.stream_url = stream_url or _stream_url(url)
+        self.deadline = deadline
+        self.connect_timeout = connect_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.flights = SingleFlight() if single_flight else None
+        self.context_cache = context_cache
+        self.cache_url, self.model = _cache_target(url)
+        self.cache_url = cache_url or self.cache_url
+        self.cache_ttl = cache_ttl
+        self.cache_retry = cache_retry
+        # sha1(system) -> {"name", "expires"}; name None = inline until "expires"
+        self._caches = {}
+        self._cache_flights = SingleFlight()
+
+        self.session = requests.Session()
+        # retries are ours (they need the deadline); urllib3 only pools
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({"Content-Type": "application/json"})
+
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "attempts": 0, "retries": 0, "failures": 0,
+                       "context_caches": 0, "context_cache_fallbacks": 0,
+                       "prompt_tokens": 0, "cached_tokens": 0, "output_tokens": 0}
+
+    def _count(self, key):
+        with self._lock:
+            self._stats[key] += 1
+
+    def _usage(self, data):
+        """Add a response's usageMetadata to the token counters."""
+        usage = data.get("usageMetadata") if isinstance(data, dict) else None
+        if not usage:
+            return
+        cached = usage.get("cachedContentTokenCount", 0)
+        with self._lock:
+            # promptTokenCount includes the cached tokens
+            self._stats["prompt_tokens"] += usage.get("promptTokenCount", 0) - cached
+            self._stats["cached_tokens"] += cached
+            self._stats["output_tokens"] += usage.get("candidatesTokenCount", 0)
+
+    def backoff(self, retry):
+        """Full-jitter exponential backoff before retry number ``retry`` (0-based)."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** retry)))
+
+    def _send(self, payload, end, url, stream=False, params=None):
+        """POST ``payload`` until a 200 response arrives and return it.
+
+        Retries RETRY_STATUSES and transport errors until ``max_retries`` or
+        the monotonic deadline ``end`` is reached; raises a GeminiError
+        subclass otherwise.
+        """
+        if not self.api_key or not url:
+            raise GeminiConfigError("GEMINI_API_KEY or GEMINI_API_URL is missing.")
+        self._count("requests")
+
+        retry = 0
+        while True:
+            remaining = end - time.monotonic()
+            if remaining <= 0:
+                self._count("failures")
+                raise GeminiTimeoutError("Gemini request deadline exceeded")
+            self._count("attempts")
+            wait, error = None, None
+            try:
+                # key in a header, not the URL, so it stays out of error messages and logs
+                response = self.session.post(
+                    url, json=payload, params=params, headers={"x-goog-api-key": self.api_key},
+                    timeout=(min(self.connect_timeout, remaining), remaining), stream=stream)
+            except requests.exceptions.SSLError as e:
+                # a certificate problem does not go away by retrying
+                self._count("failures")
+                raise GeminiUnavailableError(f"Gemini TLS error: {e}")
+            except requests.Timeout as e:
+                error = GeminiTimeoutError(f"Gemini request timed out: {e}")
+            except requests.RequestException as e:
+                error = GeminiUnavailableError(f"Gemini connection failed: {e}")
+            else:
+                if response.status_code == 200:
+                    return response
+                status, wait = response.status_code, _retry_after(response)
+                message = f"Gemini API error ({status}): {response.text[:300]}"
+                response.close()
+                if status == 429:
+                    error = GeminiRateLimitError(message, status=status, retry_after=wait)
+                elif status in RETRY_STATUSES:
+                    error = GeminiUnavailableError(message, status=status, retry_after=wait)
+                else:
+                    self._count("failures")
+                    raise GeminiRequestError(message, status=status)
+
+            if wait is None:
+                wait = self.backoff(retry)
+            if retry >= self.max_retries or time.monotonic() + wait >= end:
+                self._count("failures")
+                raise error
+            print(f"[WARNING] {error} - retry {retry + 1}/{self.max_retries} in {wait:.2f}s")
+            self._count("retries")
+            time.sleep(wait)
+            retry += 1
+
+    def _deadline(self, deadline):
+        return time.monotonic() + (self.deadline if deadline is None else deadline)
+
+    def _post(self, payload, end, url):
+        response = self._send(payload, end, url)
+        try:
+            return response.json()
+        except ValueError:
+            self._count("failures")
+            raise GeminiResponseError("Response is not JSON", status=200)
+
+    def post(self, payload, deadline=None, url=None):
+        """POST ``payload`` and return the decoded JSON of a 200 response
+        (retried within ``deadline`` seconds, default: the client's)."""
+        return self._post(payload, self._deadline(deadline), url or self.url)
+
+    # ----- CONTEXT CACHE -----
+
+    def cached_content(self, system, end):
+        """Name of the cached content holding ``system``, created on first use
+        and again shortly before it expires; None = send it inline."""
+        if not self.context_cache or not system or not self.cache_url:
+            return None
+        key = hashlib.sha1(system.encode("utf-8")).hexdigest()
+        with self._lock:
+            entry = self._caches.get(key)
+        if entry is not None and time.monotonic() < entry["expires"]:
+            return entry["name"]
+        try:
+            return self._cache_flights.do(key, lambda: self._create_cache(key, system, end),
+                                          timeout=max(end - time.monotonic(), 0))
+        except GeminiTimeoutError:
+            # another request is still creating it
+            return None
+
+    def _create_cache(self, key, system, end):
+        body = {
+            "model": self.model,
+            "systemInstruction": {"parts": [{"text": system}]},
+            "ttl": f"{self.cache_ttl}s",
+        }
+        try:
+            name = self._post(body, end, self.cache_url).get("name")
+            if not name:
+                raise GeminiResponseError("Cached content without a name", status=200)
+        except GeminiError as e:
+            print(f"[WARNING] Gemini context cache unavailable, sending the system instruction inline: {e}")
+            self._count("context_cache_fallbacks")
+            name, expires = None, time.monotonic() + self.cache_retry
         else:
-            return f"UNEXPECTED RESPONSE FORMAT: {data}"
+            print(f"[INFO] Gemini context cache {name} created (ttl {self.cache_ttl}s)")
+            self._count("context_caches")
+            # renew a minute early so requests never reference an expired cache
+            expires = time.monotonic() + max(self.cache_ttl - 60, self.cache_ttl / 2)
+        with self._lock:
+            self._caches[key] = {"name": name, "expires": expires}
+        return name
+
+    def _drop_cache(self, system, name, error):
+        """Forget a cached content Gemini no longer accepts (expired, deleted)."""
+        print(f"[WARNING] Gemini rejected context cache {name}, sending the system instruction inline: {error}")
+        self._count("context_cache_fallbacks")
+        with self._lock:
+            self._caches.pop(hashlib.sha1(system.encode("utf-8")).hexdigest(), None)
+
+    # ----- GENERATION -----
+
+    def _generate(self, prompt, system, deadline):
+        end = self._deadline(deadline)
+        name = self.cached_content(system, end)
+        try:
+            data = self._post(_payload(prompt, system, name), end, self.url)
+        except GeminiRequestError as e:
+            if name is None:
+                raise
+            self._drop_cache(system, name, e)
+            data = self._post(_payload(prompt, system), end, self.url)
+        self._usage(data)
+        return _answer_text(data)
+
+    def generate(self, prompt, deadline=None, system=None):
+        """Answer text for ``prompt`` under the ``system`` instruction;
+        concurrent calls with the same prompt share one request (see
+        SingleFlight)."""
+        if self.flights is None:
+            return self._generate(prompt, system, deadline)
+        key = hashlib.sha1(f"{system or ''}\0{prompt}".encode("utf-8")).hexdigest()
+        return self.flights.do(key, lambda: self._generate(prompt, system, deadline),
+                               timeout=self.deadline if deadline is None else deadline)
+
+    def stream(self, prompt, deadline=None, system=None):
+        """Yield the answer to ``prompt`` in pieces as streamGenerateContent sends them.
+
+        Failures before the first piece are retried like ``generate``; once
+        text has been yielded the stream cannot be replayed, so a later
+        failure raises. Closing the generator (client gone) closes the
+        upstream connection.
+        """
+        end = self._deadline(deadline)
+        name = self.cached_content(system, end)
+        params = {"alt": "sse"}
+        try:
+            response = self._send(_payload(prompt, system, name), end, self.stream_url, stream=True, params=params)
+        except GeminiRequestError as e:
+            if name is None:
+                raise
+            self._drop_cache(system, name, e)
+            response = self._send(_payload(prompt, system), end, self.stream_url, stream=True, params=params)
+        pieces, usage = 0, None
+        try:
+            for line in response.iter_lines():
+                if time.monotonic() > end:
+                    raise GeminiTimeoutError("Gemini stream deadline exceeded")
+                # server-sent events: one "data: {json}" line per chunk
+                if not line.startswith(b"data:"):
+                    continue
+                try:
+                    chunk = json.loads(line[5:].decode("utf-8"))
+                except ValueError:
+                    raise GeminiResponseError("Stream chunk is not JSON", status=200)
+                # every chunk carries the running usage; the last one is the total
+                usage = chunk.get("usageMetadata") or usage
+                text = _chunk_text(chunk)
+                if text:
+                    pieces += 1
+                    yield text
+        except requests.RequestException as e:
+            self._count("failures")
+            raise GeminiUnavailableError(f"Gemini stream interrupted: {e}")
+        finally:
+            response.close()
+        self._usage({"usageMetadata": usage})
+        if not pieces:
+            self._count("failures")
+            raise GeminiResponseError("Stream ended without answer text", status=200)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        if self.flights is not None:
+            stats["single_flight"] = self.flights.stats()
+        return stats
+
+    def close(self):
+        self.session.close()
+
+
+GEMINI_CLIENT = GeminiClient()
+
+
+def ask_gemini(prompt: str, system: str = None) -> str:
+    """Answer ``prompt`` with the shared client; raises GeminiError on failure."""
+    return GEMINI_CLIENT.generate(prompt, system=system)
+
 
-    except Exception as e:
-        # 5. Catch connection errors (DNS, Timeout, etc.) and show raw error
-        return f"PYTHON EXCEPTION: {str(e)}"
\ No newline at end of file
+def stream_gemini(prompt: str, system: str = None):
+    """Answer ``prompt`` piece by piece (see GeminiClient.stream)."""
+    return GEMINI_CLIENT.stream(prompt, system=system)
@@ -0,0 +1,146 @@
+"""
+Admin content – knowledge managed in the admin panel, as index documents.
+
+Active KB articles, FAQ entries and custom replies from ``admin.db`` and the
+text of files uploaded through the panel (documents and syllabus uploads;
+PDF, DOCX and plain text). Doc ids are namespaced ``admin/<table>/<row id>``
+so edits replace exactly the chunks of the row that changed.
+
+Both the chatbot and the admin reindex job index ``load_index_documents()``
+(the file corpus plus this content), so a restart of either one never drops
+the other's documents from the live index.
+"""
+
+import json
+import os
+import re
+import sqlite3
+import zipfile
+from pathlib import Path
+
+from .corpus import extract_pdf_text, load_documents
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+
+ADMIN_DB_PATH = Path(os.getenv("ADMIN_DB_PATH", str(BASE_DIR / "admin" / "admin.db")))
+# shared with the admin panel (admin/app.py saves uploads here), so both
+# processes index the same files
+ADMIN_UPLOAD_ROOT = Path(os.getenv("ADMIN_UPLOAD_ROOT", str(BASE_DIR / "admin" / "uploads")))
+SYLLABUS_UPLOAD_ROOT = BASE_DIR / "admin" / "static" / "uploads"
+
+TEXT_SUFFIXES = {".txt", ".md", ".csv"}
+
+_DOCX_PARAGRAPH = re.compile(r"</w:p>")
+_XML_TAG = re.compile(r"<[^>]+>")
+
+
+def _dumps(obj):
+    return json.dumps(obj, ensure_ascii=False)
+
+
+def extract_docx_text(path):
+    """Paragraph text of a .docx file (stdlib only: it is a zip of XML)."""
+    with zipfile.ZipFile(str(path)) as z:
+        xml = z.read("word/document.xml").decode("utf-8", errors="replace")
+    xml = _DOCX_PARAGRAPH.sub("\n", xml)
+    text = _XML_TAG.sub("", xml)
+    for entity, char in (("&lt;", "<"), ("&gt;", ">"), ("&quot;", '"'), ("&apos;", "'"), ("&amp;", "&")):
+        text = text.replace(entity, char)
+    return "\n".join(line.strip() for line in text.splitlines() if line.strip())
+
+
+def extract_upload_text(path):
+    """Text of an uploaded file, or None when the type is not supported.
+
+    Raises when a supported file cannot be read.
+    """
+    suffix = Path(path).suffix.lower()
+    if suffix == ".pdf":
+        return extract_pdf_text(path)
+    if suffix == ".docx":
+        return extract_docx_text(path)
+    if suffix in TEXT_SUFFIXES:
+        return Path(path).read_text(encoding="utf-8", errors="replace")
+    return None
+
+
+def _rows(conn, sql):
+    try:
+        return conn.execute(sql).fetchall()
+    except sqlite3.Error:
+        # table not created yet (fresh or older admin.db)
+        return []
+
+
+def load_admin_documents(db_path=ADMIN_DB_PATH, upload_root=ADMIN_UPLOAD_ROOT, failures=None):
+    """Return admin-managed content as ``{"doc_id", "source", "text"}`` dicts.
+
+    Files that cannot be extracted are skipped and reported in ``failures``
+    (a list, if given) as ``{"source", "error"}``.
+    """
+    db_path = Path(db_path)
+    if not db_path.exists():
+        return []
+
+    def fail(source, error):
+        print(f"[WARNING] Could not index {source}: {error}")
+        if failures is not None:
+            failures.append({"source": source, "error": str(error)})
+
+    docs = []
+    conn = sqlite3.connect(str(db_path))
+    conn.row_factory = sqlite3.Row
+    try:
+        for r in _rows(conn, "SELECT * FROM kb WHERE active=1"):
+            docs.append({
+                "doc_id": f"admin/kb/{r['id']}",
+                "source": "admin kb",
+                # not "department": that key would make the article look like a faculty file
+                "text": _dumps({"title": r["title"], "content": r["content"],
+                                "kb_department": r["department"], "tags": r["tags"]}),
+            })
+        for r in _rows(conn, "SELECT * FROM faq WHERE active=1"):
+            docs.append({
+                "doc_id": f"admin/faq/{r['id']}",
+                "source": "admin faq",
+                "text": _dumps({"question": r["question"], "answer": r["answer"]}),
+            })
+        for r in _rows(conn, "SELECT * FROM custom_replies WHERE active=1"):
+            docs.append({
+                "doc_id": f"admin/custom_replies/{r['id']}",
+                "source": "admin custom reply",
+                "text": _dumps({"question": r["trigger"], "answer": r["response"]}),
+            })
+
+        uploads = [("documents", r, Path(upload_root))
+                   for r in _rows(conn, "SELECT * FROM documents WHERE filename IS NOT NULL")]
+        uploads += [("syllabus", r, SYLLABUS_UPLOAD_ROOT)
+                    for r in _rows(conn, "SELECT * FROM syllabus WHERE active=1 AND filename IS NOT NULL")]
+    finally:
+        conn.close()
+
+    for table, r, root in uploads:
+        path = root / r["filename"]
+        try:
+            text = extract_upload_text(path)
+        except Exception as e:
+            fail(r["filename"], e)
+            continue
+        if text is None:
+            fail(r["filename"], f"unsupported file type {path.suffix or '(none)'}")
+            continue
+        if not text.strip():
+            fail(r["filename"], "no extractable text")
+            continue
+        docs.append({
+            "doc_id": f"admin/{table}/{r['id']}",
+            "source": r["filename"],
+            # same payload shape as corpus PDFs: chunked as running text
+            "text": _dumps({"source": r["title"] or r["filename"], "text": text}),
+        })
+    return docs
+
+
+def load_index_documents(base_dir=BASE_DIR, db_path=ADMIN_DB_PATH, upload_root=ADMIN_UPLOAD_ROOT, failures=None):
+    """Everything the chatbot retrieves from: file corpus + admin content."""
+    return load_documents(base_dir) + load_admin_documents(db_path, upload_root, failures)
@@ -0,0 +1,277 @@
+"""
+Chunking – splits corpus documents into bounded, overlapping passages.
+
+Chunks follow the layout already used by hostel-rule-book-2025-26.jsonl:
+
+    {"id", "doc_id", "page_start", "page_end", "section", "chunk_text",
+     "char_start", "char_end", "source_file"}
+
+JSON documents are split structurally: the largest collection inside the
+document (faculty map, holiday list, modules, ...) is packed into groups and
+every chunk is re-emitted as a *valid* JSON sub-document that keeps the
+document's small header fields. Downstream, parse_document() therefore still
+renders chunks with the right specialised parser.
+
+PDF text and plain strings are split into overlapping character windows
+that end on paragraph / sentence boundaries where possible.
+"""
+
+import json
+import re
+
+# MiniLM truncates at 256 word pieces (~1000 characters of English text)
+MAX_CHARS = 1000
+OVERLAP_CHARS = 150
+
+# PDF pages are joined with a form feed so chunks can report page ranges
+PAGE_BREAK = "\f"
+
+_BOUNDARY = re.compile(r"\n\s*\n|(?<=[.!?])\s+|\n")
+
+
+def _dumps(obj):
+    return json.dumps(obj, ensure_ascii=False)
+
+
+def _make_chunk(doc_id, n, text, section=None, source=None,
+                char_start=None, char_end=None, page_start=None, page_end=None):
+    return {
+        "id": f"{doc_id}::chunk-{n:03d}",
+        "doc_id": doc_id,
+        "page_start": page_start,
+        "page_end": page_end,
+        "section": section,
+        "chunk_text": text,
+        "char_start": char_start,
+        "char_end": char_end,
+        "source_file": source,
+    }
+
+
+# --------------------------------------------------
+# PLAIN TEXT WINDOWS
+# --------------------------------------------------
+
+def split_text(text, max_chars=MAX_CHARS, overlap=OVERLAP_CHARS):
+    """Split ``text`` into ``(start, end)`` windows of at most ``max_chars``.
+
+    Windows end on the last paragraph / sentence / line boundary inside the
+    window when there is one, and the next window starts ``overlap``
+    characters before the previous end (snapped forward to a boundary).
+    """
+    n = len(text)
+    if n <= max_chars:
+        return [(0, n)] if text.strip() else []
+
+    boundaries = [m.end() for m in _BOUNDARY.finditer(text)]
+    windows = []
+    start = 0
+    while start < n:
+        end = min(start + max_chars, n)
+        if end < n:
+            # last boundary inside the window, but keep windows at least half full
+            cut = None
+            for b in reversed(boundaries):
+                if b <= end:
+                    cut = b
+                    break
+            if cut is not None and cut - start >= max_chars // 2:
+                end = cut
+        if text[start:end].strip():
+            windows.append((start, end))
+        if end >= n:
+            break
+
+        next_start = max(end - overlap, start + 1)
+        for b in boundaries:
+            if next_start <= b < end:
+                next_start = b
+                break
+        start = next_start
+    return windows
+
+
+def _page_of(offset, page_starts):
+    page = 1
+    for i, ps in enumerate(page_starts):
+        if ps <= offset:
+            page = i + 1
+        else:
+            break
+    return page
+
+
+def chunk_text(text, doc_id, source=None, section=None,
+               max_chars=MAX_CHARS, overlap=OVERLAP_CHARS):
+    """Chunk free text (PDF extractions, uploads, KB entries)."""
+    page_starts = [0] + [m.end() for m in re.finditer(PAGE_BREAK, text)]
+    chunks = []
+    for start, end in split_text(text, max_chars, overlap):
+        body = text[start:end].replace(PAGE_BREAK, "\n").strip()
+        if not body:
+            continue
+        chunks.append(_make_chunk(
+            doc_id, len(chunks) + 1, body,
+            section=section, source=source,
+            char_start=start, char_end=end,
+            page_start=_page_of(start, page_starts),
+            page_end=_page_of(max(start, end - 1), page_starts),
+        ))
+    return chunks
+
+
+# --------------------------------------------------
+# STRUCTURED JSON
+# --------------------------------------------------
+
+def _pack_items(items, size_of, budget, overlap_items=1):
+    """Greedily pack ``items`` into groups whose total size fits ``budget``.
+
+    Consecutive groups share ``overlap_items`` trailing items so a passage
+    never starts without the entry just before it.
+    """
+    groups, current, current_size = [], [], 0
+    for item in items:
+        s = size_of(item)
+        if current and current_size + s > budget:
+            groups.append(current)
+            carried = current[-overlap_items:] if overlap_items else []
+            # do not carry an item that would overflow the next group by itself
+            carried = [c for c in carried if size_of(c) + s <= budget]
+            current = list(carried)
+            current_size = sum(size_of(c) for c in current)
+        current.append(item)
+        current_size += s
+    if current:
+        groups.append(current)
+    return groups
+
+
+def _renumber(chunks, doc_id):
+    for n, c in enumerate(chunks, 1):
+        c["id"] = f"{doc_id}::chunk-{n:03d}"
+    return chunks
+
+
+def _chunk_collection(header, field, container, doc_id, source, max_chars, overlap):
+    """Pack the entries of ``container`` into ``{**header, field: subset}`` chunks.
+
+    With ``field=None`` the subsets are emitted bare (top-level lists/maps).
+    """
+    is_map = isinstance(container, dict)
+    items = list(container.items()) if is_map else list(container)
+    header_size = len(_dumps(header)) if header else 0
+
+    def size_of(item):
+        return len(_dumps({item[0]: item[1]} if is_map else item))
+
+    def render(group):
+        sub = dict(group) if is_map else group
+        if field is not None:
+            sub = {**header, field: sub}
+        return _dumps(sub)
+
+    overlap_items = 1 if overlap > 0 else 0
+    groups = _pack_items(items, size_of, max_chars - header_size, overlap_items)
+
+    chunks = []
+    for group in groups:
+        body = render(group)
+        section = field or (group[0][0] if is_map else None)
+        if len(body) > max_chars * 2 and len(group) == 1:
+            # a single oversized entry: split it on its own, or window its text
+            value = group[0][1] if is_map else group[0]
+            if isinstance(value, (dict, list)):
+                sub_chunks = chunk_json(value, doc_id, source, max_chars, overlap)
+            else:
+                sub_chunks = chunk_text(body, doc_id, source, max_chars=max_chars, overlap=overlap)
+            for c in sub_chunks:
+                c["section"] = c["section"] or section
+            chunks.extend(sub_chunks)
+            continue
+        chunks.append(_make_chunk(doc_id, 0, body, section=section, source=source))
+    return chunks
+
+
+def chunk_json(obj, doc_id, source=None, max_chars=MAX_CHARS, overlap=OVERLAP_CHARS):
+    """Chunk a parsed JSON document into JSON sub-documents.
+
+    Small fields form a header repeated in every chunk; each large field
+    (faculty map, holiday list, ...) is packed into its own run of chunks.
+    """
+    # Documents that are already chunked upstream keep their own chunks
+    if isinstance(obj, dict) and isinstance(obj.get("chunks"), list) \
+            and all(isinstance(c, dict) and "chunk_text" in c for c in obj["chunks"]):
+        chunks = [
+            _make_chunk(
+                doc_id, 0, c["chunk_text"],
+                section=c.get("section"), source=source,
+                char_start=c.get("char_start"), char_end=c.get("char_end"),
+                page_start=c.get("page_start"), page_end=c.get("page_end"),
+            )
+            for c in obj["chunks"]
+        ]
+        rest = {k: v for k, v in obj.items() if k != "chunks"}
+        chunks.extend(chunk_json(rest, doc_id, source, max_chars, overlap))
+        return _renumber(chunks, doc_id)
+
+    text = _dumps(obj)
+    if len(text) <= max_chars:
+        return [_make_chunk(doc_id, 1, text, source=source, char_start=0, char_end=len(text))]
+
+    if isinstance(obj, list):
+        return _renumber(_chunk_collection(None, None, obj, doc_id, source, max_chars, overlap), doc_id)
+    if not isinstance(obj, dict):
+        return chunk_text(text, doc_id, source, max_chars=max_chars, overlap=overlap)
+
+    large = [k for k, v in obj.items() if len(_dumps(v)) > max_chars // 4]
+    header = {k: v for k, v in obj.items() if k not in large}
+    if not large:
+        # many small fields: split the top level itself
+        return _renumber(_chunk_collection(None, None, obj, doc_id, source, max_chars, overlap), doc_id)
+
+    chunks = []
+    if len(_dumps(header)) > max_chars // 2:
+        # header alone would crowd out the content: give it chunks of its own
+        chunks.extend(_chunk_collection(None, None, header, doc_id, source, max_chars, overlap))
+        header = {}
+
+    for field in large:
+        value = obj[field]
+        if isinstance(value, (dict, list)) and len(value) > 1:
+            chunks.extend(_chunk_collection(header, field, value, doc_id, source, max_chars, overlap))
+        elif isinstance(value, (dict, list)):
+            sub_chunks = chunk_json(value, doc_id, source, max_chars, overlap)
+            for c in sub_chunks:
+                c["section"] = c["section"] or field
+            chunks.extend(sub_chunks)
+        else:
+            chunks.extend(chunk_text(str(value), doc_id, source, section=field,
+                                     max_chars=max_chars, overlap=overlap))
+    return _renumber(chunks, doc_id)
+
+
+# --------------------------------------------------
+# ENTRY POINT
+# --------------------------------------------------
+
+def chunk_document(text, doc_id, source=None, max_chars=MAX_CHARS, overlap=OVERLAP_CHARS):
+    """Split one corpus document into chunk dicts.
+
+    ``text`` is the string form stored in the corpus: a JSON string for
+    structured documents, ``{"source", "text"}`` JSON for PDF extractions,
+    or plain text.
+    """
+    stripped = text.lstrip()
+    if stripped[:1] in ("{", "["):
+        try:
+            obj = json.loads(text)
+        except Exception:
+            obj = None
+        if obj is not None:
+            # PDF extraction payload: chunk the extracted text itself
+            if isinstance(obj, dict) and set(obj) <= {"source", "text"} and isinstance(obj.get("text"), str):
+                return chunk_text(obj["text"], doc_id, obj.get("source", source),
+                                  section=obj.get("source"), max_chars=max_chars, overlap=overlap)
+            return chunk_json(obj, doc_id, source, max_chars, overlap)
+    return chunk_text(text, doc_id, source, max_chars=max_chars, overlap=overlap)
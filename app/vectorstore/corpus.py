@@ -0,0 +1,167 @@
+"""
+Corpus loader – collects every document the chatbot indexes.
+
+Each document is a dict with a stable ``doc_id`` (its path relative to the
+project root), the ``source`` file name and its ``text``: the JSON string for
+structured files, or a ``{"source", "text"}`` JSON payload for PDFs.
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+
+from .chunking import PAGE_BREAK
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+
+# Never index our own caches or environments
+EXCLUDE_DIRS = {'.git', '.venv', 'venv', 'node_modules', '__pycache__', '.index_cache', '.index_snapshots'}
+
+# Text extracted from PDFs, reused while a file's size and mtime are
+# unchanged: PyPDF2 is otherwise most of the startup time. JSON lines, one
+# record per PDF. Set PDF_TEXT_CACHE="" to always extract.
+PDF_TEXT_CACHE = os.getenv("PDF_TEXT_CACHE", str(BASE_DIR / ".index_snapshots" / "pdf_text.jsonl"))
+
+
+def extract_pdf_text(path):
+    """Return the text of a PDF with pages separated by PAGE_BREAK.
+
+    Raises when PyPDF2 is not installed or the file cannot be read.
+    """
+    import PyPDF2
+
+    reader = PyPDF2.PdfReader(str(path))
+    pages = []
+    for page in reader.pages:
+        try:
+            t = page.extract_text() or ""
+        except Exception:
+            t = ""
+        pages.append(t)
+    return PAGE_BREAK.join(pages).strip()
+
+
+def _read_pdf_cache(path):
+    entries = {}
+    if not path:
+        return entries
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    entries[entry["path"]] = entry
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError, KeyError) as e:
+        print(f"[WARNING] Ignoring unreadable PDF text cache {path}: {e}")
+        return {}
+    return entries
+
+
+def _write_pdf_cache(path, entries):
+    path = Path(path)
+    tmp = path.with_name(f"{path.name}.tmp-{os.getpid()}-{threading.get_ident()}")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp, "w", encoding="utf-8") as f:
+            for entry in entries.values():
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"[WARNING] Could not write PDF text cache {path}: {e}")
+        tmp.unlink(missing_ok=True)
+
+
+def _excluded(path, base_dir):
+    try:
+        parts = Path(path).resolve().relative_to(base_dir).parts
+    except ValueError:
+        return False
+    return any(part in EXCLUDE_DIRS for part in parts)
+
+
+def _doc_id(path, base_dir):
+    try:
+        return Path(path).resolve().relative_to(base_dir).as_posix()
+    except ValueError:
+        return Path(path).name
+
+
+def load_documents(base_dir=BASE_DIR, pdf_cache=PDF_TEXT_CACHE):
+    """Load all JSON / JSONL / PDF documents for the chatbot.
+
+    Identical documents found in several places are kept once; the copy
+    under ``Resources`` wins. PDF text comes from ``pdf_cache`` unless the
+    file changed since it was extracted.
+    """
+    base_dir = Path(base_dir).resolve()
+    docs = []
+    seen = set()
+
+    def add(path, text):
+        if text in seen:
+            return
+        seen.add(text)
+        docs.append({
+            "doc_id": _doc_id(path, base_dir),
+            "source": Path(path).name,
+            "text": text,
+        })
+
+    # Prefer structured Resources folder
+    resources = base_dir / 'Resources'
+    if resources.exists():
+        # load .json files
+        for p in resources.rglob("*.json"):
+            try:
+                with open(p, "r", encoding="utf-8") as f:
+                    add(p, json.dumps(json.load(f), ensure_ascii=False))
+            except Exception:
+                continue
+
+        # load .jsonl files - treat as regular JSON
+        # (Previous implementation treated each line separately, causing fragments)
+        for p in resources.rglob("*.jsonl"):
+            try:
+                with open(p, "r", encoding="utf-8") as f:
+                    add(p, json.dumps(json.load(f), ensure_ascii=False))
+            except Exception:
+                continue
+
+        # extract text from PDFs (if PyPDF2 is installed)
+        cached = _read_pdf_cache(pdf_cache)
+        extracted = {}
+        for p in resources.rglob("*.pdf"):
+            try:
+                key = str(p.resolve())
+                st = p.stat()
+                entry = cached.get(key)
+                if not entry or entry.get("size") != st.st_size or entry.get("mtime_ns") != st.st_mtime_ns:
+                    entry = {"path": key, "size": st.st_size, "mtime_ns": st.st_mtime_ns,
+                             "text": extract_pdf_text(p)}
+                extracted[key] = entry
+                if entry["text"]:
+                    add(p, json.dumps({"source": str(p.name), "text": entry["text"]}, ensure_ascii=False))
+            except Exception:
+                # if extraction unavailable, store filename as hint
+                add(p, json.dumps({"source": str(p.name), "note": "pdf-not-extracted"}, ensure_ascii=False))
+        if pdf_cache:
+            # entries of PDFs under another base_dir stay while those files exist
+            kept = {k: v for k, v in cached.items() if k not in extracted and os.path.exists(k)}
+            kept.update(extracted)
+            if kept != cached:
+                _write_pdf_cache(pdf_cache, kept)
+
+    # Fallback: include any other JSONs across repo (keeps previous behavior)
+    for p in base_dir.rglob("*.json"):
+        if _excluded(p, base_dir):
+            continue
+        try:
+            with open(p, "r", encoding="utf-8") as f:
+                add(p, json.dumps(json.load(f), ensure_ascii=False))
+        except Exception:
+            continue
+
+    return docs
@@ -1,3 +1,13 @@
+import os
+import queue
+import re
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from .hashing import HashingEmbedder
+
 try:
     from sentence_transformers import SentenceTransformer
     _HAS_ST = True
@@ -5,34 +15,251 @@ except Exception:
     SentenceTransformer = None
     _HAS_ST = False
 
+MODEL_NAME = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+
+# Fallback when sentence-transformers is missing: hashed n-gram TF-IDF
+# (see app.vectorstore.hashing). Its IDF is fitted on the first index build
+# and shared by all processes through this file.
+FALLBACK_DIM = int(os.getenv("FALLBACK_EMBED_DIM", "1024"))
+FALLBACK_IDF_PATH = os.getenv(
+    "FALLBACK_IDF_PATH", str(BASE_DIR / ".index_cache" / f"hash-tfidf-{FALLBACK_DIM}.idf.npy"))
+
 _model = None
+_fallback = None
 
 def get_model():
     global _model
     if _model is None:
-        print("📥 Downloading embedding model (all-MiniLM-L6-v2) for the first time...")
+        print(f"📥 Downloading embedding model ({MODEL_NAME}) for the first time...")
         print("   This may take a few minutes. The model will be cached for future use.")
-        _model = SentenceTransformer("all-MiniLM-L6-v2")
+        _model = SentenceTransformer(MODEL_NAME)
         print("✓ Model loaded successfully!")
     return _model
 
+def get_fallback():
+    global _fallback
+    if _fallback is None:
+        _fallback = HashingEmbedder(FALLBACK_DIM)
+        _fallback.load(FALLBACK_IDF_PATH)
+    return _fallback
+
+def model_name():
+    """Name of the embedding backend actually in use.
+
+    Vectors from different backends are not comparable, so anything persisted
+    to disk (e.g. the vector index cache) must be keyed by this value.
+    """
+    return MODEL_NAME if _HAS_ST else get_fallback().name
+
+def needs_fit():
+    """True when the fallback embedder is in use and has no IDF yet."""
+    return not _HAS_ST and not get_fallback().fitted
+
+def fit_fallback(texts):
+    """Fit the fallback embedder's IDF on ``texts`` and persist it."""
+    fallback = get_fallback()
+    fallback.fit(texts)
+    _CACHE.clear()
+    try:
+        Path(FALLBACK_IDF_PATH).parent.mkdir(parents=True, exist_ok=True)
+        fallback.save(FALLBACK_IDF_PATH)
+    except OSError as e:
+        print(f"[WARNING] Could not save fallback embedder IDF: {e}")
+    print(f"[INFO] Fitted fallback embedder {fallback.name} on {len(texts)} passages")
+
 def embed(texts):
-    """Return embeddings for a list of texts.
-    Uses SentenceTransformer when available; otherwise falls back to a simple
-    deterministic hashing-based embedding (128 dims) so the server can run
-    without heavy ML dependencies.
+    """Return embeddings for a list of texts as a float32 array.
+    Uses SentenceTransformer when available; otherwise falls back to hashed
+    n-gram TF-IDF vectors so the server can run without heavy ML
+    dependencies.
     """
     if _HAS_ST:
         model = get_model()
         return model.encode(texts, normalize_embeddings=True)
 
-    # Fallback: deterministic hashing-based vector (128 dims)
-    import hashlib
-    out = []
-    for t in texts:
-        h = hashlib.md5(t.encode('utf-8')).digest()
-        # md5 gives 16 bytes; expand to 128 dims by repeating and scaling
-        base = [b / 255.0 for b in h]
-        vec = (base * 8)[:128]
-        out.append([float(x) for x in vec])
+    return get_fallback().embed(texts)
+
+
+# --------------------------------------------------
+# QUERY EMBEDDINGS: LRU CACHE + MICRO-BATCHING
+# --------------------------------------------------
+# Popular questions ("who is the hod", "holiday list") are embedded once and
+# served from an LRU keyed by the normalized query. Cache misses from
+# concurrent request threads are collected for a few milliseconds and
+# encoded in one batched embed() call instead of queueing on the model.
+
+QUERY_CACHE_SIZE = int(os.getenv("EMBED_CACHE_SIZE", "2048"))
+BATCH_WINDOW_MS = float(os.getenv("EMBED_BATCH_WINDOW_MS", "3"))
+MAX_BATCH = int(os.getenv("EMBED_MAX_BATCH", "64"))
+# batching only pays off for the neural model; the fallback is vectorized
+BATCHING = os.getenv("EMBED_BATCHING", "1" if _HAS_ST else "0") == "1"
+
+_WS = re.compile(r"\s+")
+
+
+def normalize_query(text):
+    return _WS.sub(" ", text).strip().lower()
+
+
+class _QueryCache:
+    def __init__(self, size):
+        self.size = size
+        self.items = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self.lock:
+            vec = self.items.get(key)
+            if vec is None:
+                self.misses += 1
+                return None
+            self.items.move_to_end(key)
+            self.hits += 1
+            return vec
+
+    def clear(self):
+        with self.lock:
+            self.items.clear()
+
+    def put(self, key, vec):
+        if self.size <= 0:
+            return
+        with self.lock:
+            self.items[key] = vec
+            self.items.move_to_end(key)
+            while len(self.items) > self.size:
+                self.items.popitem(last=False)
+
+    def stats(self):
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self.items),
+                "capacity": self.size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else None,
+            }
+
+
+class _MicroBatcher:
+    """Single worker thread that merges concurrent embed requests."""
+
+    def __init__(self, window_ms, max_batch):
+        self.window = window_ms / 1000.0
+        self.max_batch = max_batch
+        self.requests = queue.Queue()
+        self.thread = None
+        self.start_lock = threading.Lock()
+        self.stats_lock = threading.Lock()
+        self.batches = 0
+        self.submitted = 0           # requests; a request may carry several texts
+        self.texts = 0
+        self.max_size = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def _ensure_worker(self):
+        if self.thread is None:
+            with self.start_lock:
+                if self.thread is None:
+                    self.thread = threading.Thread(target=self._run, name="embed-batcher", daemon=True)
+                    self.thread.start()
+
+    def submit(self, texts):
+        """Embed ``texts`` as part of the next batch; blocks until done."""
+        self._ensure_worker()
+        item = {"texts": texts, "queued": time.perf_counter(), "done": threading.Event()}
+        self.requests.put(item)
+        item["done"].wait()
+        if "error" in item:
+            raise item["error"]
+        return item["vectors"]
+
+    def _run(self):
+        while True:
+            batch = [self.requests.get()]
+            size = len(batch[0]["texts"])
+            deadline = time.perf_counter() + self.window
+            while size < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self.requests.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                batch.append(item)
+                size += len(item["texts"])
+
+            started = time.perf_counter()
+            waits = [started - item["queued"] for item in batch]
+            texts = [t for item in batch for t in item["texts"]]
+            try:
+                vectors = embed(texts)
+                offset = 0
+                for item in batch:
+                    n = len(item["texts"])
+                    item["vectors"] = vectors[offset:offset + n]
+                    offset += n
+            except Exception as e:
+                for item in batch:
+                    item["error"] = e
+            finally:
+                for item in batch:
+                    item["done"].set()
+
+            with self.stats_lock:
+                self.batches += 1
+                self.submitted += len(batch)
+                self.texts += len(texts)
+                self.max_size = max(self.max_size, len(texts))
+                self.wait_total += sum(waits)
+                self.wait_max = max(self.wait_max, max(waits))
+
+    def stats(self):
+        with self.stats_lock:
+            return {
+                "batches": self.batches,
+                "requests": self.submitted,
+                "texts": self.texts,
+                "mean_batch_size": round(self.texts / self.batches, 2) if self.batches else None,
+                "max_batch_size": self.max_size,
+                "mean_queue_wait_ms": round(self.wait_total * 1000 / self.submitted, 3) if self.submitted else None,
+                "max_queue_wait_ms": round(self.wait_max * 1000, 3),
+            }
+
+
+_CACHE = _QueryCache(QUERY_CACHE_SIZE)
+_BATCHER = _MicroBatcher(BATCH_WINDOW_MS, MAX_BATCH)
+
+
+def embed_queries(texts):
+    """Embed search queries, using the LRU cache and the micro-batcher.
+
+    Returns one vector per text, in order (same type as ``embed`` rows).
+    Use ``embed`` directly for corpus passages: they are not worth caching.
+    """
+    keys = [normalize_query(t) for t in texts]
+    out = [_CACHE.get(k) for k in keys]
+    missing = sorted({k for k, v in zip(keys, out) if v is None})
+    if missing:
+        vectors = _BATCHER.submit(missing) if BATCHING else embed(missing)
+        fresh = dict(zip(missing, vectors))
+        for k, vec in fresh.items():
+            _CACHE.put(k, vec)
+        out = [fresh[k] if v is None else v for k, v in zip(keys, out)]
     return out
+
+
+def embedding_stats():
+    """Cache and batching counters for monitoring."""
+    return {
+        "model": model_name(),
+        "cache": _CACHE.stats(),
+        "batching": {"enabled": BATCHING, "window_ms": BATCH_WINDOW_MS, **_BATCHER.stats()},
+    }
@@ -0,0 +1,123 @@
+"""
+Hashing embedder – dependency-light fallback for sentence-transformers.
+
+Texts are mapped into a fixed number of buckets with the hashing trick:
+character 3-5-grams of the normalized text plus word unigrams and bigrams,
+each hashed to a bucket and a +/-1 sign. Bucket counts get sublinear TF and
+IDF weighting and every vector is L2-normalized, so inner product is cosine
+similarity exactly as with MiniLM. Embedding a query is a few NumPy array
+operations: no model download, well under a millisecond.
+
+IDF is learned once from the indexed corpus (``fit``) and persisted with
+``save`` so every process embeds with the same weights.
+"""
+
+import hashlib
+import re
+import zlib
+
+import numpy as np
+
+NGRAM_SIZES = (3, 4, 5)
+
+_NON_WORD = re.compile(r"[\W_]+")
+_PRIME = np.uint64(1000003)
+_SEEDS = {n: np.uint64((n * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF) for n in NGRAM_SIZES}
+_WORD_SEED = 0xC2B2AE3D27D4EB4F
+_MIX = np.uint64(0xFF51AFD7ED558CCD)
+
+
+def normalize(text):
+    return " " + _NON_WORD.sub(" ", text.lower()).strip() + " "
+
+
+def _mix(h):
+    # splitmix64-style finalizer: spreads entropy into the high (sign) bit
+    h = h ^ (h >> np.uint64(33))
+    h = h * _MIX
+    return h ^ (h >> np.uint64(33))
+
+
+def _ngram_hashes(data):
+    """Rolling hashes of all byte n-grams, vectorized over positions."""
+    out = []
+    length = len(data)
+    for n in NGRAM_SIZES:
+        if length < n:
+            continue
+        h = np.full(length - n + 1, _SEEDS[n], dtype=np.uint64)
+        for j in range(n):
+            h = h * _PRIME + data[j:length - n + 1 + j]
+        out.append(h)
+    return out
+
+
+def _word_hashes(words):
+    feats = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    return np.fromiter(
+        ((zlib.crc32(f.encode("utf-8")) * _WORD_SEED) & 0xFFFFFFFFFFFFFFFF for f in feats),
+        dtype=np.uint64, count=len(feats))
+
+
+class HashingEmbedder:
+    """Hashed n-gram TF-IDF vectors of ``dim`` float32 dimensions."""
+
+    def __init__(self, dim=1024):
+        self.dim = dim
+        self.idf = np.ones(dim, dtype=np.float32)
+        self.fitted = False
+
+    @property
+    def name(self):
+        if not self.fitted:
+            return f"hash-tf-{self.dim}"
+        digest = hashlib.sha1(self.idf.tobytes()).hexdigest()[:8]
+        return f"hash-tfidf-{self.dim}-{digest}"
+
+    def _features(self, text):
+        norm = normalize(text)
+        data = np.frombuffer(norm.encode("utf-8"), dtype=np.uint8).astype(np.uint64)
+        hashes = _ngram_hashes(data) + [_word_hashes(norm.split())]
+        h = _mix(np.concatenate(hashes))
+        buckets = (h % np.uint64(self.dim)).astype(np.intp)
+        signs = np.where(h >> np.uint64(63), -1.0, 1.0)
+        return buckets, signs
+
+    def fit(self, texts):
+        """Learn bucket IDF from ``texts`` (the indexed passages)."""
+        df = np.zeros(self.dim, dtype=np.float64)
+        n = 0
+        for text in texts:
+            buckets, _ = self._features(text)
+            df[np.unique(buckets)] += 1
+            n += 1
+        self.idf = (np.log((1 + n) / (1 + df)) + 1).astype(np.float32)
+        self.fitted = True
+        return self
+
+    def embed(self, texts):
+        """Return a ``(len(texts), dim)`` float32 array of unit vectors."""
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            buckets, signs = self._features(text)
+            counts = np.bincount(buckets, weights=signs, minlength=self.dim)
+            vec = np.sign(counts) * np.log1p(np.abs(counts)) * self.idf
+            norm = np.linalg.norm(vec)
+            if norm > 0:
+                out[i] = vec / norm
+        return out
+
+    def save(self, path):
+        np.save(path, self.idf)
+
+    def load(self, path):
+        """Load IDF weights saved by ``save``. Returns False if unusable."""
+        try:
+            idf = np.load(path)
+        except (OSError, ValueError):
+            return False
+        if idf.shape != (self.dim,):
+            return False
+        self.idf = idf.astype(np.float32)
+        self.fitted = True
+        return True
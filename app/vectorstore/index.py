@@ -1,3 +1,12 @@
+import hashlib
+import heapq
+import json
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+
 try:
     import numpy as np
     _HAS_NUMPY = True
@@ -12,64 +21,648 @@ except Exception:
     faiss = None
     _HAS_FAISS = False
 
-from .embeddings import embed
+from .chunking import chunk_document, MAX_CHARS, OVERLAP_CHARS
+from .embeddings import embed, embed_queries, fit_fallback, model_name, needs_fit
+from .lexical import LexicalIndex
+
+# Version of the artifacts written by VectorIndex.save (index generations,
+# see app.vectorstore.snapshots)
+CACHE_FORMAT_VERSION = "4"
+
+# --------------------------------------------------
+# INDEX TYPES
+# --------------------------------------------------
+# flat  – exact brute-force inner product (full float32 vectors)
+# hnsw  – graph-based ANN; fast queries, ~1.1-1.5x the flat memory
+# ivfpq – inverted lists + product quantization; a few bytes per vector,
+#         needs training data (falls back to flat on tiny corpora)
+INDEX_TYPES = ("flat", "hnsw", "ivfpq")
+
+DEFAULT_INDEX_PARAMS = {
+    "flat": {},
+    "hnsw": {"M": 32, "ef_construction": 200, "ef_search": 128},
+    "ivfpq": {"nlist": 1024, "m": 48, "nbits": 8, "nprobe": 32},
+}
+
+INDEX_TYPE = os.getenv("VECTOR_INDEX_TYPE", "flat").lower()
+
+# chunks per embed() call for incremental updates
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "256"))
+
+# --------------------------------------------------
+# HYBRID (BM25 + VECTOR) FUSION
+# --------------------------------------------------
+# Weighted reciprocal-rank fusion: score = sum(weight / (RRF_K + rank)).
+HYBRID_VECTOR_WEIGHT = float(os.getenv("HYBRID_VECTOR_WEIGHT", "1.0"))
+HYBRID_LEXICAL_WEIGHT = float(os.getenv("HYBRID_LEXICAL_WEIGHT", "1.0"))
+RRF_K = int(os.getenv("RRF_K", "60"))
+# answer obvious keyword queries (course codes, scheme names) from BM25
+# alone, without embedding the query
+KEYWORD_SHORTCUT = os.getenv("HYBRID_KEYWORD_SHORTCUT", "1") == "1"
+
+
+def _index_params(index_type, params=None):
+    merged = dict(DEFAULT_INDEX_PARAMS[index_type])
+    merged.update(params or {})
+    return merged
+
+
+def _largest_divisor(n, upper):
+    for d in range(min(upper, n), 0, -1):
+        if n % d == 0:
+            return d
+    return 1
+
+
+def _base_index(index):
+    """Unwrap an IndexIDMap/IndexIDMap2 to the index doing the search."""
+    index = faiss.downcast_index(index)
+    if hasattr(index, "id_map"):
+        index = faiss.downcast_index(index.index)
+    return index
+
+
+def set_search_params(index, index_type, params=None):
+    """Apply query-time knobs (efSearch / nprobe) to a faiss index."""
+    params = _index_params(index_type, params)
+    if index_type == "hnsw":
+        _base_index(index).hnsw.efSearch = int(params["ef_search"])
+    elif index_type == "ivfpq":
+        faiss.extract_index_ivf(_base_index(index)).nprobe = int(params["nprobe"])
+
+
+def build_faiss_index(vectors, index_type="flat", params=None, ids=None):
+    """Build a faiss inner-product index of ``index_type`` over ``vectors``.
+
+    With ``ids`` the index is wrapped in an ``IndexIDMap2`` so search results
+    are those int64 ids and vectors can later be added/removed by id.
+
+    Returns ``(index, effective_type)``; IVF-PQ degrades to flat when there
+    are too few vectors to train its quantizers.
+    """
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Unknown index type {index_type!r}; expected one of {INDEX_TYPES}")
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    n, dim = vectors.shape
+    params = _index_params(index_type, params)
+
+    if index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(dim, int(params["M"]), faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = int(params["ef_construction"])
+    elif index_type == "ivfpq":
+        nbits = int(params["nbits"])
+        # faiss wants ~39 training points per centroid, for both the coarse
+        # quantizer (nlist) and every PQ codebook (2**nbits)
+        nlist = min(int(params["nlist"]), n // 39)
+        if nlist < 1 or n < 39 * 2 ** nbits:
+            print(f"[WARNING] {n} vectors are too few to train IVF-PQ; using a flat index")
+            return build_faiss_index(vectors, "flat", None, ids)
+        m = _largest_divisor(dim, int(params["m"]))
+        quantizer = faiss.IndexFlatIP(dim)
+        index = faiss.IndexIVFPQ(quantizer, dim, nlist, m, nbits, faiss.METRIC_INNER_PRODUCT)
+        index.train(vectors)
+    else:
+        index = faiss.IndexFlatIP(dim)
+
+    if ids is not None:
+        index = faiss.IndexIDMap2(index)
+        index.add_with_ids(vectors, np.asarray(ids, dtype=np.int64))
+    else:
+        index.add(vectors)
+    set_search_params(index, index_type, params)
+    return index, index_type
+
+
+def content_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def as_document(doc, position=0):
+    """Normalise a corpus entry to ``{"doc_id", "source", "text"}``.
+
+    Bare strings (the historical corpus format) get a content-derived id.
+    """
+    if isinstance(doc, dict):
+        return {
+            "doc_id": doc.get("doc_id") or f"doc-{position}",
+            "source": doc.get("source"),
+            "text": doc["text"],
+        }
+    digest = hashlib.sha1(doc.encode("utf-8")).hexdigest()[:12]
+    return {"doc_id": f"doc-{digest}", "source": None, "text": doc}
+
+
+def chunk_documents(docs, max_chars=MAX_CHARS, overlap=OVERLAP_CHARS):
+    """Chunk every corpus document; returns a flat list of chunk dicts."""
+    chunks = []
+    for i, doc in enumerate(docs):
+        doc = as_document(doc, i)
+        chunks.extend(chunk_document(doc["text"], doc["doc_id"], doc["source"],
+                                     max_chars=max_chars, overlap=overlap))
+    return chunks
 
 
 class VectorIndex:
-    def __init__(self):
-        self.texts = []
+    """Chunk-level vector index with incremental updates.
+
+    Every chunk gets a stable int64 vector id. ``chunk_map`` maps vector id to
+    chunk metadata (id, doc_id, pages, section, source_file, chunk_text),
+    ``doc_chunks`` maps a doc_id to its vector ids and ``doc_hashes`` keeps
+    the content hash each document was embedded from, so unchanged
+    documents are never re-embedded.
+
+    With faiss the index is an ``IndexIDMap2``; the NumPy / pure-Python
+    fallback keeps ``row_ids`` aligned with the rows of ``vectors``.
+    """
+
+    def __init__(self, max_chars=MAX_CHARS, overlap=OVERLAP_CHARS,
+                 index_type=INDEX_TYPE, index_params=None):
+        if index_type not in INDEX_TYPES:
+            raise ValueError(f"Unknown index type {index_type!r}; expected one of {INDEX_TYPES}")
+        self.max_chars = max_chars
+        self.overlap = overlap
+        self.index_type = index_type
+        self.index_params = _index_params(index_type, index_params)
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self):
+        self.chunk_map = {}
+        self.doc_chunks = {}
+        self.doc_hashes = {}
         self.index = None
         self.vectors = None
+        self.row_ids = None
+        self.next_id = 0
+        # type of the index actually built (IVF-PQ may degrade to flat)
+        self.built_type = None
+        # ids removed from chunk_map but still inside an HNSW graph
+        self.stale = 0
+        # BM25 index over chunk_map, rebuilt lazily after changes
+        self._lexical = None
 
-    def build(self, texts):
-        self.texts = texts
-        vectors = embed(texts)
-        # vectors expected as numpy array
-        if _HAS_FAISS:
-            dim = vectors.shape[1]
-            self.index = faiss.IndexFlatIP(dim)
-            self.index.add(vectors)
-        else:
-            # fallback: store vectors and do numpy or pure-Python dot-product search
-            if _HAS_NUMPY:
-                self.vectors = np.array(vectors, dtype=np.float32)
+    @property
+    def chunks(self):
+        return list(self.chunk_map.values())
+
+    @property
+    def texts(self):
+        return [c["chunk_text"] for c in self.chunk_map.values()]
+
+    def __len__(self):
+        return len(self.chunk_map)
+
+    def _index_spec(self):
+        # only build-time parameters change the saved artifacts
+        build_params = {k: v for k, v in self.index_params.items() if k not in ("ef_search", "nprobe")}
+        return f"{self.index_type}:{json.dumps(build_params, sort_keys=True)}"
+
+    def _chunk(self, doc):
+        return chunk_document(doc["text"], doc["doc_id"], doc["source"],
+                              max_chars=self.max_chars, overlap=self.overlap)
+
+    # --------------------------------------------------
+    # BUILD
+    # --------------------------------------------------
+
+    def build(self, docs):
+        """Chunk ``docs``, embed the chunks and build the search index.
+
+        ``docs`` are corpus strings or ``{"doc_id", "source", "text"}`` dicts
+        (see app.vectorstore.corpus). Nothing is persisted here: saved
+        generations and warm starts are handled by
+        app.vectorstore.snapshots.SnapshotManager.
+        """
+        docs = [as_document(d, i) for i, d in enumerate(docs)]
+        per_doc = [(doc, self._chunk(doc)) for doc in docs]
+        all_chunks = [c for _, chunks in per_doc for c in chunks]
+        if needs_fit() and all_chunks:
+            # fallback embedder: learn IDF once, before the model name is saved with the index
+            fit_fallback([c["chunk_text"] for c in all_chunks])
+
+        vectors = embed([c["chunk_text"] for c in all_chunks]) if all_chunks else None
+        with self._lock:
+            self._reset()
+            for doc, chunks in per_doc:
+                self._register(doc, chunks)
+            if all_chunks:
+                self._append_rows([c["vid"] for c in all_chunks], vectors)
+                self._rebuild_index()
+
+    def _register(self, doc, chunks):
+        """Assign vector ids to ``chunks`` and record them under the doc."""
+        self._lexical = None
+        ids = []
+        for c in chunks:
+            c["vid"] = self.next_id
+            self.chunk_map[self.next_id] = c
+            ids.append(self.next_id)
+            self.next_id += 1
+        self.doc_chunks[doc["doc_id"]] = ids
+        self.doc_hashes[doc["doc_id"]] = content_hash(doc["text"])
+
+    def _append_rows(self, ids, vectors):
+        if _HAS_NUMPY:
+            vectors = np.asarray(vectors, dtype=np.float32)
+            ids = np.asarray(ids, dtype=np.int64)
+            if self.vectors is None or len(self.row_ids) == 0:
+                self.vectors, self.row_ids = vectors, ids
             else:
-                # keep as list of lists
-                self.vectors = [list(map(float, v)) for v in vectors]
+                self.vectors = np.vstack([np.asarray(self.vectors), vectors])
+                self.row_ids = np.concatenate([self.row_ids, ids])
+        else:
+            # keep as list of lists
+            self.vectors = (self.vectors or []) + [list(map(float, v)) for v in vectors]
+            self.row_ids = (self.row_ids or []) + list(ids)
 
-    def search(self, query, k=5):
-        q_vec = embed([query])
-        results = []
+    def _rebuild_index(self):
+        """(Re)build the faiss index from the stored vectors."""
+        self.stale = 0
+        if not _HAS_FAISS:
+            # fallback: search the stored vectors with numpy or pure Python
+            if self.index_type != "flat":
+                print(f"[WARNING] faiss is not installed; '{self.index_type}' index falls back to exact search")
+            self.built_type = "flat"
+            return
+        if self.vectors is None or len(self.row_ids) == 0:
+            self.index, self.built_type = None, None
+            return
+        self.index, self.built_type = build_faiss_index(
+            self.vectors, self.index_type, self.index_params, ids=self.row_ids)
+
+    # --------------------------------------------------
+    # INCREMENTAL UPDATES
+    # --------------------------------------------------
+
+    def changes(self, docs):
+        """``(changed, removed)``: doc_ids of ``docs`` whose content is not
+        indexed as it is, and indexed doc_ids missing from ``docs``."""
+        docs = [as_document(d, i) for i, d in enumerate(docs)]
+        with self._lock:
+            changed = [d["doc_id"] for d in docs if self.doc_hashes.get(d["doc_id"]) != content_hash(d["text"])]
+            wanted = {d["doc_id"] for d in docs}
+            removed = [doc_id for doc_id in self.doc_chunks if doc_id not in wanted]
+        return changed, removed
+
+    def upsert_many(self, docs, batch_size=EMBED_BATCH_SIZE, progress=None):
+        """Insert or replace documents by ``doc_id``.
+
+        Documents whose content hash is unchanged are skipped; changed ones
+        are embedded in batches of about ``batch_size`` chunks, calling
+        ``progress(done, total)`` (in documents) after each batch.
+        Returns the list of doc_ids that were (re)embedded.
+        """
+        docs = [as_document(d, i) for i, d in enumerate(docs)]
+        with self._lock:
+            changed = [d for d in docs if self.doc_hashes.get(d["doc_id"]) != content_hash(d["text"])]
+        if not changed:
+            return []
+
+        done = 0
+        batch, batch_chunks = [], 0
+        for n, doc in enumerate(changed, 1):
+            chunks = self._chunk(doc)
+            batch.append((doc, chunks))
+            batch_chunks += len(chunks)
+            if batch_chunks >= batch_size or n == len(changed):
+                self._apply(batch)
+                done += len(batch)
+                batch, batch_chunks = [], 0
+                if progress:
+                    progress(done, len(changed))
+        return [doc["doc_id"] for doc in changed]
+
+    def _apply(self, per_doc):
+        """Embed and swap in the chunks of a batch of ``(doc, chunks)``."""
+        texts = [c["chunk_text"] for _, chunks in per_doc for c in chunks]
+        # embed outside the lock: searches keep running on the current vectors
+        vectors = embed(texts) if texts else None
+
+        with self._lock:
+            for doc, _ in per_doc:
+                self._remove_ids(self.doc_chunks.pop(doc["doc_id"], []))
+            for doc, chunks in per_doc:
+                self._register(doc, chunks)
+            new_ids = [c["vid"] for _, chunks in per_doc for c in chunks]
+            if new_ids:
+                self._add_vectors(new_ids, vectors)
+
+    def upsert(self, doc_id, text, source=None):
+        """Insert or replace one document. Returns True if it was re-embedded."""
+        return bool(self.upsert_many([{"doc_id": doc_id, "source": source, "text": text}]))
+
+    def delete(self, doc_id):
+        """Remove a document and all its chunks. Returns False if unknown."""
+        with self._lock:
+            ids = self.doc_chunks.pop(doc_id, None)
+            if ids is None:
+                return False
+            self.doc_hashes.pop(doc_id, None)
+            self._remove_ids(ids)
+            return True
+
+    def sync(self, docs, batch_size=EMBED_BATCH_SIZE, progress=None):
+        """Make the index match ``docs`` exactly, touching only what changed.
+
+        Returns counts of ``embedded``, ``deleted`` and ``unchanged`` documents.
+        """
+        docs = [as_document(d, i) for i, d in enumerate(docs)]
+        wanted = {d["doc_id"] for d in docs}
+        embedded = self.upsert_many(docs, batch_size, progress)
+        with self._lock:
+            removed = [doc_id for doc_id in list(self.doc_chunks) if doc_id not in wanted]
+        for doc_id in removed:
+            self.delete(doc_id)
+        return {
+            "embedded": len(embedded),
+            "deleted": len(removed),
+            "unchanged": len(docs) - len(embedded),
+        }
+
+    def _add_vectors(self, ids, vectors):
+        self._append_rows(ids, vectors)
         if _HAS_FAISS and self.index is not None:
-            scores, idxs = self.index.search(q_vec, k)
-            for i in idxs[0]:
-                if i < len(self.texts):
-                    results.append(self.texts[i])
-            return results
+            self.index.add_with_ids(np.ascontiguousarray(vectors, dtype=np.float32),
+                                    np.asarray(ids, dtype=np.int64))
+        else:
+            self._rebuild_index()
+
+    def _remove_ids(self, ids):
+        if not ids:
+            return
+        self._lexical = None
+        for i in ids:
+            self.chunk_map.pop(i, None)
+
+        if _HAS_NUMPY:
+            keep = ~np.isin(self.row_ids, np.asarray(ids, dtype=np.int64))
+            self.vectors = np.asarray(self.vectors)[keep]
+            self.row_ids = self.row_ids[keep]
         else:
-            if self.vectors is None:
-                return []
-            # numpy-based similarity
+            gone = set(ids)
+            rows = [(v, i) for v, i in zip(self.vectors, self.row_ids) if i not in gone]
+            self.vectors = [v for v, _ in rows]
+            self.row_ids = [i for _, i in rows]
+
+        if _HAS_FAISS and self.index is not None:
+            try:
+                self.index.remove_ids(np.asarray(ids, dtype=np.int64))
+            except RuntimeError:
+                # HNSW graphs cannot drop nodes: hide them at search time and
+                # compact once they make up a noticeable share of the graph
+                self.stale += len(ids)
+                if self.stale > 0.2 * self.index.ntotal:
+                    self._rebuild_index()
+
+    # --------------------------------------------------
+    # PERSISTENCE
+    # --------------------------------------------------
+
+    def save(self, path):
+        """Write vectors, chunks and (if built) the faiss index to ``path``.
+
+        Files are written to a temporary sibling directory first and renamed
+        into place, so concurrent workers never see a half-written index.
+        Returns False when another writer had already put a directory at
+        ``path`` (which is left as it is).
+        """
+        path = Path(path)
+        tmp = path.with_name(f"{path.name}.tmp-{os.getpid()}-{threading.get_ident()}")
+        if tmp.exists():
+            shutil.rmtree(tmp)
+        tmp.mkdir(parents=True)
+
+        with self._lock:
+            np.save(tmp / "vectors.npy", np.asarray(self.vectors, dtype=np.float32))
+            np.save(tmp / "ids.npy", np.asarray(self.row_ids, dtype=np.int64))
+            # JSON lines, not one .json document: scripts that glob the tree
+            # for *.json must not pick the cached passages up as a corpus file
+            with open(tmp / "chunks.jsonl", "w", encoding="utf-8") as f:
+                for c in self.chunks:
+                    f.write(json.dumps(c, ensure_ascii=False) + "\n")
+            if _HAS_FAISS and self.index is not None:
+                faiss.write_index(self.index, str(tmp / "index.faiss"))
+            with open(tmp / "meta.json", "w", encoding="utf-8") as f:
+                json.dump({
+                    "format": CACHE_FORMAT_VERSION,
+                    "model": model_name(),
+                    "index_type": self.built_type,
+                    "count": len(self.chunk_map),
+                    "next_id": self.next_id,
+                    "doc_hashes": self.doc_hashes,
+                    "created_at": time.time(),
+                }, f)
+
+        try:
+            os.replace(tmp, path)
+        except OSError:
+            shutil.rmtree(tmp, ignore_errors=True)
+            if path.exists():
+                # another worker got there first
+                return False
+            raise
+        return True
+
+    def load(self, path, mmap=True):
+        """Load artifacts written by ``save``. Returns False if unusable.
+
+        With ``mmap=False`` everything is read into memory, which is needed
+        before the loaded index is modified with upsert/delete.
+        """
+        path = Path(path)
+        if not (path / "meta.json").exists():
+            return False
+
+        try:
+            with open(path / "meta.json", "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta.get("format") != CACHE_FORMAT_VERSION or meta.get("model") != model_name():
+                return False
+
+            # memory-map the vectors: unchanged corpora cost no embedding and no copy
+            vectors = np.load(path / "vectors.npy", mmap_mode="r" if mmap else None)
+            row_ids = np.load(path / "ids.npy")
+            with open(path / "chunks.jsonl", "r", encoding="utf-8") as f:
+                chunks = [json.loads(line) for line in f if line.strip()]
+            if not (len(chunks) == vectors.shape[0] == len(row_ids)):
+                return False
+
+            index = None
+            if _HAS_FAISS:
+                index_file = path / "index.faiss"
+                if index_file.exists() and not mmap:
+                    index = faiss.read_index(str(index_file))
+                elif index_file.exists():
+                    try:
+                        index = faiss.read_index(str(index_file), faiss.IO_FLAG_MMAP)
+                    except Exception:
+                        index = faiss.read_index(str(index_file))
+        except Exception as e:
+            print(f"[WARNING] Ignoring unreadable vector index {path}: {e}")
+            return False
+
+        with self._lock:
+            self._reset()
+            for c in chunks:
+                self.chunk_map[c["vid"]] = c
+                self.doc_chunks.setdefault(c["doc_id"], []).append(c["vid"])
+            self.doc_hashes = dict(meta.get("doc_hashes") or {})
+            self.next_id = int(meta.get("next_id", len(chunks)))
+            self.vectors = vectors
+            self.row_ids = row_ids
+            if index is None:
+                self._rebuild_index()
+            else:
+                self.index = index
+                self.built_type = meta.get("index_type") or "flat"
+                self.stale = max(0, index.ntotal - len(chunks))
+                # query-time knobs may differ from the ones the index was saved with
+                set_search_params(self.index, self.built_type, self.index_params)
+        return True
+
+    # --------------------------------------------------
+    # SEARCH
+    # --------------------------------------------------
+
+    def _hit(self, chunk, score):
+        return {
+            "doc_id": chunk.get("doc_id"),
+            "chunk_id": chunk.get("id"),
+            "score": float(score),
+            "source": chunk.get("source_file"),
+            "section": chunk.get("section"),
+            "page_start": chunk.get("page_start"),
+            "page_end": chunk.get("page_end"),
+            "text": chunk["chunk_text"],
+        }
+
+    def _top_k(self, q_vecs, k):
+        """Return ``(scores, ids)`` rows of the ``k`` best chunks per query.
+
+        Rows are sorted best-first and hold vector ids; missing slots are -1.
+        """
+        if _HAS_FAISS and self.index is not None:
+            # over-fetch past HNSW tombstones so k live hits remain
+            fetch = min(k + self.stale, self.index.ntotal)
+            return self.index.search(np.ascontiguousarray(q_vecs, dtype=np.float32), fetch)
+
+        if _HAS_NUMPY:
+            sims = np.asarray(q_vecs, dtype=np.float32) @ np.asarray(self.vectors).T
+            if k < sims.shape[1]:
+                # partial selection: O(n) per query instead of a full argsort
+                part = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+            else:
+                part = np.broadcast_to(np.arange(sims.shape[1]), (sims.shape[0], sims.shape[1]))
+            part_scores = np.take_along_axis(sims, part, axis=1)
+            order = np.argsort(-part_scores, axis=1)
+            rows = np.take_along_axis(part, order, axis=1)
+            return np.take_along_axis(part_scores, order, axis=1), self.row_ids[rows]
+
+        # pure-Python similarity (safe fallback)
+        scores, ids = [], []
+        for q in q_vecs:
+            q = [float(x) for x in q]
+            sims = [sum(a * b for a, b in zip(v, q)) for v in self.vectors]
+            best = heapq.nlargest(k, range(len(sims)), key=sims.__getitem__)
+            scores.append([sims[i] for i in best])
+            ids.append([self.row_ids[i] for i in best])
+        return scores, ids
+
+    def search_batch(self, queries, k=5, min_score=None, batch_size=256):
+        """Search many queries at once.
+
+        Queries are embedded per ``batch_size`` block through
+        ``embed_queries`` (LRU cache + micro-batching). Returns one list of
+        hit dicts per query
+        (``doc_id``, ``chunk_id``, ``score``, ``source``, ``section``,
+        ``page_start``, ``page_end``, ``text``), best first, dropping hits
+        scoring below ``min_score``.
+        """
+        queries = list(queries)
+        if not queries or not self.chunk_map:
+            return [[] for _ in queries]
+
+        results = []
+        for start in range(0, len(queries), batch_size):
+            block = queries[start:start + batch_size]
+            q_vecs = embed_queries(block)
             if _HAS_NUMPY:
-                q = np.array(q_vec[0], dtype=np.float32)
-                sims = np.dot(self.vectors, q)
-                idxs = np.argsort(-sims)[:k]
-                for i in idxs:
-                    if int(i) < len(self.texts):
-                        results.append(self.texts[int(i)])
-                return results
-            # pure-Python similarity (safe fallback)
-            q = [float(x) for x in q_vec[0]]
-            sims = []
-            for v in self.vectors:
-                # dot product
-                s = 0.0
-                for a, b in zip(v, q):
-                    s += a * b
-                sims.append(s)
-            # get top-k indices
-            idxs = sorted(range(len(sims)), key=lambda i: sims[i], reverse=True)[:k]
-            for i in idxs:
-                if i < len(self.texts):
-                    results.append(self.texts[i])
-            return results
+                q_vecs = np.asarray(q_vecs, dtype=np.float32)
+            with self._lock:
+                kk = min(k, len(self.chunk_map))
+                scores, ids = self._top_k(q_vecs, kk)
+                for row_scores, row_ids in zip(scores, ids):
+                    hits = []
+                    for score, vid in zip(row_scores, row_ids):
+                        chunk = self.chunk_map.get(int(vid))
+                        if chunk is None:
+                            continue
+                        if min_score is not None and score < min_score:
+                            continue
+                        hits.append(self._hit(chunk, score))
+                        if len(hits) == kk:
+                            break
+                    results.append(hits)
+        return results
+
+    def search(self, query, k=5, min_score=None):
+        """Return the text of the ``k`` passages most similar to ``query``."""
+        return [hit["text"] for hit in self.search_batch([query], k, min_score)[0]]
+
+    @property
+    def lexical(self):
+        """BM25 index over the current chunks (built on first use after a change)."""
+        lex = self._lexical
+        if lex is None:
+            with self._lock:
+                if self._lexical is None:
+                    vids = list(self.chunk_map)
+                    self._lexical = LexicalIndex().build(
+                        vids, [self.chunk_map[v]["chunk_text"] for v in vids])
+                lex = self._lexical
+        return lex
+
+    def search_hybrid(self, query, k=5, min_score=None,
+                      vector_weight=HYBRID_VECTOR_WEIGHT, lexical_weight=HYBRID_LEXICAL_WEIGHT,
+                      rrf_k=RRF_K, keyword_shortcut=KEYWORD_SHORTCUT):
+        """Fuse BM25 and vector hits with weighted reciprocal-rank fusion.
+
+        Returns hit dicts like ``search_batch`` where ``score`` is the fused
+        score and ``retrieval`` says which path answered ("lexical" for a
+        keyword shortcut, otherwise "hybrid"). ``min_score`` filters the
+        vector side only.
+        """
+        fetch = max(k * 4, 20)
+        lexical = self.lexical.search(query, fetch) if lexical_weight > 0 else []
+
+        if keyword_shortcut and lexical and self.lexical.is_keyword_match(query, lexical[0][0]):
+            hits = []
+            for vid, score in lexical:
+                chunk = self.chunk_map.get(vid)
+                if chunk is not None:
+                    hits.append({**self._hit(chunk, score), "retrieval": "lexical"})
+                if len(hits) == k:
+                    break
+            return hits
+
+        vector = self.search_batch([query], fetch, min_score)[0] if vector_weight > 0 else []
+
+        fused = {}
+        for rank, hit in enumerate(vector, 1):
+            entry = fused.setdefault(hit["chunk_id"], {**hit, "score": 0.0, "lexical_score": None})
+            entry["vector_score"] = hit["score"]
+            entry["score"] += vector_weight / (rrf_k + rank)
+        for rank, (vid, score) in enumerate(lexical, 1):
+            chunk = self.chunk_map.get(vid)
+            if chunk is None:
+                continue
+            entry = fused.get(chunk["id"])
+            if entry is None:
+                entry = fused[chunk["id"]] = {**self._hit(chunk, 0.0), "vector_score": None}
+            entry["lexical_score"] = score
+            entry["score"] += lexical_weight / (rrf_k + rank)
+
+        hits = sorted(fused.values(), key=lambda h: h["score"], reverse=True)[:k]
+        for hit in hits:
+            hit["retrieval"] = "hybrid"
+        return hits
@@ -0,0 +1,160 @@
+"""
+Lexical index – BM25 over the same chunks as the vector index.
+
+Exact tokens (course codes such as "PCC-CSM501", scheme names like
+"aikyashree", faculty surnames) match weakly in embedding space; an inverted
+index finds them directly. Postings are stored CSR-style in flat NumPy
+arrays with the BM25 weight of every (term, chunk) pair precomputed, so a
+query is a few array slices and additions.
+"""
+
+import math
+import os
+import re
+
+try:
+    import numpy as np
+    _HAS_NUMPY = True
+except Exception:
+    np = None
+    _HAS_NUMPY = False
+
+BM25_K1 = float(os.getenv("BM25_K1", "1.2"))
+BM25_B = float(os.getenv("BM25_B", "0.75"))
+
+# Function words carry no lexical signal; they are indexed but ignored when
+# deciding whether a query is a "keyword" query.
+STOPWORDS = frozenset("""
+a an and are as at be by can could do does for from has have how i if in is it
+its me my of on or our please should tell that the their there this to was we
+what when where which who whom whose why will with would you your
+""".split())
+
+# codes keep their joiners ("pcc-csm501") and are also indexed by part
+_TOKEN = re.compile(r"[a-z0-9]+(?:[-_/.][a-z0-9]+)*")
+_PART = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text):
+    tokens = []
+    for m in _TOKEN.finditer(text.lower()):
+        tok = m.group()
+        tokens.append(tok)
+        if not tok.isalnum():
+            tokens.extend(_PART.findall(tok))
+    return tokens
+
+
+class LexicalIndex:
+    """BM25 inverted index over chunks identified by vector id."""
+
+    def __init__(self, k1=BM25_K1, b=BM25_B):
+        self.k1 = k1
+        self.b = b
+        self.vocab = {}
+        self.ids = None          # row -> vector id
+        self.rows_of = {}        # vector id -> row
+        self.indptr = None       # term id -> slice of rows / weights
+        self.rows = None
+        self.weights = None
+        self.df = None
+
+    def __len__(self):
+        return 0 if self.ids is None else len(self.ids)
+
+    def build(self, ids, texts):
+        """Index ``texts`` under the matching vector ``ids``. Returns self."""
+        if not _HAS_NUMPY:
+            print("[WARNING] numpy is not installed; lexical search is disabled")
+            return self
+
+        rows, tids, tfs, lengths = [], [], [], []
+        for row, text in enumerate(texts):
+            tokens = tokenize(text)
+            lengths.append(len(tokens))
+            counts = {}
+            for tok in tokens:
+                counts[tok] = counts.get(tok, 0) + 1
+            for tok, tf in counts.items():
+                rows.append(row)
+                tids.append(self.vocab.setdefault(tok, len(self.vocab)))
+                tfs.append(tf)
+
+        n = len(texts)
+        self.ids = np.asarray(list(ids), dtype=np.int64)
+        self.rows_of = {int(v): r for r, v in enumerate(self.ids)}
+        rows = np.asarray(rows, dtype=np.int32)
+        tids = np.asarray(tids, dtype=np.int32)
+        tfs = np.asarray(tfs, dtype=np.float32)
+        lengths = np.asarray(lengths, dtype=np.float32)
+
+        self.df = np.bincount(tids, minlength=len(self.vocab)).astype(np.int32)
+        idf = np.log1p((n - self.df + 0.5) / (self.df + 0.5)).astype(np.float32)
+        avgdl = float(lengths.mean()) if n and lengths.mean() > 0 else 1.0
+        norm = self.k1 * (1 - self.b + self.b * lengths[rows] / avgdl)
+        weights = idf[tids] * tfs * (self.k1 + 1) / (tfs + norm)
+
+        order = np.argsort(tids, kind="stable")
+        self.rows = rows[order]
+        self.weights = weights[order].astype(np.float32)
+        self.indptr = np.zeros(len(self.vocab) + 1, dtype=np.int64)
+        np.cumsum(self.df, out=self.indptr[1:])
+        return self
+
+    def _term_ids(self, query):
+        seen, out = set(), []
+        for tok in tokenize(query):
+            tid = self.vocab.get(tok)
+            if tid is not None and tid not in seen:
+                seen.add(tid)
+                out.append(tid)
+        return out
+
+    def search(self, query, k=10):
+        """Return ``[(vector_id, bm25_score), ...]``, best first."""
+        if not len(self):
+            return []
+        tids = self._term_ids(query)
+        if not tids:
+            return []
+
+        scores = np.zeros(len(self.ids), dtype=np.float32)
+        for tid in tids:
+            s, e = self.indptr[tid], self.indptr[tid + 1]
+            # rows are unique within one posting list
+            scores[self.rows[s:e]] += self.weights[s:e]
+
+        matched = np.flatnonzero(scores)
+        if len(matched) > k:
+            matched = matched[np.argpartition(-scores[matched], k - 1)[:k]]
+        matched = matched[np.argsort(-scores[matched], kind="stable")]
+        return [(int(self.ids[r]), float(scores[r])) for r in matched]
+
+    def is_keyword_match(self, query, vector_id, max_terms=3, max_df=None):
+        """True when ``query`` is a short keyword query fully matched by the chunk.
+
+        Every content (non-stopword) term must occur in the chunk and at
+        least one of them must be rare (df <= ``max_df``), e.g. a course
+        code or a scheme name.
+        """
+        row = self.rows_of.get(vector_id)
+        if row is None:
+            return False
+        terms = [t for t in dict.fromkeys(tokenize(query)) if t not in STOPWORDS]
+        # a code's parts are implied by the code itself
+        terms = [t for t in terms if not any(t != o and t in _PART.findall(o) for o in terms)]
+        if not terms or len(terms) > max_terms:
+            return False
+        if max_df is None:
+            max_df = max(3, math.ceil(0.01 * len(self)))
+
+        rare = False
+        for term in terms:
+            tid = self.vocab.get(term)
+            if tid is None:
+                return False
+            s, e = self.indptr[tid], self.indptr[tid + 1]
+            if not np.any(self.rows[s:e] == row):
+                return False
+            rare = rare or self.df[tid] <= max_df
+        return rare
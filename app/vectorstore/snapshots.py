@@ -0,0 +1,340 @@
+"""
+Index snapshots – versioned VectorIndex generations with atomic hot-swap.
+
+Every generation is a saved VectorIndex under ``SNAPSHOT_DIR/gen-000001``,
+``gen-000002``, ... and the small ``LIVE`` pointer file names the generation
+being served (plus the previous ones, for rollback). A builder writes the
+complete generation, validates it and only then replaces ``LIVE`` with
+os.replace, so no reader ever sees a half-built index.
+
+The chatbot and the admin panel run as separate processes: the admin side
+builds and publishes generations, the chatbot calls ``refresh()`` and picks
+them up. Request handlers take ``current()`` once and keep that reference,
+so in-flight requests finish on the generation they started with.
+"""
+
+import json
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+
+from .index import VectorIndex
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+
+SNAPSHOT_DIR = os.getenv("VECTOR_SNAPSHOT_DIR", str(BASE_DIR / ".index_snapshots"))
+
+# generations kept on disk (the live one plus rollback targets)
+KEEP_GENERATIONS = int(os.getenv("VECTOR_SNAPSHOT_KEEP", "3"))
+
+# refuse a generation that lost more than this share of the live chunks
+MAX_SHRINK = float(os.getenv("VECTOR_SNAPSHOT_MAX_SHRINK", "0.5"))
+
+PROBE_QUERY = "admission"
+
+
+class SnapshotManager:
+    """Builds, validates, publishes and rolls back index generations."""
+
+    def __init__(self, root=SNAPSHOT_DIR, keep=KEEP_GENERATIONS, index_factory=VectorIndex):
+        self.root = Path(root)
+        self.keep = max(1, keep)
+        self.index_factory = index_factory
+        self._live = None            # (generation, VectorIndex) served by this process
+        self._pointer_mtime = None
+        self._swap_lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self.last_build = None       # status dict of the latest background build
+
+    # --------------------------------------------------
+    # POINTER / GENERATIONS ON DISK
+    # --------------------------------------------------
+
+    @property
+    def pointer_path(self):
+        return self.root / "LIVE"
+
+    def generation_path(self, generation):
+        return self.root / f"gen-{generation:06d}"
+
+    def read_pointer(self):
+        try:
+            with open(self.pointer_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_pointer(self, pointer):
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self.root / f"LIVE.tmp-{os.getpid()}-{threading.get_ident()}"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(pointer, f)
+        try:
+            os.replace(tmp, self.pointer_path)
+        except OSError as e:
+            # the caller must not treat the generation as live
+            print(f"[ERROR] Could not update vector index pointer {self.pointer_path}: {e}")
+            tmp.unlink(missing_ok=True)
+            raise
+        self._pointer_mtime = self.pointer_path.stat().st_mtime_ns
+
+    def generations(self):
+        """Generation numbers that are complete on disk, oldest first."""
+        if not self.root.exists():
+            return []
+        found = []
+        for p in self.root.glob("gen-*"):
+            if (p / "meta.json").exists():
+                try:
+                    found.append(int(p.name[4:]))
+                except ValueError:
+                    continue
+        return sorted(found)
+
+    def _load(self, generation, mmap=True):
+        index = self.index_factory()
+        if index.load(self.generation_path(generation), mmap=mmap):
+            return index
+        return None
+
+    def _prune(self):
+        pointer = self.read_pointer() or {}
+        protected = {pointer.get("generation")} | set(pointer.get("history", []))
+        newest = set(self.generations()[-self.keep:])
+        for g in self.generations():
+            if g not in protected and g not in newest:
+                # readers in other processes may still have it mapped; best effort
+                shutil.rmtree(self.generation_path(g), ignore_errors=True)
+
+    # --------------------------------------------------
+    # SERVING
+    # --------------------------------------------------
+
+    def current(self):
+        """The VectorIndex to use for one request (keep the reference)."""
+        live = self._live
+        return live[1] if live else None
+
+    def live_generation(self):
+        live = self._live
+        return live[0] if live else None
+
+    def refresh(self):
+        """Swap in the generation named by ``LIVE`` if it changed.
+
+        Costs one stat() when nothing changed. While one thread loads the new
+        generation, other requests keep serving the old one.
+        """
+        try:
+            mtime = self.pointer_path.stat().st_mtime_ns
+        except OSError:
+            return False
+        if mtime == self._pointer_mtime:
+            return False
+        if not self._swap_lock.acquire(blocking=False):
+            return False
+        try:
+            pointer = self.read_pointer()
+            if not pointer:
+                return False
+            generation = pointer["generation"]
+            if generation == self.live_generation():
+                self._pointer_mtime = mtime
+                return False
+            index = self._load(generation)
+            self._pointer_mtime = mtime
+            if index is None:
+                print(f"[WARNING] Vector index generation {generation} could not be loaded; keeping "
+                      f"generation {self.live_generation()}")
+                return False
+            index.lexical  # build BM25 before requests see the index
+            self._live = (generation, index)
+            print(f"[INFO] Vector index generation {generation} is live ({len(index)} chunks)")
+            return True
+        finally:
+            self._swap_lock.release()
+
+    def start(self, load_docs):
+        """Serve the live generation, publishing a new one if the corpus changed.
+
+        ``load_docs`` returns the documents to index (see VectorIndex.build).
+        The documents are compared with the memory-mapped live generation; a
+        copy to update is loaded only when something changed. A generation
+        pinned by ``rollback()`` is served as it is.
+        """
+        started = time.perf_counter()
+        self.refresh()
+        docs = load_docs()
+        live = self.current()
+        if live is not None:
+            changed, removed = live.changes(docs)
+            if not changed and not removed:
+                print(f"[INFO] Vector index snapshot HIT (generation {self.live_generation()}): "
+                      f"{len(live)} chunks loaded in {time.perf_counter() - started:.2f}s")
+                return live
+            if (self.read_pointer() or {}).get("rolled_back"):
+                print(f"[WARNING] Vector index generation {self.live_generation()} was rolled back; serving it "
+                      f"although {len(changed) + len(removed)} documents changed (reindex to publish them)")
+                return live
+            print(f"[INFO] Vector index snapshot MISS (generation {self.live_generation()}): "
+                  f"{len(changed)} changed and {len(removed)} removed documents")
+        else:
+            print(f"[INFO] Vector index snapshot MISS: no usable generation, indexing {len(docs)} documents")
+
+        candidate, stats = self.build(docs)
+        try:
+            self.publish(candidate, force=self.current() is None)
+        except ValueError as e:
+            # a suspicious corpus must not keep the chatbot from starting
+            print(f"[WARNING] {e}; keeping generation {self.live_generation()}")
+        return self.current()
+
+    # --------------------------------------------------
+    # BUILDING / PUBLISHING
+    # --------------------------------------------------
+
+    def build(self, docs, progress=None):
+        """Build a candidate index for ``docs`` without making it live.
+
+        Starts from a copy of the live generation so only changed documents
+        are embedded; ``progress(done, total)`` is called between embedding
+        batches. Returns ``(candidate, stats)``.
+        """
+        pointer = self.read_pointer()
+        candidate = None
+        if pointer:
+            candidate = self._load(pointer["generation"], mmap=False)
+        if candidate is not None:
+            return candidate, candidate.sync(docs, progress=progress)
+
+        candidate = self.index_factory()
+        candidate.build(docs)
+        if progress:
+            progress(len(docs), len(docs))
+        return candidate, {"embedded": len(docs), "deleted": 0, "unchanged": 0}
+
+    def validate(self, candidate):
+        """Return a reason to reject ``candidate``, or None if it may go live."""
+        if len(candidate) == 0:
+            return "index is empty"
+        pointer = self.read_pointer() or {}
+        live_count = pointer.get("count") or 0
+        if live_count and len(candidate) < (1 - MAX_SHRINK) * live_count:
+            return f"index has {len(candidate)} chunks but the live one has {live_count}"
+        try:
+            if not candidate.search_batch([PROBE_QUERY], k=1)[0]:
+                return "probe query returned no passages"
+        except Exception as e:
+            return f"probe query failed: {e}"
+        return None
+
+    def publish(self, candidate, force=False):
+        """Validate ``candidate``, save it as a new generation and make it live.
+
+        Raises ValueError when validation fails (unless ``force``) and
+        OSError when the generation or the pointer cannot be written.
+        Returns the new generation number.
+        """
+        problem = self.validate(candidate)
+        if problem and not force:
+            raise ValueError(f"Refusing to publish vector index: {problem}")
+
+        candidate.lexical  # build BM25 before requests see the index
+        with self._swap_lock:
+            # the chatbot and the admin panel both publish: the directory
+            # rename is atomic, so a number another process saved first is
+            # skipped instead of shared
+            generation = max(self.generations(), default=0) + 1
+            while not candidate.save(self.generation_path(generation)):
+                generation += 1
+            pointer = self.read_pointer() or {}
+            history = ([pointer["generation"]] if pointer.get("generation") else []) + pointer.get("history", [])
+            self._write_pointer({
+                "generation": generation,
+                "count": len(candidate),
+                "history": history[:self.keep - 1],
+                "published_at": time.time(),
+            })
+            self._live = (generation, candidate)
+        self._prune()
+        print(f"[INFO] Published vector index generation {generation} ({len(candidate)} chunks)")
+        return generation
+
+    def rollback(self):
+        """Make the previous generation live again. Returns its number."""
+        with self._swap_lock:
+            pointer = self.read_pointer() or {}
+            history = pointer.get("history") or []
+            if not history:
+                raise ValueError("No previous vector index generation to roll back to")
+            generation = history[0]
+            index = self._load(generation)
+            if index is None:
+                raise ValueError(f"Vector index generation {generation} is missing or unreadable")
+            index.lexical  # build BM25 before requests see the index
+            self._write_pointer({
+                "generation": generation,
+                "count": len(index),
+                "history": history[1:],
+                "published_at": time.time(),
+                # start() must not publish over an explicit rollback
+                "rolled_back": True,
+            })
+            self._live = (generation, index)
+        print(f"[INFO] Rolled back to vector index generation {generation}")
+        return generation
+
+    def rebuild_async(self, load_docs, progress=None, on_done=None):
+        """Build and publish a new generation in a background thread.
+
+        ``progress`` is passed to ``build``; ``on_done(status)`` runs when the
+        build finished or failed. Returns False (and starts nothing) when a
+        build is already running.
+        """
+        if not self._build_lock.acquire(blocking=False):
+            return False
+
+        status = {"state": "running", "started_at": time.time()}
+        self.last_build = status
+
+        def run():
+            try:
+                candidate, stats = self.build(load_docs(), progress=progress)
+                status.update(stats)
+                pointer = self.read_pointer()
+                if pointer and not stats["embedded"] and not stats["deleted"]:
+                    # nothing changed: keep serving the live generation
+                    status["generation"] = pointer["generation"]
+                else:
+                    status["generation"] = self.publish(candidate)
+                status["state"] = "done"
+            except Exception as e:
+                print(f"[ERROR] Vector index rebuild failed: {e}")
+                status["state"] = "failed"
+                status["error"] = str(e)
+            finally:
+                status["finished_at"] = time.time()
+                self._build_lock.release()
+                if on_done:
+                    try:
+                        on_done(status)
+                    except Exception as e:
+                        print(f"[WARNING] Rebuild completion callback failed: {e}")
+
+        threading.Thread(target=run, name="vector-index-rebuild", daemon=True).start()
+        return True
+
+    def status(self):
+        pointer = self.read_pointer() or {}
+        return {
+            "live_generation": pointer.get("generation"),
+            "served_generation": self.live_generation(),
+            "chunks": pointer.get("count"),
+            "history": pointer.get("history", []),
+            "rolled_back": bool(pointer.get("rolled_back")),
+            "generations": self.generations(),
+            "building": self._build_lock.locked(),
+            "last_build": self.last_build,
+        }
@@ -6,23 +6,19 @@ from pathlib import Path
 from app.core.intent import detect_intent
 from app.core.retriever import retrieve
 from app.core.prompt_builder import build_prompt
-from app.vectorstore.index import VectorIndex
+from app.vectorstore.corpus import load_documents
+from app.vectorstore.snapshots import SnapshotManager
 
 BASE_DIR = Path(__file__).resolve().parent
 
-# Load all JSON documents
+# Load all JSON documents (skips the index caches, see app.vectorstore.corpus)
+DOCUMENTS = load_documents(BASE_DIR)
+
 def load_docs():
     docs = []
-    for p in BASE_DIR.rglob("*.json"):
-        if '.venv' in str(p) or 'node_modules' in str(p):
-            continue
-        try:
-            with open(p, "r", encoding="utf-8") as f:
-                content = json.dumps(json.load(f))
-                docs.append(content)
-                print(f"✓ Loaded: {p.name}")
-        except Exception as e:
-            print(f"✗ Failed: {p.name} - {e}")
+    for doc in DOCUMENTS:
+        docs.append(doc["text"])
+        print(f"✓ Loaded: {doc['source']}")
     return docs
 
 print("=" * 80)
@@ -34,8 +30,7 @@ print(f"\n✓ Total documents loaded: {len(ALL_DOCS)}")
 print("\n" + "=" * 80)
 print("BUILDING VECTOR INDEX")
 print("=" * 80)
-VECTOR_INDEX = VectorIndex()
-VECTOR_INDEX.build(ALL_DOCS)
+VECTOR_INDEX = SnapshotManager().start(lambda: DOCUMENTS)
 print("✓ Vector index built successfully")
 
 # Test queries
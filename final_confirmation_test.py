@@ -9,7 +9,7 @@ from new_app import ALL_DOCS, VECTOR_INDEX
 from app.core.intent import detect_intent
 from app.core.retriever import retrieve
 from app.core.prompt_builder import build_prompt
-from app.llm.gemini_client import ask_gemini
+from app.llm.gemini_client import ask_gemini, GeminiError
 
 def test_query(query, expected_in_response):
     print("\n" + "="*80)
@@ -32,7 +32,10 @@ def test_query(query, expected_in_response):
     
     # Get AI response
     prompt = build_prompt(query, context)
-    answer = ask_gemini(prompt)
+    try:
+        answer = ask_gemini(prompt)
+    except GeminiError as e:
+        answer = f"{type(e).__name__}: {e}"
     
     print(f"\nAI Response:")
     print("-"*80)
@@ -1,10 +1,11 @@
-from flask import Flask, request, jsonify, render_template, send_from_directory, redirect, url_for
+from flask import Flask, Response, request, jsonify, render_template, send_from_directory, redirect, url_for, stream_with_context
 from flask_cors import CORS
 # Import Jinja2 loaders to handle multiple template folders without conflicts
 from jinja2 import ChoiceLoader, FileSystemLoader, PrefixLoader
 import html
 import json
 import os
+import time
 from pathlib import Path
 from datetime import datetime
 import requests
@@ -17,10 +18,25 @@ from app.core.intent import (
     SCHOLARSHIPS,
     SCHOLARSHIP_ID_TO_SLUG,
 )
-from app.core.retriever import retrieve
-from app.core.prompt_builder import build_prompt
-from app.vectorstore.index import VectorIndex
-from app.llm.gemini_client import ask_gemini
+from app.core.query_normalizer import QueryNormalizer
+from app.core.retriever import retrieve, source_files
+from app.core.resource_cache import RESOURCES
+from app.core.prompt_builder import PROMPT_VERSION, SYSTEM_INSTRUCTION, build_user_prompt
+from app.core.answer_cache import ANSWER_CACHE
+from app.core.context_packer import estimate_cost, estimate_tokens, pack_context
+from app.core.document_parser import prepare_documents
+from app.vectorstore.admin_content import load_index_documents
+from app.vectorstore.embeddings import embedding_stats
+from app.vectorstore.snapshots import SnapshotManager
+from app.llm.gemini_client import (
+    GEMINI_CLIENT,
+    ask_gemini,
+    stream_gemini,
+    GeminiError,
+    GeminiRateLimitError,
+    GeminiTimeoutError,
+    GeminiUnavailableError,
+)
 
 # Import blueprints
 from login.app import login_bp
@@ -53,96 +69,53 @@ app.jinja_loader = ChoiceLoader([
 
 def load_docs():
     """Load all JSON documents for the chatbot"""
-    docs = []
-    seen = set()
-
-    # Prefer structured Resources folder
-    resources = BASE_DIR / 'Resources'
-    if resources.exists():
-        # load .json files
-        for p in resources.rglob("*.json"):
-            try:
-                with open(p, "r", encoding="utf-8") as f:
-                    obj = json.load(f)
-                    s = json.dumps(obj, ensure_ascii=False)
-                    if s not in seen:
-                        docs.append(s)
-                        seen.add(s)
-            except Exception:
-                continue
-
-        # load .jsonl files - treat as regular JSON
-        # (Previous implementation treated each line separately, causing fragments)
-        for p in resources.rglob("*.jsonl"):
-            try:
-                with open(p, "r", encoding="utf-8") as f:
-                    obj = json.load(f)
-                    s = json.dumps(obj, ensure_ascii=False)
-                    if s not in seen:
-                        docs.append(s)
-                        seen.add(s)
-            except Exception:
-                continue
-
-        # extract text from PDFs (if PyPDF2 is installed)
-        for p in resources.rglob("*.pdf"):
-            try:
-                try:
-                    import PyPDF2
-                    reader = PyPDF2.PdfReader(str(p))
-                    pages = []
-                    for page in reader.pages:
-                        try:
-                            t = page.extract_text() or ""
-                        except Exception:
-                            t = ""
-                        pages.append(t)
-                    text = "\n\n".join(pages).strip()
-                    if text:
-                        payload = json.dumps({"source": str(p.name), "text": text}, ensure_ascii=False)
-                        if payload not in seen:
-                            docs.append(payload)
-                            seen.add(payload)
-                except Exception:
-                    # if extraction unavailable, store filename as hint
-                    hint = json.dumps({"source": str(p.name), "note": "pdf-not-extracted"}, ensure_ascii=False)
-                    if hint not in seen:
-                        docs.append(hint)
-                        seen.add(hint)
-            except Exception:
-                continue
-
-    # Fallback: include any other JSONs across repo (keeps previous behavior)
-    for p in BASE_DIR.rglob("*.json"):
-        try:
-            with open(p, "r", encoding="utf-8") as f:
-                s = json.dumps(json.load(f), ensure_ascii=False)
-                if s not in seen:
-                    docs.append(s)
-                    seen.add(s)
-        except Exception:
-            continue
-
-    return docs
+    return [doc["text"] for doc in DOCUMENTS]
 
 print("[INFO] Loading chatbot knowledge base...")
+DOCUMENTS = load_index_documents(BASE_DIR)
 ALL_DOCS = load_docs()
 print(f"[INFO] Loaded {len(ALL_DOCS)} documents")
 
-# Build vector index ONCE
+# Serve the live index generation (chunk-level; only changed documents are
+# re-embedded). Admin reindex jobs publish new generations that /chat swaps in.
 print("[INFO] Building vector search index (this may take a minute on first run)...")
-VECTOR_INDEX = VectorIndex()
-VECTOR_INDEX.build(ALL_DOCS)
-print("[INFO] Vector index ready!")
+SNAPSHOTS = SnapshotManager()
+VECTOR_INDEX = SNAPSHOTS.start(lambda: DOCUMENTS)
+print(f"[INFO] Vector index ready! (generation {SNAPSHOTS.live_generation()}, {len(VECTOR_INDEX.chunks)} passages)")
+
+# Authoritative resource files (faculty, exam, holiday, ...) are served from memory
+RESOURCES.preload()
+
+# Parse + render every passage once now instead of on each request
+prepare_documents(c["chunk_text"] for c in VECTOR_INDEX.chunks)
+prepare_documents(ALL_DOCS)
+
+# Typo / course-code cleanup in front of intent detection; words that occur
+# in the corpus are left alone
+QUERY_NORMALIZER = QueryNormalizer.from_texts(ALL_DOCS)
+
+SYSTEM_TOKENS = estimate_tokens(SYSTEM_INSTRUCTION)
+
+# Answers from earlier runs; those whose source files changed are dropped
+if ANSWER_CACHE is not None:
+    print(f"[INFO] Answer cache: {ANSWER_CACHE.warm()} answers loaded")
 
 
 # ============================================================================
 # CHATBOT API ENDPOINT
 # ============================================================================
 
-@app.route("/chat", methods=["POST"])
-def chat():
-    """Main chatbot endpoint for AI queries"""
+def chat_reply(body, status=200):
+    return {"reply": body, "status": status}
+
+
+def prepare_chat():
+    """
+    Everything /chat does before the LLM call. Returns ``{"reply", "status"}``
+    for questions answered without the LLM (settings, events, placement,
+    scholarships, errors) or ``{"intent", "query", "context", "prompt"}``
+    for the LLM.
+    """
     # check admin backend to see if chatbot is enabled
     try:
         r = requests.get("http://localhost:8000/api/chatbot/settings", timeout=2)
@@ -152,17 +125,17 @@ def chat():
                 settings = js['data']
                 # Check if maintenance mode is enabled
                 if settings.get('maintenance_mode', False):
-                    return jsonify({
+                    return chat_reply({
                         "intent": "maintenance",
                         "response": settings.get('maintenance_message', 
                                                 "The chatbot is currently under maintenance. Please check back later.")
-                    }), 200
+                    })
                 # Check if chatbot is disabled
                 if not settings.get('enabled', True):
-                    return jsonify({
+                    return chat_reply({
                         "intent": "disabled",
                         "response": "Chatbot has been disabled by the admin."
-                    }), 200
+                    })
     except Exception as e:
         # if admin backend unreachable, assume enabled (fail-open)
         print(f"[WARNING] Could not connect to admin panel: {e}")
@@ -172,7 +145,14 @@ def chat():
     query = data.get("query", "").strip()
 
     if not query:
-        return jsonify({"error": "Empty query"}), 400
+        return chat_reply({"error": "Empty query"}, 400)
+
+    # "kannyashree" / "bscm 301" -> "kanyashree" / "bscm301" so misspelt
+    # queries still reach the keyword and subject-file paths below
+    normalized = QUERY_NORMALIZER.normalize(query)
+    if normalized["corrections"]:
+        print(f"[INFO] Normalized query: {query!r} -> {normalized['query']!r}")
+        query = normalized["query"]
 
     intent = detect_intent(query)
 
@@ -206,13 +186,13 @@ def chat():
                 "Here are the hackathons and events I have on record:<br>" + "<br>".join(lines)
             )
 
-            return jsonify({
+            return chat_reply({
                 "intent": intent,
                 "response": response_text
             })
         except Exception as e:
             print(f"[ERROR] Failed to load events data: {e}")
-            return jsonify({
+            return chat_reply({
                 "intent": intent,
                 "response": "Sorry, I couldn't load the event details right now."
             })
@@ -247,13 +227,13 @@ def chat():
 
             response_text = header + "<br>".join(lines)
 
-            return jsonify({
+            return chat_reply({
                 "intent": intent,
                 "response": response_text
             })
         except Exception as e:
             print(f"[ERROR] Failed to load placement data: {e}")
-            return jsonify({
+            return chat_reply({
                 "intent": intent,
                 "response": "Sorry, I couldn't load the placement details right now."
             })
@@ -262,8 +242,8 @@ def chat():
     if intent == "scholarship":
         print(f"[DEBUG] Scholarship intent detected for query: {query}")
         
-        # Find all matching scholarships
-        matched_scholarships = find_all_scholarships(query)
+        # Matching scholarships (already found above, before intent override)
+        matched_scholarships = prelim_matches
         print(f"[DEBUG] Found {len(matched_scholarships)} matching scholarships")
         
         if len(matched_scholarships) > 1:
@@ -279,7 +259,7 @@ def chat():
                     "id": sch.get("scholarship_id", "")
                 })
             
-            return jsonify({
+            return chat_reply({
                 "intent": intent,
                 "needs_disambiguation": True,
                 "options": options,
@@ -312,26 +292,83 @@ def chat():
                 "has_scholarship_link": True
             }
             print(f"[DEBUG] Returning response with slug: {scholarship_slug}")
-            return jsonify(response_data)
+            return chat_reply(response_data)
 
     # Default AI response flow
-    docs = retrieve(
+    # pick up a newly published index generation; this request keeps using
+    # the one it gets here even if another swap happens meanwhile
+    SNAPSHOTS.refresh()
+    hits = retrieve(
         query=query,
         intent=intent,
-        vector_index=VECTOR_INDEX,
-        fallback_docs=ALL_DOCS
+        vector_index=SNAPSHOTS.current(),
+        fallback_docs=ALL_DOCS,
+        with_scores=True
     )
 
-    # Retriever already filters and parses context; just join for the prompt
-    context_items = docs if docs is not None else []
+    # Retriever already filters and parses context; pack the highest-scoring
+    # passages into the intent's token budget (unscored ones keep their order)
+    context_items = [text for text, _ in hits]
+    scores = [score for _, score in hits]
+    packed = pack_context(context_items, intent, scores=scores)
+
+    # the fixed rules go as the (context-cached) system instruction
+    prompt = build_user_prompt(query, packed["context"])
+    prompt_tokens = estimate_tokens(prompt)
+    print(f"[INFO] Prompt ~{prompt_tokens} tokens + ~{SYSTEM_TOKENS} cached system tokens "
+          f"(context {packed['tokens']}/{packed['budget']}: "
+          f"{len(packed['items'])} passages, {packed['truncated']} truncated, {packed['dropped']} dropped, "
+          f"{packed['duplicates']} duplicates; input ~${estimate_cost(prompt_tokens, cached_tokens=SYSTEM_TOKENS):.5f})")
+    return {"intent": intent, "query": query, "context": packed["context"], "prompt": prompt}
+
+
+def cached_answer(prepared):
+    """Answer cache hit for a prepared LLM request, or None"""
+    if ANSWER_CACHE is None:
+        return None
+    hit = ANSWER_CACHE.get(prepared["intent"], prepared["query"], prepared["context"], PROMPT_VERSION)
+    if hit is not None:
+        print(f"[INFO] Answer cache hit ({hit['match']}), saved ~{hit['llm_seconds']:.2f}s of LLM time")
+    return hit
+
+
+def cache_answer(prepared, answer, llm_seconds):
+    if ANSWER_CACHE is None:
+        return
+    try:
+        ANSWER_CACHE.put(prepared["intent"], prepared["query"], prepared["context"], PROMPT_VERSION,
+                         answer, llm_seconds, source_files(prepared["query"], prepared["intent"]))
+    except Exception as e:
+        # a cache that cannot write must not cost the student the answer
+        print(f"[WARNING] Could not cache answer: {e}")
 
-    if isinstance(context_items, list):
-        context = "\n\n".join(str(item) for item in context_items[:3])
-    else:
-        context = str(context_items)
-    
-    prompt = build_prompt(query, context)
-    answer = ask_gemini(prompt)
+
+@app.route("/chat", methods=["POST"])
+def chat():
+    """Main chatbot endpoint for AI queries"""
+    if request.accept_mimetypes.best == "text/event-stream":
+        return chat_stream()
+
+    prepared = prepare_chat()
+    if "reply" in prepared:
+        return jsonify(prepared["reply"]), prepared["status"]
+
+    intent = prepared["intent"]
+    hit = cached_answer(prepared)
+    if hit is not None:
+        return jsonify({
+            "intent": intent,
+            "response": hit["answer"],
+            "cached": True
+        })
+
+    started = time.perf_counter()
+    try:
+        answer = ask_gemini(prepared["prompt"], system=SYSTEM_INSTRUCTION)
+    except GeminiError as e:
+        print(f"[ERROR] Gemini request failed ({type(e).__name__}): {e}")
+        return gemini_error_response(intent, e)
+    cache_answer(prepared, answer, time.perf_counter() - started)
 
     return jsonify({
         "intent": intent,
@@ -339,6 +376,108 @@ def chat():
     })
 
 
+def gemini_error_message(error):
+    """Student-facing message and HTTP status for a failed Gemini request"""
+    if isinstance(error, GeminiRateLimitError):
+        return "I'm getting a lot of questions right now. Please try again in a minute.", 429
+    if isinstance(error, GeminiTimeoutError):
+        return "That took too long to answer. Please try again.", 504
+    if isinstance(error, GeminiUnavailableError):
+        return "I can't reach the answer service right now. Please try again shortly.", 503
+    return "Sorry, I couldn't answer that right now. Please contact the university office if it keeps happening.", 502
+
+
+def gemini_error_response(intent, error):
+    message, status = gemini_error_message(error)
+    response = jsonify({
+        "intent": intent,
+        "response": message,
+        "error": type(error).__name__
+    })
+    response.status_code = status
+    if error.retry_after is not None:
+        response.headers["Retry-After"] = str(max(int(error.retry_after + 0.999), 1))
+    return response
+
+
+# ============================================================================
+# STREAMING CHAT (Server-Sent Events)
+# ============================================================================
+# Same answers as /chat, sent as they are generated:
+#   event: meta   {"intent", "streaming", "cached" or the scholarship /
+#                  disambiguation fields of /chat}                 (always first)
+#   event: delta  {"text"}                                         (answer pieces)
+#   event: error  {"error", "response"}                            (LLM failure)
+#   event: done   {"ttft_ms", "total_ms"}
+# Answers that need no LLM, and cached answers, arrive as one delta.
+
+def sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def stream_answer(prepared, started):
+    """SSE events for a prepared /chat request; times are from ``started``."""
+    if "reply" in prepared:
+        body = dict(prepared["reply"])
+        text = body.pop("response", "")
+        yield sse_event("meta", body)
+        if text:
+            yield sse_event("delta", {"text": text})
+        elapsed = round((time.perf_counter() - started) * 1000, 1)
+        yield sse_event("done", {"ttft_ms": elapsed, "total_ms": elapsed})
+        return
+
+    intent = prepared["intent"]
+    hit = cached_answer(prepared)
+    if hit is not None:
+        yield sse_event("meta", {"intent": intent, "cached": True})
+        yield sse_event("delta", {"text": hit["answer"]})
+        elapsed = round((time.perf_counter() - started) * 1000, 1)
+        yield sse_event("done", {"ttft_ms": elapsed, "total_ms": elapsed})
+        return
+
+    yield sse_event("meta", {"intent": intent, "streaming": True})
+    first, pieces, parts = None, 0, []
+    llm_started = time.perf_counter()
+    answer = stream_gemini(prepared["prompt"], system=SYSTEM_INSTRUCTION)
+    try:
+        for text in answer:
+            if first is None:
+                first = time.perf_counter() - started
+            pieces += 1
+            parts.append(text)
+            yield sse_event("delta", {"text": text})
+        # only whole answers are cached
+        cache_answer(prepared, "".join(parts), time.perf_counter() - llm_started)
+    except GeminiError as e:
+        print(f"[ERROR] Gemini stream failed ({type(e).__name__}): {e}")
+        message, _ = gemini_error_message(e)
+        yield sse_event("error", {"error": type(e).__name__, "response": message})
+    except GeneratorExit:
+        # the student closed the page; closing stream_gemini drops the upstream call
+        answer.close()
+        print(f"[INFO] Stream closed by client after {pieces} pieces")
+        raise
+    total = time.perf_counter() - started
+    ttft = round(first * 1000, 1) if first is not None else None
+    print(f"[INFO] Streamed answer: first token {ttft} ms, total {total * 1000:.1f} ms, {pieces} pieces")
+    yield sse_event("done", {"ttft_ms": ttft, "total_ms": round(total * 1000, 1)})
+
+
+@app.route("/chat/stream", methods=["POST"])
+def chat_stream():
+    """/chat as Server-Sent Events"""
+    started = time.perf_counter()
+    prepared = prepare_chat()
+    if "reply" in prepared and prepared["status"] != 200:
+        return jsonify(prepared["reply"]), prepared["status"]
+    return Response(
+        stream_with_context(stream_answer(prepared, started)),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.route("/scholarship-by-slug", methods=["POST"])
 def get_scholarship_by_slug():
     """Get specific scholarship details by slug"""
@@ -814,11 +953,24 @@ def api_status():
             "scholarship": "/scholarship",
             "login": "/login",
             "admin": "/admin",
-            "profile": "/profile"
+            "profile": "/profile",
+            "stats": "/api/stats"
         }
     })
 
 
+@app.route("/api/stats")
+def api_stats():
+    """Performance counters (embedding cache / batching, live index, answer cache, Gemini calls)"""
+    return jsonify({
+        "embeddings": embedding_stats(),
+        "index": SNAPSHOTS.status(),
+        "resources": RESOURCES.stats(),
+        "answers": ANSWER_CACHE.stats() if ANSWER_CACHE is not None else None,
+        "gemini": GEMINI_CLIENT.stats(),
+    })
+
+
 # ============================================================================
 # ERROR HANDLERS
 # ============================================================================
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Time to first token of /chat vs /chat/stream against a local Gemini stub.
+
+The stub plays Gemini: generateContent answers after the whole generation
+time, streamGenerateContent (``alt=sse``) sends the same answer as
+``--chunks`` server-sent events, the first after ``--first-ms`` and then
+one every ``--chunk-ms``. new_app is imported with GEMINI_API_URL pointed
+at the stub and driven through Flask's test client, so routing, retrieval
+and prompt building are the real ones.
+
+For /chat the first token is the whole response. For /chat/stream it is
+the first ``delta`` event. A last run reads one delta and hangs up, to
+check that the upstream stream is closed too (the stub sees the write
+fail).
+
+Examples:
+    python scripts/bench_chat_stream.py
+    python scripts/bench_chat_stream.py --first-ms 400 --chunks 40 --chunk-ms 30 --json
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+import argparse
+import json
+import os
+import socket
+import sys
+import threading
+import time
+
+import numpy as np
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+QUERIES = [
+    "hod of cse", "faculty working on machine learning", "syllabus of bscm301", "holiday list",
+    "exam rules", "library timing", "dress code policy", "who is the chancellor",
+    "what is the fee structure", "how do i get a bonafide certificate",
+]
+
+WORDS = ("Thank you for your question. According to the university records, the answer is as "
+         "follows, and you may contact the office for further details. ").split()
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def log_message(self, *args):
+        pass
+
+    def _pieces(self):
+        n = self.server.chunks
+        return [" ".join(WORDS[(i * 3) % len(WORDS):(i * 3) % len(WORDS) + 3]) + " " for i in range(n)]
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if ":streamGenerateContent" in self.path:
+            self.stream()
+            return
+        time.sleep(self.server.first + self.server.step * (self.server.chunks - 1))
+        body = json.dumps({"candidates": [{"content": {"parts": [{"text": "".join(self._pieces())}]}}]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def stream(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            for i, piece in enumerate(self._pieces()):
+                time.sleep(self.server.first if i == 0 else self.server.step)
+                event = f"data: {json.dumps({'candidates': [{'content': {'parts': [{'text': piece}]}}]})}\r\n\r\n"
+                data = event.encode("utf-8")
+                self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+            self.wfile.write(b"0\r\n\r\n")
+            self.server.count("completed")
+        except (BrokenPipeError, ConnectionResetError):
+            self.server.count("aborted")
+            self.close_connection = True
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, first, step, chunks):
+        super().__init__(("127.0.0.1", 0), StubHandler)
+        self.first, self.step, self.chunks = first, step, chunks
+        self.lock = threading.Lock()
+        self.counts = {"completed": 0, "aborted": 0}
+
+    def count(self, key):
+        with self.lock:
+            self.counts[key] += 1
+
+
+def sse_events(response):
+    """(seconds since start of iteration, event name, data) for a streamed Flask test response."""
+    buffer = ""
+    for chunk in response.response:
+        buffer += chunk.decode("utf-8") if isinstance(chunk, bytes) else chunk
+        while "\n\n" in buffer:
+            raw, buffer = buffer.split("\n\n", 1)
+            name, data = "message", None
+            for line in raw.splitlines():
+                if line.startswith("event:"):
+                    name = line[6:].strip()
+                elif line.startswith("data:"):
+                    data = json.loads(line[5:])
+            yield name, data
+
+
+def main():
+    parser = argparse.ArgumentParser(description="/chat vs /chat/stream time to first token")
+    parser.add_argument("--first-ms", type=float, default=300, help="stub delay before the first piece")
+    parser.add_argument("--chunk-ms", type=float, default=40, help="stub delay between pieces")
+    parser.add_argument("--chunks", type=int, default=30, help="pieces per answer")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    server = StubServer(args.first_ms / 1000, args.chunk_ms / 1000, args.chunks)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    os.environ["GEMINI_API_KEY"] = "stub"
+    os.environ["GEMINI_API_URL"] = f"http://127.0.0.1:{server.server_address[1]}/v1beta/models/stub:generateContent"
+    os.environ.pop("GEMINI_STREAM_URL", None)
+
+    import new_app
+    client = new_app.app.test_client()
+
+    rows = []
+    for query in QUERIES:
+        t0 = time.perf_counter()
+        plain = client.post("/chat", json={"query": query})
+        chat_ms = (time.perf_counter() - t0) * 1000
+
+        t0 = time.perf_counter()
+        streamed = client.post("/chat/stream", json={"query": query}, buffered=False)
+        first = meta = None
+        text = ""
+        for name, data in sse_events(streamed):
+            if name == "meta" and meta is None:
+                meta = (time.perf_counter() - t0) * 1000
+            if name == "delta":
+                if first is None:
+                    first = (time.perf_counter() - t0) * 1000
+                text += data["text"]
+        stream_ms = (time.perf_counter() - t0) * 1000
+        rows.append({"query": query, "intent": (plain.get_json() or {}).get("intent"),
+                     "same_answer": text == (plain.get_json() or {}).get("response"),
+                     "chat_ms": round(chat_ms, 1), "stream_meta_ms": round(meta or 0, 1),
+                     "stream_first_ms": round(first or 0, 1), "stream_total_ms": round(stream_ms, 1)})
+
+    # hang up after the first piece
+    before = dict(server.counts)
+    streamed = client.post("/chat/stream", json={"query": "what is the fee structure"}, buffered=False)
+    for name, _ in sse_events(streamed):
+        if name == "delta":
+            break
+    streamed.close()
+    time.sleep(args.chunk_ms / 1000 * 3 + 0.2)
+    aborted = server.counts["aborted"] - before["aborted"]
+
+    report = {
+        "stub": {"first_ms": args.first_ms, "chunk_ms": args.chunk_ms, "chunks": args.chunks},
+        "queries": len(rows),
+        "ttft_p50_ms": {"chat": round(float(np.percentile([r["chat_ms"] for r in rows], 50)), 1),
+                        "stream": round(float(np.percentile([r["stream_first_ms"] for r in rows], 50)), 1)},
+        "total_p50_ms": {"chat": round(float(np.percentile([r["chat_ms"] for r in rows], 50)), 1),
+                         "stream": round(float(np.percentile([r["stream_total_ms"] for r in rows], 50)), 1)},
+        "same_answers": sum(r["same_answer"] for r in rows),
+        "disconnect_closed_upstream": aborted > 0,
+        "rows": rows,
+    }
+    server.shutdown()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"stub: first piece after {args.first_ms}ms, {args.chunks} pieces {args.chunk_ms}ms apart")
+    print(f"{'query':<40} {'intent':>8} {'/chat':>8} {'meta':>8} {'first':>8} {'total':>8}")
+    for r in rows:
+        print(f"{r['query']:<40} {r['intent']:>8} {r['chat_ms']:>8} {r['stream_meta_ms']:>8} "
+              f"{r['stream_first_ms']:>8} {r['stream_total_ms']:>8}")
+    print(f"time to first token p50: /chat {report['ttft_p50_ms']['chat']}ms -> "
+          f"/chat/stream {report['ttft_p50_ms']['stream']}ms "
+          f"(total {report['total_p50_ms']['stream']}ms); same answer text {report['same_answers']}/{len(rows)}")
+    print(f"client hang-up closes the upstream stream: {'yes' if report['disconnect_closed_upstream'] else 'NO'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Per-query cost of faculty lookups as the staff directory grows.
+
+Synthetic directories of several departments are generated at each size and
+queried with a fixed mix (full names, surname + honorific, HOD, research
+area, no match). Two implementations are timed:
+
+  linear  – the previous extract_faculty_info: normalize every name on
+            every query and scan the directory (twice for HOD questions).
+  index   – FacultyIndex dictionary probes (index built once, outside the
+            timed loop; its build time is reported separately).
+
+Examples:
+    python scripts/bench_faculty_index.py
+    python scripts/bench_faculty_index.py --sizes 100 1000 5000 --queries 500 --json
+"""
+from pathlib import Path
+import argparse
+import json
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.context_extractor import (
+    FacultyIndex, extract_faculty_info, format_faculty_member, normalize_name,
+)
+
+FIRST = ("Amit Anindita Arup Biswarup Chandrima Ditu Kasturi Kaushik Manas Olivia Piyal Priyanka "
+         "Riya Rohit Rubi Sabyasachi Sampurna Saumya Shukla Snigdha Subrata Sunanda Tanmoy Uday").split()
+LAST = ("Banik Barai Biswas Chakraborty Chandra Das Dey Ghosh Guharay Halder Jana Karak Khara Mahanta "
+        "Mandal Mitra Mukherjee Pal Paul Podder Pramanik Roy Saha Sarkar Sen Thakur").split()
+AREAS = ["Machine Learning", "Deep Learning", "IoT", "Soft Computing", "Image Processing",
+         "Natural Language Processing", "Cryptography", "Computer Networks", "Data Mining",
+         "Cloud Computing", "VLSI Design", "Robotics", "Bioinformatics", "Quantum Computing"]
+POSITIONS = ["Assistant Professor"] * 8 + ["Associate Professor"] * 2 + ["Professor"]
+DEPARTMENTS = ["Computer Science & Engineering", "Electronics", "Mechanical Engineering",
+               "Biotechnology", "Management", "Pharmacy", "Law", "Physics"]
+
+
+def make_directory(size, rng):
+    """One JSON-shaped directory per department, ``size`` staff in total."""
+    per_dept = max(1, size // len(DEPARTMENTS))
+    dirs, serial = [], 0
+    for dept in DEPARTMENTS:
+        faculty = {}
+        for j in range(per_dept):
+            serial += 1
+            # a serial suffix keeps full names unique at large sizes
+            name = f"{rng.choice(FIRST)} {rng.choice(LAST)} {serial:05d}"
+            faculty[f"m{serial}"] = {
+                "name": ("Dr. " if rng.random() < 0.4 else "") + name,
+                "position": "Professor & HOD" if j == 0 else rng.choice(POSITIONS),
+                "qualification": "PhD",
+                "research_area": rng.sample(AREAS, 2),
+            }
+        dirs.append({"department": f"Department of {dept}", "faculty": faculty})
+    return dirs
+
+
+def make_queries(dirs, n, rng):
+    members = [m for d in dirs for m in d["faculty"].values()]
+    queries = []
+    for i in range(n):
+        kind = i % 5
+        m = rng.choice(members)
+        if kind == 0:
+            queries.append(f"tell me about {m['name']}")
+        elif kind == 1:
+            queries.append(f"email of {m['name'].split()[-1]} sir")
+        elif kind == 2:
+            queries.append("who is the hod")
+        elif kind == 3:
+            queries.append(f"which faculty works on {rng.choice(AREAS)}")
+        else:
+            queries.append("faculty office hours")
+    return queries
+
+
+def linear_extract(query, dirs):
+    """The scan-based lookup FacultyIndex replaced."""
+    query_norm = normalize_name(query)
+    want_hod = any(t in query.lower() for t in ["hod", "head of department", "head of dept"])
+    for data in dirs:
+        department = data.get("department", "Unknown Department")
+        for info in data["faculty"].values():
+            faculty_name = info.get("name", "")
+            if normalize_name(faculty_name) and normalize_name(faculty_name) in query_norm:
+                return {"matched": True, "data": [format_faculty_member(info, department)]}
+        if want_hod:
+            for info in data["faculty"].values():
+                position = info.get("position", "").lower()
+                if "hod" in position or "head" in position:
+                    return {"matched": True, "data": [format_faculty_member(info, department)]}
+    return {"matched": False, "data": []}
+
+
+def time_queries(fn, queries):
+    latencies = []
+    for q in queries:
+        t0 = time.perf_counter()
+        fn(q)
+        latencies.append((time.perf_counter() - t0) * 1e6)
+    latencies = np.asarray(latencies)
+    return {
+        "p50_us": round(float(np.percentile(latencies, 50)), 1),
+        "p95_us": round(float(np.percentile(latencies, 95)), 1),
+        "mean_us": round(float(latencies.mean()), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Faculty lookup: linear scan vs FacultyIndex")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 500, 2000, 5000])
+    parser.add_argument("--queries", type=int, default=400)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    results = []
+    for size in args.sizes:
+        rng = random.Random(args.seed)
+        dirs = make_directory(size, rng)
+        queries = make_queries(dirs, args.queries, rng)
+        # prepared-document shaped records, as the retriever passes them
+        docs = [{"key": f"bench-{size}-{i}", "data": d} for i, d in enumerate(dirs)]
+
+        t0 = time.perf_counter()
+        for d in dirs:
+            FacultyIndex(d)
+        build_ms = (time.perf_counter() - t0) * 1000
+        extract_faculty_info("warm up", docs)  # fills the per-document index cache
+
+        staff = sum(len(d["faculty"]) for d in dirs)
+        for impl, fn in (("linear", lambda q: linear_extract(q, dirs)),
+                         ("index", lambda q: extract_faculty_info(q, docs))):
+            results.append({"staff": staff, "impl": impl, **time_queries(fn, queries),
+                            "build_ms": round(build_ms, 1) if impl == "index" else 0.0})
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    cols = list(results[0].keys())
+    print("  ".join(f"{c:>10}" for c in cols))
+    for r in results:
+        print("  ".join(f"{str(r[c]):>10}" for c in cols))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Latency and success rate of the Gemini client against a local stub server.
+
+The stub answers generateContent requests like Gemini does after
+``--latency`` ms, and fails a ``--fail-rate`` share of them with 503 or
+429 (the 429s carry ``Retry-After: 0``). It speaks HTTP/1.1 with
+keep-alive, over TLS with ``--tls`` (self-signed certificate made with the
+openssl CLI), so connection set-up costs what it costs against the real
+endpoint minus the network round trips.
+
+  before  – what ask_gemini did: module-level requests.post, a new
+            connection per request, one attempt
+  after   – GeminiClient: pooled keep-alive session, retries with backoff
+
+Both run the same requests sequentially and with ``--threads`` workers;
+the report has p50 / p95 latency, successes and connections opened.
+
+Examples:
+    python scripts/bench_gemini_client.py
+    python scripts/bench_gemini_client.py --tls --requests 300 --fail-rate 0.1
+    python scripts/bench_gemini_client.py --latency 0 --threads 16 --json
+"""
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+import argparse
+import json
+import random
+import socket
+import ssl
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+import requests
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.llm.gemini_client import SAFETY_SETTINGS, GeminiClient, GeminiError
+
+ANSWER = {"candidates": [{"content": {"parts": [{"text": "The HOD of CSE (AI) is Dr. Example."}]},
+                          "finishReason": "STOP"}]}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        # like Google's front ends: no Nagle delay between headers and body
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.server.count("connections")
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.server.count("requests")
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        status, headers, body = 200, {}, ANSWER
+        failure = self.server.failure()
+        if failure:
+            status = failure
+            body = {"error": {"code": status, "message": "stub failure"}}
+            if status == 429:
+                headers["Retry-After"] = "0"
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for k, v in headers.items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, latency, fail_rate, seed):
+        super().__init__(("127.0.0.1", 0), StubHandler)
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.counts = {"connections": 0, "requests": 0}
+
+    def count(self, key):
+        with self.lock:
+            self.counts[key] += 1
+
+    def failure(self):
+        with self.lock:
+            if self.rng.random() >= self.fail_rate:
+                return None
+            return self.rng.choice([429, 503])
+
+    def reset(self):
+        with self.lock:
+            self.counts = {"connections": 0, "requests": 0}
+
+
+def self_signed_cert(directory):
+    cert, key = Path(directory) / "stub.crt", Path(directory) / "stub.key"
+    subprocess.run(["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+                    "-subj", "/CN=localhost", "-addext", "subjectAltName=IP:127.0.0.1",
+                    "-keyout", str(key), "-out", str(cert)], check=True, capture_output=True)
+    return cert, key
+
+
+def old_ask_gemini(url, prompt, verify):
+    """ask_gemini before the client: one requests.post, errors as strings."""
+    payload = {"contents": [{"parts": [{"text": prompt}]}], "safety_settings": SAFETY_SETTINGS}
+    try:
+        response = requests.post(url, headers={"Content-Type": "application/json"}, json=payload,
+                                 timeout=30, verify=verify)
+        # (an explicit verify= wins over REQUESTS_CA_BUNDLE here, unlike session.verify)
+        if response.status_code != 200:
+            return f"GOOGLE API ERROR ({response.status_code}): {response.text}"
+        return response.json()["candidates"][0]["content"]["parts"][0]["text"]
+    except Exception as e:
+        return f"PYTHON EXCEPTION: {str(e)}"
+
+
+def run(call, n, threads):
+    """Latencies (ms) and successes of ``n`` calls on ``threads`` workers."""
+    def one(i):
+        t0 = time.perf_counter()
+        ok = call(f"question {i}")
+        return (time.perf_counter() - t0) * 1000, ok
+
+    if threads <= 1:
+        results = [one(i) for i in range(n)]
+    else:
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            results = list(pool.map(one, range(n)))
+    latencies = [r[0] for r in results]
+    return {"p50_ms": round(float(np.percentile(latencies, 50)), 2),
+            "p95_ms": round(float(np.percentile(latencies, 95)), 2),
+            "ok": sum(r[1] for r in results), "requests": n}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gemini client before / after against a local stub server")
+    parser.add_argument("--requests", type=int, default=200, help="requests per run")
+    parser.add_argument("--threads", type=int, default=8, help="workers for the concurrent run")
+    parser.add_argument("--latency", type=float, default=20, help="stub think time per request, ms")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="share of stub responses that are 429 / 503")
+    parser.add_argument("--tls", action="store_true", help="serve HTTPS with a self-signed certificate")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    server = StubServer(args.latency / 1000, args.fail_rate, args.seed)
+    verify, tmp = True, None
+    if args.tls:
+        tmp = tempfile.TemporaryDirectory()
+        cert, key = self_signed_cert(tmp.name)
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(cert, key)
+        server.socket = context.wrap_socket(server.socket, server_side=True)
+        verify = str(cert)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    scheme = "https" if args.tls else "http"
+    url = f"{scheme}://127.0.0.1:{server.server_address[1]}/v1beta/models/stub:generateContent"
+
+    def before(prompt):
+        answer = old_ask_gemini(f"{url}?key=stub", prompt, verify)
+        return not answer.startswith(("GOOGLE API ERROR", "PYTHON EXCEPTION"))
+
+    client = GeminiClient(api_key="stub", url=url, backoff_base=0.05, backoff_max=0.5,
+                          pool_size=max(args.threads, 1))
+    client.session.verify = verify
+    # REQUESTS_CA_BUNDLE would otherwise win over the session's verify
+    client.session.trust_env = False
+
+    def after(prompt):
+        try:
+            client.generate(prompt)
+            return True
+        except GeminiError:
+            return False
+
+    report = {"stub": {"latency_ms": args.latency, "fail_rate": args.fail_rate, "tls": args.tls}, "runs": []}
+    for threads in (1, args.threads):
+        for name, call in (("before", before), ("after", after)):
+            server.reset()
+            row = run(call, args.requests, threads)
+            row.update({"client": name, "threads": threads, "connections": server.counts["connections"],
+                        "attempts": server.counts["requests"]})
+            report["runs"].append(row)
+    report["client_stats"] = client.stats()
+    server.shutdown()
+    client.close()
+    if tmp:
+        tmp.cleanup()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"stub: {scheme}, {args.latency}ms think time, fail rate {args.fail_rate}; "
+          f"{args.requests} requests per run")
+    print(f"{'client':>7} {'threads':>7} {'p50 ms':>8} {'p95 ms':>8} {'ok':>5} {'attempts':>8} {'connections':>11}")
+    for r in report["runs"]:
+        print(f"{r['client']:>7} {r['threads']:>7} {r['p50_ms']:>8} {r['p95_ms']:>8} {r['ok']:>5} "
+              f"{r['attempts']:>8} {r['connections']:>11}")
+    for threads in (1, args.threads):
+        b, a = [r for r in report["runs"] if r["threads"] == threads]
+        if b["p50_ms"]:
+            print(f"threads={threads}: p50 {1 - a['p50_ms'] / b['p50_ms']:.1%} lower with the pooled client")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Compare pure vector, pure BM25 and hybrid (RRF-fused) retrieval on the corpus.
+
+Two query sets are generated from the chunked corpus itself:
+
+  exact   – code-like tokens (course codes, form numbers, ...); a query hits
+            when a returned passage contains the token.
+  phrase  – 4-8 word windows of chunk text; a query hits when a returned
+            passage comes from the same document.
+
+For every mode this reports p50/p95 latency per query and hit@k.
+
+Examples:
+    python scripts/bench_hybrid_retrieval.py
+    python scripts/bench_hybrid_retrieval.py --k 3 --queries 300 --json
+"""
+from pathlib import Path
+import argparse
+import json
+import random
+import re
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.vectorstore.corpus import load_documents
+from app.vectorstore.index import VectorIndex
+
+CODE = re.compile(r"\b[A-Z]{2,6}-?[A-Z]{0,4}\d{3,4}[A-Z]?\b")
+WORD = re.compile(r"[A-Za-z][A-Za-z']+")
+
+
+def exact_queries(chunks, n, rng):
+    codes = sorted({m.group() for c in chunks for m in CODE.finditer(c["chunk_text"])})
+    rng.shuffle(codes)
+    return [{"query": code, "token": code} for code in codes[:n]]
+
+
+def phrase_queries(chunks, n, rng):
+    queries = []
+    pool = [c for c in chunks if len(WORD.findall(c["chunk_text"])) >= 12]
+    while pool and len(queries) < n:
+        c = rng.choice(pool)
+        words = WORD.findall(c["chunk_text"])
+        size = rng.randint(4, 8)
+        start = rng.randint(0, len(words) - size)
+        queries.append({"query": " ".join(words[start:start + size]), "doc_id": c["doc_id"]})
+    return queries
+
+
+def is_hit(q, hits):
+    if "token" in q:
+        return any(q["token"] in h["text"] for h in hits)
+    return any(h["doc_id"] == q["doc_id"] for h in hits)
+
+
+def run_mode(search, queries, k):
+    latencies, hits = [], 0
+    for q in queries:
+        t0 = time.perf_counter()
+        found = search(q["query"], k)
+        latencies.append((time.perf_counter() - t0) * 1000)
+        hits += is_hit(q, found)
+    latencies = np.asarray(latencies) if latencies else np.zeros(1)
+    return {
+        "p50_ms": round(float(np.percentile(latencies, 50)), 4),
+        "p95_ms": round(float(np.percentile(latencies, 95)), 4),
+        f"hit@{k}": round(hits / max(len(queries), 1), 4),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vector vs BM25 vs hybrid retrieval benchmark")
+    parser.add_argument("--queries", type=int, default=200, help="queries per set")
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    index = VectorIndex()
+    index.build(load_documents())
+    index.lexical  # build outside the timed loops
+
+    def lexical(query, k):
+        return [index._hit(index.chunk_map[vid], score) for vid, score in index.lexical.search(query, k)]
+
+    modes = {
+        "vector": lambda q, k: index.search_batch([q], k)[0],
+        "bm25": lexical,
+        "hybrid": lambda q, k: index.search_hybrid(q, k, keyword_shortcut=False),
+        "hybrid+shortcut": lambda q, k: index.search_hybrid(q, k),
+    }
+
+    rng = random.Random(args.seed)
+    chunks = index.chunks
+    sets = {
+        "exact": exact_queries(chunks, args.queries, rng),
+        "phrase": phrase_queries(chunks, args.queries, rng),
+    }
+
+    results = []
+    for set_name, queries in sets.items():
+        for mode, search in modes.items():
+            results.append({"set": set_name, "queries": len(queries), "mode": mode,
+                            **run_mode(search, queries, args.k)})
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"chunks={len(index)} k={args.k}")
+    cols = list(results[0].keys())
+    print("  ".join(f"{c:>16}" for c in cols))
+    for r in results:
+        print("  ".join(f"{str(r[c]):>16}" for c in cols))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Throughput of intent detection: the old re.search cascade vs IntentRouter.
+
+Queries are generated from templates over every trigger word plus filler
+text and questions that match nothing (the cascade's worst case: all ten
+searches run). The script first checks that both implementations agree,
+then reports queries/sec. The one intended difference is "Dr. Sen": the
+cascade's \bdr\.\b needs a word character right after the dot, so it never
+matched a title followed by a space; the router does.
+
+The admin session classifier is measured the same way on longer
+transcripts: per-keyword substring tests vs one router pass.
+
+Examples:
+    python scripts/bench_intent_router.py
+    python scripts/bench_intent_router.py --queries 20000 --json
+"""
+from pathlib import Path
+import argparse
+import json
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.intent_router import INTENT_ROUTER, INTENT_RULES, IntentRouter
+
+SESSION_CATEGORY_RULES = {
+    'hostel': ['hostel', 'dorm', 'residence', 'mess'],
+    'library': ['library', 'book', 'journal', 'borrow'],
+    'faculty': ['faculty', 'professor', 'teacher', 'mentor'],
+    'research': ['research', 'lab', 'paper', 'publication', 'grant'],
+    'assignment': ['assignment', 'homework', 'submission', 'deadline'],
+    'syllabus': ['syllabus', 'course outline', 'curriculum'],
+    'exam': ['exam', 'timetable', 'result', 'grade', 'test'],
+    'canteen': ['canteen', 'mess hall', 'food court', 'cafeteria'],
+    'holiday': ['holiday', 'vacation', 'leave', 'break'],
+    'general': ['info', 'information', 'general', 'question'],
+    'others': [],
+}
+
+FILLER = ("what is the how can i get when does where do we find please tell me about my "
+          "fees for first year semester admission process hostel room bus timing").split()
+TEMPLATES = ["{w}", "what is the {w}", "tell me about {w} please", "when is the {w} for cse",
+             "{f} {w} {f}", "{f} {f} {f} {f}"]
+
+
+def cascade(query):
+    """detect_intent as it was: up to ten re.search calls in priority order."""
+    q = query.lower()
+    if re.search(r"\b(hod|faculty|professor|teacher|dr\.)\b", q):
+        return "faculty"
+    if re.search(r"\b(bscm|escm|pcc|pec)[-\s]?\d+\b", q):
+        return "subject"
+    if re.search(r"\b(hackathon|event|tech\s*fest|competition|seminar|workshop)\b", q):
+        return "events"
+    if re.search(r"\b(placement|placed|offer|offers|recruitment|job\s*offer|hired)\b", q):
+        return "placement"
+    if re.search(r"\b(scholarship|stipend|grant|svmcm|kanyashree|nabanna|aikyashree|mcm)\b", q):
+        return "scholarship"
+    if re.search(r"\b(holiday|vacation|leave)\b", q):
+        return "holiday"
+    if re.search(r"\b(exam|attendance)\b", q):
+        return "exam"
+    if re.search(r"\b(library|reading room)\b", q):
+        return "library"
+    if re.search(r"\b(rule|policy|fine|allowed|banned)\b", q):
+        return "rules"
+    if re.search(r"\b(brainware university|chancellor|vice chancellor|vc|founder|campus|address|location|established)\b", q):
+        return "about"
+    return "general"
+
+
+def substring_classify(text):
+    """The admin classifier as it was: ``keyword in text`` per keyword."""
+    text = text.lower()
+    assigned = set()
+    for cat, keys in SESSION_CATEGORY_RULES.items():
+        for k in keys:
+            if k in text:
+                assigned.add(cat)
+                break
+    return assigned or {'others'}
+
+
+def make_queries(n, rng):
+    words = ["hod", "Dr. Sen", "dr.sen", "bscm301", "PCC 501", "tech fest", "job offer", "svmcm",
+             "holiday", "exam", "reading room", "fine", "vice chancellor", "campus"]
+    words += [t for _, triggers in INTENT_RULES for t in triggers if isinstance(t, str)]
+    queries = []
+    for _ in range(n):
+        template = rng.choice(TEMPLATES)
+        q = template.replace("{w}", rng.choice(words), 1)
+        while "{f}" in q:
+            q = q.replace("{f}", rng.choice(FILLER), 1)
+        queries.append(q)
+    return queries
+
+
+def make_transcripts(n, rng):
+    vocab = FILLER + [k for keys in SESSION_CATEGORY_RULES.values() for k in keys]
+    return [" ".join(rng.choice(vocab) for _ in range(rng.randint(40, 200))) for _ in range(n)]
+
+
+def throughput(fn, items, repeat):
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        for item in items:
+            fn(item)
+    elapsed = time.perf_counter() - t0
+    return round(len(items) * repeat / elapsed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Intent cascade vs compiled router throughput")
+    parser.add_argument("--queries", type=int, default=5000)
+    parser.add_argument("--transcripts", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    queries = make_queries(args.queries, rng)
+    transcripts = make_transcripts(args.transcripts, rng)
+    session_router = IntentRouter.from_keywords(SESSION_CATEGORY_RULES, default='others')
+
+    mismatches, dr_fixed = [], 0
+    for q in queries:
+        if cascade(q) != INTENT_ROUTER.intent(q):
+            if "dr." in q.lower() and INTENT_ROUTER.intent(q) == "faculty":
+                dr_fixed += 1
+            else:
+                mismatches.append(q)
+    results = [
+        {"task": "detect_intent", "impl": "cascade", "items_per_sec": throughput(cascade, queries, args.repeat)},
+        {"task": "detect_intent", "impl": "router", "items_per_sec": throughput(INTENT_ROUTER.intent, queries, args.repeat)},
+        {"task": "route (+spans)", "impl": "router", "items_per_sec": throughput(INTENT_ROUTER.route, queries, args.repeat)},
+        {"task": "classify_session", "impl": "substring",
+         "items_per_sec": throughput(substring_classify, transcripts, args.repeat)},
+        {"task": "classify_session", "impl": "router",
+         "items_per_sec": throughput(lambda t: session_router.intents(t) or {'others'}, transcripts, args.repeat)},
+    ]
+
+    if args.json:
+        print(json.dumps({"mismatches": len(mismatches), "dr_title_fixed": dr_fixed, "results": results}, indent=2))
+        return
+
+    print(f"queries={len(queries)} transcripts={len(transcripts)} intent mismatches={len(mismatches)} "
+          f"(plus {dr_fixed} 'Dr. <name>' queries now routed to faculty)")
+    for q in mismatches[:10]:
+        print(f"  mismatch: {q!r} cascade={cascade(q)} router={INTENT_ROUTER.intent(q)}")
+    for r in results:
+        print(f"{r['task']:>18}  {r['impl']:>10}  {r['items_per_sec']:>10} /s")
+
+
+if __name__ == "__main__":
+    main()
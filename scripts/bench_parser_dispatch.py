@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Per-document parse cost: the old linear parser cascade vs the registry.
+
+Every JSON document in Resources/json (and sem_json with ``--sem``) is
+rendered ``--repeat`` times both ways, in both render modes:
+
+  cascade   – the four specialised parsers probed one after another, then
+              the generic renderer (render_data before the registry)
+  registry  – render_data: one schema fingerprint, the memoized families
+              for it, then their renderer
+
+The median per document is reported, plus the cost of choosing the
+renderer alone (the probes of the cascade vs ``dispatch``), which is what
+the registry changes. Documents the registry now hands to a family the
+cascade did not know (placement, events, helplines) are listed apart:
+their output differs on purpose.
+
+Examples:
+    python scripts/bench_parser_dispatch.py
+    python scripts/bench_parser_dispatch.py --repeat 500 --sem --json
+"""
+from pathlib import Path
+import argparse
+import json
+import statistics
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.document_parser import (
+    compact_faculty_document, compact_holiday_document, compact_scholarship_document, dispatch,
+    parse_exam_document, parse_faculty_document, parse_generic_document, parse_holiday_document,
+    parse_scholarship_document, render_compact, render_data,
+)
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+CASCADE = {
+    "readable": ([parse_faculty_document, parse_scholarship_document, parse_holiday_document,
+                  parse_exam_document], parse_generic_document),
+    "compact": ([compact_faculty_document, compact_scholarship_document, compact_holiday_document],
+                render_compact),
+}
+
+SCHOLARSHIP_KEYS = ["scholarship_name", "scholarship_id", "scholarship_type", "offered_by", "eligibility", "benefits"]
+
+
+def cascade_render(data, mode):
+    """render_data as it was: probe every parser in turn."""
+    parsers, fallback = CASCADE[mode]
+    for parser in parsers:
+        result = parser(data)
+        if result:
+            return result
+    return fallback(data)
+
+
+def cascade_probe(data):
+    """The key probes the cascade runs before a parser commits (no rendering)."""
+    if not isinstance(data, dict):
+        return None
+    if "faculty" in data or "department" in data:
+        return "faculty"
+    if any(k in data for k in SCHOLARSHIP_KEYS):
+        return "scholarship"
+    if "_metadata" in data and "holidays" in data:
+        return "holiday"
+    if any(k in data for k in ["exam_schedule", "examinations", "exam"]):
+        return "exam"
+    return None
+
+
+def median_us(fn, data, repeat):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(data)
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times) * 1e6
+
+
+def load_corpus(include_sem):
+    paths = sorted((BASE_DIR / "Resources" / "json").glob("*.json"))
+    if include_sem:
+        paths += sorted((BASE_DIR / "sem_json").glob("*.json"))
+    corpus = []
+    for path in paths:
+        try:
+            corpus.append((str(path.relative_to(BASE_DIR)), json.loads(path.read_text(encoding="utf-8"))))
+        except ValueError as e:
+            print(f"[WARNING] Skipping {path.name}: {e}")
+    return corpus
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parser cascade vs registry dispatch, per document")
+    parser.add_argument("--repeat", type=int, default=200, help="renders per document and variant")
+    parser.add_argument("--sem", action="store_true", help="also include sem_json/*.json")
+    parser.add_argument("--top", type=int, default=10, help="most expensive documents to list")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.sem)
+    rows = []
+    for name, data in corpus:
+        entries = dispatch(data)
+        row = {"document": name, "family": entries[0]["name"] if entries else "generic",
+               "changed": any(cascade_render(data, m) != render_data(data, m) for m in CASCADE),
+               "probe_us": median_us(cascade_probe, data, args.repeat),
+               "dispatch_us": median_us(dispatch, data, args.repeat)}
+        for mode in CASCADE:
+            row[f"{mode}_before_us"] = median_us(lambda d: cascade_render(d, mode), data, args.repeat)
+            row[f"{mode}_after_us"] = median_us(lambda d: render_data(d, mode), data, args.repeat)
+        rows.append(row)
+
+    same = [r for r in rows if not r["changed"]]
+    summary = {"documents": len(rows), "changed": [r["document"] for r in rows if r["changed"]]}
+    for key in ["probe_us", "dispatch_us", "readable_before_us", "readable_after_us",
+                "compact_before_us", "compact_after_us"]:
+        summary[key] = round(statistics.mean(r[key] for r in same), 2) if same else 0
+    families = {}
+    for r in rows:
+        families[r["family"]] = families.get(r["family"], 0) + 1
+    summary["families"] = families
+
+    if args.json:
+        print(json.dumps({"summary": summary, "rows": rows}, indent=2))
+        return
+
+    print(f"documents={summary['documents']} repeat={args.repeat}  families: "
+          + ", ".join(f"{k}={v}" for k, v in sorted(families.items())))
+    print(f"mean per document (unchanged output, n={len(same)}):")
+    print(f"  choose renderer  cascade probes {summary['probe_us']:.2f}us   registry dispatch {summary['dispatch_us']:.2f}us")
+    for mode in CASCADE:
+        print(f"  {mode:>8} render  before {summary[f'{mode}_before_us']:.2f}us   after {summary[f'{mode}_after_us']:.2f}us")
+    if summary["changed"]:
+        print(f"new families (output differs on purpose): {', '.join(summary['changed'])}")
+    print(f"most expensive documents (readable before / after, compact before / after, us):")
+    for r in sorted(rows, key=lambda r: -r["readable_before_us"])[:args.top]:
+        print(f"  {r['readable_before_us']:>8.1f} {r['readable_after_us']:>8.1f} "
+              f"{r['compact_before_us']:>8.1f} {r['compact_after_us']:>8.1f}  {r['family']:>11}  {r['document']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Upstream Gemini calls during bursts of identical questions, with and
+without single-flight coalescing.
+
+Each burst releases ``--students`` threads at once (a barrier), each asking
+one of ``--prompts`` distinct prompts (built with build_prompt, so they are
+as long as the real ones), against the stub server of bench_gemini_client
+(``--latency`` ms per answer). The report has upstream requests per burst,
+latency p50 / p95 and answers received, for
+
+  off – GeminiClient(single_flight=False): one request per student
+  on  – GeminiClient(): one request per distinct prompt in flight
+
+Two more bursts check the failure paths with coalescing on: every stub
+response a 429 / 503 (no retries), and a stub slower than the client deadline.
+Every student has to get the error, and the errors have to be one upstream
+request per prompt, not one per student.
+
+Examples:
+    python scripts/bench_single_flight.py
+    python scripts/bench_single_flight.py --students 200 --prompts 3 --bursts 5 --json
+"""
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import argparse
+import json
+import sys
+import threading
+import time
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from app.core.prompt_builder import build_prompt
+from app.llm.gemini_client import GeminiClient, GeminiError
+from bench_gemini_client import StubServer
+
+QUESTIONS = ["when is the mid semester exam", "is tomorrow a holiday", "where is the exam seating plan",
+             "what is the fee payment deadline", "who is the exam controller"]
+
+
+def burst(client, prompts, students):
+    """Ask ``students`` questions at once; (latencies ms, answers, error names)."""
+    barrier = threading.Barrier(students)
+
+    def ask(i):
+        barrier.wait()
+        t0 = time.perf_counter()
+        try:
+            client.generate(prompts[i % len(prompts)])
+            return (time.perf_counter() - t0) * 1000, None
+        except GeminiError as e:
+            return (time.perf_counter() - t0) * 1000, type(e).__name__
+
+    with ThreadPoolExecutor(max_workers=students) as pool:
+        results = list(pool.map(ask, range(students)))
+    errors = [r[1] for r in results if r[1]]
+    return [r[0] for r in results], len(results) - len(errors), errors
+
+
+def make_client(url, single_flight, students, **kwargs):
+    client = GeminiClient(api_key="stub", url=url, pool_size=students, single_flight=single_flight,
+                          backoff_base=0.05, backoff_max=0.5, **kwargs)
+    client.session.trust_env = False
+    return client
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Single-flight coalescing of identical concurrent prompts")
+    parser.add_argument("--students", type=int, default=100, help="concurrent questions per burst")
+    parser.add_argument("--prompts", type=int, default=3, help="distinct prompts per burst")
+    parser.add_argument("--bursts", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=300, help="stub think time per request, ms")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    server = StubServer(args.latency / 1000, 0.0, 0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/v1beta/models/stub:generateContent"
+    context = "Mid semester examinations start on 2026-10-26. Seating plans are on the notice board."
+    prompts = [build_prompt(q, context) for q in (QUESTIONS * args.prompts)[:args.prompts]]
+
+    report = {"students": args.students, "prompts": args.prompts, "bursts": args.bursts,
+              "latency_ms": args.latency, "runs": []}
+    for name, single_flight in (("off", False), ("on", True)):
+        client = make_client(url, single_flight, args.students)
+        latencies, answered, upstream = [], 0, []
+        for _ in range(args.bursts):
+            server.reset()
+            lat, ok, _ = burst(client, prompts, args.students)
+            latencies += lat
+            answered += ok
+            upstream.append(server.counts["requests"])
+        report["runs"].append({
+            "single_flight": name,
+            "upstream_per_burst": round(float(np.mean(upstream)), 1),
+            "p50_ms": round(float(np.percentile(latencies, 50)), 1),
+            "p95_ms": round(float(np.percentile(latencies, 95)), 1),
+            "answered": answered, "asked": args.students * args.bursts,
+            "client_stats": client.stats(),
+        })
+        client.close()
+
+    # failures reach every waiter, from one upstream request per prompt
+    server.fail_rate = 1.0
+    server.reset()
+    client = make_client(url, True, args.students, max_retries=0)
+    _, ok, errors = burst(client, prompts, args.students)
+    report["errors"] = {"upstream": server.counts["requests"], "answered": ok, "errors": len(errors),
+                        "kinds": sorted(set(errors))}
+    client.close()
+
+    server.fail_rate = 0.0
+    server.reset()
+    # the clients hang up on the stub mid-answer here
+    server.handle_error = lambda request, client_address: None
+    client = make_client(url, True, args.students, deadline=args.latency / 1000 / 2)
+    _, ok, errors = burst(client, prompts, args.students)
+    report["timeouts"] = {"upstream": server.counts["requests"], "answered": ok, "errors": len(errors),
+                          "kinds": sorted(set(errors))}
+    client.close()
+    server.shutdown()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"{args.bursts} bursts of {args.students} students, {args.prompts} distinct prompts, "
+          f"stub {args.latency}ms per answer")
+    print(f"{'single-flight':>13} {'upstream/burst':>14} {'p50 ms':>8} {'p95 ms':>8} {'answered':>9}")
+    for r in report["runs"]:
+        print(f"{r['single_flight']:>13} {r['upstream_per_burst']:>14} {r['p50_ms']:>8} {r['p95_ms']:>8} "
+              f"{r['answered']:>4}/{r['asked']}")
+    for key, label in (("errors", "all 429 / 503"), ("timeouts", "stub slower than deadline")):
+        r = report[key]
+        print(f"{label}: {r['upstream']} upstream requests, {r['errors']}/{args.students} students got "
+              f"{', '.join(r['kinds']) or 'no error'}")
+
+
+if __name__ == "__main__":
+    main()
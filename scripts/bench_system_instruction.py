@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Input tokens, bytes, latency and cost per request with the rules sent in
+every prompt vs as a (context-cached) system instruction.
+
+Real /chat prompts are built for a set of campus questions (new_app's
+prepare_chat: retrieval, packing, build_user_prompt) and sent through
+GeminiClient to a local stub of the Gemini API three ways:
+
+  before  – build_prompt: rules + context + question as user content
+  inline  – system_instruction + user prompt (the fallback when the
+            context cache is unavailable)
+  cached  – system instruction registered once in cachedContents, each
+            request references it by name
+
+The stub answers like generateContent, creates cached contents, counts
+request bytes and reports usageMetadata with token counts estimated the
+way context_packer does (characters / CHARS_PER_TOKEN). Its latency is a
+model: ``--base-ms`` plus ``--prefill-ms`` per 1k input tokens not read
+from a cache. Costs use the project's pricing table (cached input at
+CACHED_INPUT_RATIO of the input price) plus ``--storage-usd`` per 1M
+cached tokens per hour of cache storage.
+
+Examples:
+    python scripts/bench_system_instruction.py
+    python scripts/bench_system_instruction.py --base-ms 300 --prefill-ms 40 --requests-per-hour 2000 --json
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+import argparse
+import json
+import os
+import socket
+import sys
+import threading
+import time
+
+import numpy as np
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+QUESTIONS = [
+    "hod of cse", "faculty working on machine learning", "syllabus of bscm301", "holiday list",
+    "exam rules", "library timing", "dress code policy", "who is the chancellor",
+    "what is the fee structure", "how do i get a bonafide certificate",
+]
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def log_message(self, *args):
+        pass
+
+    def reply(self, body):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        from app.core.context_packer import estimate_tokens
+        raw = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        body = json.loads(raw)
+        server = self.server
+        if self.path.endswith("/cachedContents"):
+            text = body["systemInstruction"]["parts"][0]["text"]
+            name = f"cachedContents/stub{len(server.caches)}"
+            server.caches[name] = estimate_tokens(text)
+            self.reply({"name": name, "model": body.get("model"), "usageMetadata": {"totalTokenCount": server.caches[name]}})
+            return
+
+        text = body["contents"][0]["parts"][0]["text"]
+        system = (body.get("system_instruction") or {}).get("parts", [{}])[0].get("text", "")
+        cached = server.caches.get(body.get("cachedContent"), 0)
+        fresh = estimate_tokens(text) + estimate_tokens(system)
+        server.bytes.append(len(raw))
+        time.sleep(server.base + server.prefill * fresh / 1000)
+        self.reply({"candidates": [{"content": {"parts": [{"text": "The HOD of CSE is Dr. Example."}]}}],
+                    "usageMetadata": {"promptTokenCount": fresh + cached, "cachedContentTokenCount": cached,
+                                      "candidatesTokenCount": 10}})
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, base, prefill):
+        super().__init__(("127.0.0.1", 0), StubHandler)
+        self.base, self.prefill = base, prefill
+        self.caches, self.bytes = {}, []
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rules in the prompt vs cached system instruction")
+    parser.add_argument("--base-ms", type=float, default=200, help="stub latency without input tokens")
+    parser.add_argument("--prefill-ms", type=float, default=30, help="stub latency per 1k uncached input tokens")
+    parser.add_argument("--storage-usd", type=float, default=1.0, help="cache storage, USD per 1M tokens per hour")
+    parser.add_argument("--requests-per-hour", type=int, default=500, help="LLM requests per hour for the storage share")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    server = StubServer(args.base_ms / 1000, args.prefill_ms / 1000)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/v1beta/models/gemini-2.5-flash:generateContent"
+    os.environ["GEMINI_API_KEY"] = "stub"
+    os.environ["GEMINI_API_URL"] = url
+    os.environ["ANSWER_CACHE"] = "0"
+
+    import new_app
+    from app.core.context_packer import estimate_cost, estimate_tokens
+    from app.core.prompt_builder import SYSTEM_INSTRUCTION, build_prompt
+    from app.llm.gemini_client import GeminiClient
+
+    prepared = []
+    for query in QUESTIONS:
+        with new_app.app.test_request_context("/chat", method="POST", json={"query": query}):
+            item = new_app.prepare_chat()
+        if "prompt" in item:
+            prepared.append(item)
+
+    t0 = time.perf_counter()
+    for item in prepared:
+        build_prompt(item["query"], item["context"])
+    build_us = (time.perf_counter() - t0) / len(prepared) * 1e6
+
+    runs = []
+    for name in ("before", "inline", "cached"):
+        client = GeminiClient(api_key="stub", url=url, single_flight=False, context_cache=name == "cached")
+        client.session.trust_env = False
+        server.bytes = []
+        latencies = []
+        for item in prepared:
+            t0 = time.perf_counter()
+            if name == "before":
+                client.generate(build_prompt(item["query"], item["context"]))
+            else:
+                client.generate(item["prompt"], system=SYSTEM_INSTRUCTION)
+            latencies.append((time.perf_counter() - t0) * 1000)
+        stats = client.stats()
+        client.close()
+        n = len(prepared)
+        fresh, cached = stats["prompt_tokens"] / n, stats["cached_tokens"] / n
+        cost = estimate_cost(fresh, cached_tokens=cached)
+        if name == "cached":
+            cost += estimate_tokens(SYSTEM_INSTRUCTION) * args.storage_usd / 1e6 / args.requests_per_hour
+        runs.append({
+            "run": name,
+            "input_tokens": round(fresh, 1), "cached_tokens": round(cached, 1),
+            "request_bytes": round(float(np.mean(server.bytes)), 1),
+            "p50_ms": round(float(np.percentile(latencies, 50)), 1),
+            "input_usd_per_1k_requests": round(cost * 1000, 4),
+            "context_caches_created": stats["context_caches"],
+        })
+    server.shutdown()
+
+    before, cached = runs[0], runs[2]
+    report = {
+        "requests": len(prepared),
+        "system_tokens": estimate_tokens(SYSTEM_INSTRUCTION),
+        "stub": {"base_ms": args.base_ms, "prefill_ms_per_1k": args.prefill_ms},
+        "storage_usd_per_1m_hour": args.storage_usd, "requests_per_hour": args.requests_per_hour,
+        "build_prompt_us": round(build_us, 1),
+        "runs": runs,
+        "input_token_reduction": round(1 - cached["input_tokens"] / before["input_tokens"], 4),
+        "cost_reduction": round(1 - cached["input_usd_per_1k_requests"] / before["input_usd_per_1k_requests"], 4),
+    }
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"{len(prepared)} /chat prompts; system instruction ~{report['system_tokens']} tokens; "
+          f"stub {args.base_ms}ms + {args.prefill_ms}ms per 1k uncached input tokens; "
+          f"build_prompt {report['build_prompt_us']}us per request")
+    print(f"{'run':>7} {'input tok':>10} {'cached tok':>10} {'bytes':>8} {'p50 ms':>8} {'$ per 1k req':>12}")
+    for r in runs:
+        print(f"{r['run']:>7} {r['input_tokens']:>10} {r['cached_tokens']:>10} {r['request_bytes']:>8} "
+              f"{r['p50_ms']:>8} {r['input_usd_per_1k_requests']:>12}")
+    print(f"full-price input tokens {report['input_token_reduction']:.1%} fewer, input cost "
+          f"{report['cost_reduction']:.1%} lower (storage at {args.requests_per_hour} requests/hour included)")
+
+
+if __name__ == "__main__":
+    main()
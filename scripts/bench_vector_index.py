@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Benchmark the VectorIndex index types (flat / hnsw / ivfpq).
+
+For every mode this reports build time, index memory (serialized size),
+single-query latency percentiles, batched throughput and recall@k measured
+against exact brute-force search.
+
+By default it uses synthetic clustered unit vectors so corpora far larger
+than today's can be simulated without an embedding model; `--corpus`
+embeds the real chunked corpus instead.
+
+Examples:
+    python scripts/bench_vector_index.py --n 100000 --dim 384
+    python scripts/bench_vector_index.py --corpus --modes flat,hnsw
+"""
+from pathlib import Path
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.vectorstore import index as vindex
+
+
+def synthetic_vectors(n, dim, n_queries, clusters=256, seed=0):
+    """Clustered unit vectors; queries are perturbed corpus points."""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    labels = rng.integers(0, clusters, n)
+    data = centers[labels] + 0.6 * rng.standard_normal((n, dim)).astype(np.float32)
+    data /= np.linalg.norm(data, axis=1, keepdims=True)
+    picks = rng.integers(0, n, n_queries)
+    queries = data[picks] + 0.2 * rng.standard_normal((n_queries, dim)).astype(np.float32)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+    return data, queries.astype(np.float32)
+
+
+def corpus_vectors(n_queries, seed=0):
+    from app.vectorstore.corpus import load_documents
+    from app.vectorstore.embeddings import embed
+
+    chunks = vindex.chunk_documents(load_documents())
+    texts = [c["chunk_text"] for c in chunks]
+    data = np.asarray(embed(texts), dtype=np.float32)
+    rng = np.random.default_rng(seed)
+    # use passage prefixes as stand-in queries
+    queries = [texts[i][:120] for i in rng.integers(0, len(texts), n_queries)]
+    return data, np.asarray(embed(queries), dtype=np.float32)
+
+
+def exact_top_k(data, queries, k):
+    sims = queries @ data.T
+    part = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(sims, part, axis=1), axis=1)
+    return np.take_along_axis(part, order, axis=1)
+
+
+def recall_at_k(truth, found):
+    hits = sum(len(set(t) & set(f)) for t, f in zip(truth, found))
+    return hits / truth.size
+
+
+def bench_mode(mode, params, data, queries, truth, k):
+    started = time.perf_counter()
+    index, built = vindex.build_faiss_index(data, mode, params)
+    build_s = time.perf_counter() - started
+
+    memory = vindex.faiss.serialize_index(index).nbytes
+
+    # single-query latency (the /chat access pattern)
+    latencies = []
+    for q in queries:
+        t0 = time.perf_counter()
+        index.search(q[None, :], k)
+        latencies.append((time.perf_counter() - t0) * 1000)
+    latencies = np.asarray(latencies)
+
+    # batched throughput (offline evaluation / warm-up jobs)
+    t0 = time.perf_counter()
+    _, found = index.search(queries, k)
+    qps = len(queries) / (time.perf_counter() - t0)
+
+    return {
+        "mode": mode,
+        "built": built,
+        "build_s": round(build_s, 3),
+        "memory_mb": round(memory / 1e6, 2),
+        "p50_ms": round(float(np.percentile(latencies, 50)), 4),
+        "p95_ms": round(float(np.percentile(latencies, 95)), 4),
+        "p99_ms": round(float(np.percentile(latencies, 99)), 4),
+        "batch_qps": round(qps),
+        f"recall@{k}": round(recall_at_k(truth, found), 4),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recall vs latency benchmark for VectorIndex index types")
+    parser.add_argument("--n", type=int, default=100000, help="number of synthetic vectors")
+    parser.add_argument("--dim", type=int, default=384, help="vector dimension (MiniLM is 384)")
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--modes", default=",".join(vindex.INDEX_TYPES))
+    parser.add_argument("--params", default="{}",
+                        help='JSON per-mode overrides, e.g. \'{"hnsw": {"ef_search": 128}}\'')
+    parser.add_argument("--corpus", action="store_true", help="embed the real corpus instead of synthetic data")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    if not vindex._HAS_FAISS:
+        sys.exit("faiss is not installed; nothing to benchmark (pip install faiss-cpu)")
+
+    if args.corpus:
+        data, queries = corpus_vectors(args.queries)
+    else:
+        data, queries = synthetic_vectors(args.n, args.dim, args.queries)
+    overrides = json.loads(args.params)
+
+    truth = exact_top_k(data, queries, args.k)
+    results = []
+    for mode in [m.strip() for m in args.modes.split(",") if m.strip()]:
+        results.append(bench_mode(mode, overrides.get(mode), data, queries, truth, args.k))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"vectors={data.shape[0]} dim={data.shape[1]} queries={len(queries)} k={args.k}")
+    cols = list(results[0].keys())
+    print("  ".join(f"{c:>10}" for c in cols))
+    for r in results:
+        print("  ".join(f"{str(r[c]):>10}" for c in cols))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Replay queries through /chat's routing with and without QueryNormalizer.
+
+Every query is classified the way /chat would handle it:
+
+  no_llm    – answered from a fixed file (events, placement) or a matched
+              scholarship; Gemini is not called
+  resource  – Gemini is called with authoritative context (RESOURCE_MAP
+              files or the subject's own JSON)
+  vector    – ``general``: vector/hybrid search plus Gemini
+
+The replay corpus is the seed questions below, each once as typed and
+``--variants`` times with a random typo (or, for course codes, the spacing
+students use: "bscm 301", "PCC CSM 401"). A file of real queries, one per
+line, can be replayed instead with ``--queries``. Clean seeds and the
+general questions also measure false corrections: a route that changes on
+a correctly typed query.
+
+Examples:
+    python scripts/replay_query_normalizer.py
+    python scripts/replay_query_normalizer.py --variants 5 --json
+    python scripts/replay_query_normalizer.py --queries chat_log.txt
+"""
+from pathlib import Path
+import argparse
+import json
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.intent import detect_intent, find_all_scholarships
+from app.core.query_normalizer import QueryNormalizer
+from app.core.resource_map import RESOURCE_MAP
+from app.core.retriever import _resolve_subject_file
+from app.vectorstore.admin_content import load_index_documents
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+SEEDS = [
+    "what is kanyashree", "how to apply for aikyashree scholarship", "svmcm scholarship eligibility",
+    "nabanna scholarship amount", "is there any stipend for students", "scholarship for girls",
+    "upcoming hackathon", "any workshop this month", "seminar schedule", "technical competition list",
+    "placement record of cse", "which companies came for recruitment", "highest offer this year",
+    "holiday list", "when is the next vacation", "exam schedule", "minimum attendance required",
+    "library timing", "reading room hours", "hostel rules", "dress code policy", "who is the chancellor",
+    "campus address", "hod of cse", "who teaches machine learning", "professor list of cse",
+    "syllabus of bscm301", "bscm302 syllabus", "escm301 topics", "pcc-csm401 syllabus", "hsmcm301 syllabus",
+]
+GENERAL = [
+    "how do i pay my fees", "what is the admission process", "hold my fees until next week",
+    "is there a bus from howrah", "where can i get my id card", "what are the canteen timings",
+    "can i change my branch", "how to get a bonafide certificate", "what is the fee structure for btech",
+    "is wifi available in the hostel", "how many credits in a semester", "who do i contact for migration",
+]
+CODE_VARIANTS = ["bscm 301", "BSCM-302", "escm 301", "pcc csm 401", "PCC CSM 401", "Hsmcm 301"]
+
+
+def typo(word, rng):
+    i = rng.randrange(len(word) - 1)
+    kind = rng.choice(["delete", "transpose", "substitute", "double"])
+    if kind == "delete":
+        return word[:i] + word[i + 1:]
+    if kind == "transpose":
+        return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+    if kind == "substitute":
+        return word[:i] + rng.choice("aeiounrst") + word[i + 1:]
+    return word[:i] + word[i] + word[i:]
+
+
+def with_typo(query, rng):
+    words = query.split()
+    long_words = [i for i, w in enumerate(words) if w.isalpha() and len(w) >= 5]
+    if not long_words:
+        return None
+    i = rng.choice(long_words)
+    words[i] = typo(words[i], rng)
+    return " ".join(words)
+
+
+def replay_corpus(variants, rng):
+    """``[(query, kind)]`` with kind "clean" (seed / general as typed) or "noisy"."""
+    corpus = [(q, "clean") for q in SEEDS + GENERAL]
+    for q in SEEDS:
+        for _ in range(variants):
+            noisy = with_typo(q, rng)
+            if noisy and noisy != q:
+                corpus.append((noisy, "noisy"))
+    for code in CODE_VARIANTS:
+        corpus.append((f"syllabus of {code}", "noisy"))
+    return corpus
+
+
+def route(query):
+    """How /chat would answer ``query``: "no_llm", "resource" or "vector"."""
+    intent = detect_intent(query)
+    matches = find_all_scholarships(query)
+    if matches:
+        intent = "scholarship"
+    if intent in ("events", "placement") or (intent == "scholarship" and matches):
+        return "no_llm"
+    if RESOURCE_MAP.get(intent):
+        return "resource"
+    if intent == "subject" and _resolve_subject_file(query):
+        return "resource"
+    return "vector"
+
+
+def shares(routes):
+    n = max(len(routes), 1)
+    return {kind: round(sum(r == kind for r in routes) / n, 3) for kind in ("no_llm", "resource", "vector")}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Routing of replayed queries before / after normalization")
+    parser.add_argument("--queries", type=Path, help="file with one query per line (replaces the generated corpus)")
+    parser.add_argument("--variants", type=int, default=3, help="typo variants per seed question")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--show", type=int, default=10, help="rewritten queries to print")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    if args.queries:
+        lines = args.queries.read_text(encoding="utf-8").splitlines()
+        corpus = [(q.strip(), "replay") for q in lines if q.strip()]
+    else:
+        corpus = replay_corpus(args.variants, random.Random(args.seed))
+
+    texts = [doc["text"] for doc in load_index_documents(BASE_DIR)]
+    t0 = time.perf_counter()
+    normalizer = QueryNormalizer.from_texts(texts)
+    build_ms = (time.perf_counter() - t0) * 1000
+
+    rows, cold = [], []
+    for query, kind in corpus:
+        t0 = time.perf_counter()
+        normalized = normalizer.normalize(query)
+        cold.append((time.perf_counter() - t0) * 1e6)
+        rows.append({"query": query, "kind": kind, "normalized": normalized["query"],
+                     "before": route(query), "after": route(normalized["query"])})
+    warm = []
+    for query, _ in corpus:
+        t0 = time.perf_counter()
+        normalizer.normalize(query)
+        warm.append((time.perf_counter() - t0) * 1e6)
+
+    report = {"queries": len(rows), "vocabulary": len(normalizer.spelling), "build_ms": round(build_ms, 1),
+              "latency_us": {"first_p50": round(float(np.percentile(cold, 50)), 1),
+                             "first_p95": round(float(np.percentile(cold, 95)), 1),
+                             "cached_p50": round(float(np.percentile(warm, 50)), 1)},
+              "groups": {}}
+    for kind in sorted({r["kind"] for r in rows}):
+        group = [r for r in rows if r["kind"] == kind]
+        report["groups"][kind] = {
+            "queries": len(group),
+            "before": shares([r["before"] for r in group]),
+            "after": shares([r["after"] for r in group]),
+            "rewritten": sum(r["normalized"] != r["query"] for r in group),
+            "route_changed": sum(r["before"] != r["after"] for r in group),
+        }
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"queries={report['queries']} vocabulary={report['vocabulary']} words "
+          f"build={report['build_ms']}ms normalize p50={report['latency_us']['first_p50']}us "
+          f"p95={report['latency_us']['first_p95']}us cached p50={report['latency_us']['cached_p50']}us")
+    for kind, g in report["groups"].items():
+        print(f"{kind:>7}: n={g['queries']:<4} rewritten={g['rewritten']:<4} route changed={g['route_changed']}")
+        for label in ("before", "after"):
+            s = g[label]
+            print(f"         {label:>6}  no_llm={s['no_llm']:.3f}  resource={s['resource']:.3f}  vector={s['vector']:.3f}")
+    for r in [r for r in rows if r["normalized"] != r["query"]][:args.show]:
+        print(f"  {r['query']!r} -> {r['normalized']!r}  ({r['before']} -> {r['after']})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Answer cache hit ratio and LLM time saved on a replayed /chat workload.
+
+new_app is imported with GEMINI_API_URL pointed at the Gemini stub of
+bench_chat_stream (each answer takes ``--llm-ms``) and ANSWER_CACHE_PATH in
+a temporary directory. ``--requests`` questions are drawn Zipf-like from a
+campus question mix, with casing / punctuation / spacing variants of the
+same questions, and sent to /chat twice over: once with the cache off and
+once with it on. The report has the hit ratio, LLM seconds saved, mean
+latency of both runs and whether cached answers equal the generated ones.
+
+Two checks follow: a fresh AnswerCache on the same SQLite file serves the
+stored answers (restart), and rewriting a source file invalidates the
+answers built from it.
+
+Examples:
+    python scripts/report_answer_cache.py
+    python scripts/report_answer_cache.py --requests 400 --llm-ms 800 --similarity 0.92 --json
+"""
+from pathlib import Path
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_chat_stream import StubServer
+
+QUESTIONS = [
+    "holiday list", "who is the hod of cse", "exam rules", "syllabus of bscm301",
+    "library timing", "dress code policy", "what is the fee structure", "who is the chancellor",
+    "faculty working on machine learning", "how do i get a bonafide certificate",
+    "anti ragging helpline", "hostel rules", "what is the attendance requirement",
+    "module 3 of semiconductor physics", "when are the semester exams",
+]
+
+VARIANTS = [
+    lambda q: q,
+    lambda q: q.capitalize() + "?",
+    lambda q: q.upper(),
+    lambda q: "  " + q.replace(" ", "  ") + " ",
+    lambda q: q + "??",
+]
+
+
+def workload(n, seed):
+    """``n`` questions, question i drawn with weight 1 / (i + 1), in random variants."""
+    rng = random.Random(seed)
+    weights = [1 / (i + 1) for i in range(len(QUESTIONS))]
+    return [rng.choice(VARIANTS)(q) for q in rng.choices(QUESTIONS, weights=weights, k=n)]
+
+
+def replay(client, queries):
+    """Mean /chat latency (ms) and ``{normalized question: set of answers}``."""
+    from app.core.answer_cache import normalize_question
+    answers, total = {}, 0.0
+    for query in queries:
+        t0 = time.perf_counter()
+        body = client.post("/chat", json={"query": query}).get_json() or {}
+        total += time.perf_counter() - t0
+        answers.setdefault(normalize_question(query), set()).add(body.get("response"))
+    return round(total / len(queries) * 1000, 1), answers
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Answer cache hit ratio on a replayed /chat workload")
+    parser.add_argument("--requests", type=int, default=200, help="questions per run")
+    parser.add_argument("--llm-ms", type=float, default=600, help="stub generation time per answer")
+    parser.add_argument("--similarity", type=float, default=0.0, help="ANSWER_CACHE_SIMILARITY for the cached run")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    server = StubServer(args.llm_ms / 1000, 0.0, 1)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    tmp = tempfile.TemporaryDirectory()
+    os.environ["GEMINI_API_KEY"] = "stub"
+    os.environ["GEMINI_API_URL"] = f"http://127.0.0.1:{server.server_address[1]}/v1beta/models/stub:generateContent"
+    os.environ["ANSWER_CACHE_PATH"] = str(Path(tmp.name) / "answers.sqlite3")
+    os.environ["RESOURCE_CHECK_INTERVAL"] = "0"
+
+    import new_app
+    from app.core.answer_cache import AnswerCache
+    from app.core.prompt_builder import PROMPT_VERSION
+
+    client = new_app.app.test_client()
+    queries = workload(args.requests, args.seed)
+
+    cache = new_app.ANSWER_CACHE
+    new_app.ANSWER_CACHE = None
+    uncached_ms, generated = replay(client, queries)
+
+    cache.similarity = args.similarity
+    new_app.ANSWER_CACHE = cache
+    cached_ms, served = replay(client, queries)
+    stats = cache.stats()
+    consistent = all(len(served[q]) == 1 for q in served)
+
+    # restart: a new cache on the same file serves what the first one stored
+    restarted = AnswerCache(path=os.environ["ANSWER_CACHE_PATH"])
+    warmed = restarted.warm()
+    with new_app.app.test_request_context("/chat", method="POST", json={"query": "holiday list"}):
+        prepared = new_app.prepare_chat()
+    survived = restarted.get(prepared["intent"], prepared["query"], prepared["context"], PROMPT_VERSION) is not None
+
+    # invalidation: an answer built from a file that then changes is dropped
+    source = Path(tmp.name) / "holidays.json"
+    source.write_text(json.dumps({"holidays": [{"date": "2026-01-26", "name": "Republic Day"}]}))
+    restarted.put("holiday", "holiday list", "ctx", PROMPT_VERSION, "Republic Day", 0.5, [source])
+    before_change = restarted.get("holiday", "holiday list", "ctx", PROMPT_VERSION) is not None
+    source.write_text(json.dumps({"holidays": [{"date": "2026-08-15", "name": "Independence Day"}]}))
+    after_change = restarted.get("holiday", "holiday list", "ctx", PROMPT_VERSION) is not None
+
+    report = {
+        "requests": args.requests,
+        "distinct_questions": len(set(queries)),
+        "llm_ms": args.llm_ms,
+        "similarity": args.similarity,
+        "hit_ratio": stats["hit_ratio"],
+        "llm_calls": {"uncached": args.requests, "cached": stats["misses"]},
+        "llm_seconds_saved": stats["saved_seconds"],
+        "mean_ms": {"uncached": uncached_ms, "cached": cached_ms},
+        "consistent_answers": consistent,
+        "same_answers_as_uncached": all(served[q] <= generated[q] for q in served),
+        "restart": {"warmed": warmed, "hit_after_restart": survived},
+        "invalidation": {"hit_before_change": before_change, "hit_after_change": after_change},
+        "stats": stats,
+    }
+    server.shutdown()
+    tmp.cleanup()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"{args.requests} questions ({report['distinct_questions']} distinct strings, "
+          f"{len(QUESTIONS)} questions), stub LLM {args.llm_ms}ms, similarity {args.similarity}")
+    print(f"hit ratio {stats['hit_ratio']:.1%} ({stats['hits']} hits: {stats['similar_hits']} near-duplicate); "
+          f"LLM calls {args.requests} -> {stats['misses']}; LLM time saved {stats['saved_seconds']}s")
+    print(f"mean /chat latency: {uncached_ms}ms uncached -> {cached_ms}ms cached")
+    print(f"one answer per question: {'yes' if consistent else 'NO'}; "
+          f"cached answers match generated ones: {'yes' if report['same_answers_as_uncached'] else 'NO'}")
+    print(f"restart: {warmed} answers warmed, hit after restart: {'yes' if survived else 'NO'}")
+    print(f"source file changed: hit before {'yes' if before_change else 'NO'}, "
+          f"after {'NO (invalidated)' if not after_change else 'yes - STALE'}")
+
+
+if __name__ == "__main__":
+    main()
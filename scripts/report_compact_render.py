@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Token savings of the compact renderer, and a regression check of the
+context it sends for the fixed test queries.
+
+1. Corpus: every JSON document of the index corpus and of Resources/json
+   is rendered readable and compact; estimated tokens are reported per
+   document and in total.
+2. Regression: the fixed queries (test_fixed_system.py plus one per
+   intent) are retrieved once per mode, each mode in its own process
+   with RENDER_MODE set as in production. Every value of the readable
+   context must still appear in the compact one (labels, rules and
+   placeholder values like "Not specified" may go). With ``--ask`` (needs
+   GEMINI_API_KEY) both prompts are also sent to Gemini and the answers
+   compared.
+
+Examples:
+    python scripts/report_compact_render.py
+    python scripts/report_compact_render.py --top 20 --json
+    python scripts/report_compact_render.py --ask
+"""
+from pathlib import Path
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+# test_fixed_system.py's queries first
+FIXED_QUERIES = [
+    "Who is our HOD?",
+    "Who is Dr. Shivnath Ghosh?",
+    "Tell me about scholarships",
+    "What are the holidays?",
+    "holiday list",
+    "faculty working on vlsi",
+    "exam schedule",
+    "library timing",
+    "dress code policy",
+    "who is the chancellor",
+    "syllabus of pcc-csm501",
+    "what is the fee structure",
+]
+
+_WORDS = re.compile(r"[a-z0-9]+")
+
+
+def dump_contexts(queries, mode):
+    """Contexts (and prompts) for ``queries`` in this process's RENDER_MODE."""
+    from app.core.context_packer import pack_context
+    from app.core.intent import detect_intent
+    from app.core.prompt_builder import build_prompt
+    from app.core.retriever import retrieve
+    from app.vectorstore.admin_content import load_index_documents
+    from app.vectorstore.index import VectorIndex
+
+    docs = load_index_documents(BASE_DIR)
+    index = VectorIndex()
+    index.build(docs)
+    fallback = [d["text"] for d in docs]
+    out = []
+    for query in queries:
+        intent = detect_intent(query)
+        hits = retrieve(query=query, intent=intent, vector_index=index, fallback_docs=fallback, with_scores=True)
+        items = [text for text, _ in hits]
+        # all retrieved items, not the packed ones: a smaller rendering may
+        # let the packer fit more, which is not a regression
+        context = "\n\n".join(items)
+        packed = pack_context(items, intent, scores=[score for _, score in hits])
+        out.append({"query": query, "intent": intent, "context": context,
+                    "prompt": build_prompt(query, packed["context"])})
+    return out
+
+
+def contexts(mode, queries):
+    env = dict(os.environ, RENDER_MODE=mode)
+    result = subprocess.run([sys.executable, __file__, "--dump", mode, "--queries-json", json.dumps(queries)],
+                            capture_output=True, text=True, env=env, cwd=str(BASE_DIR))
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr[-2000:])
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def _norm(text):
+    return " ".join(_WORDS.findall(text.lower()))
+
+
+def missing_values(readable, compact):
+    """Values of the readable context with words the compact one does not contain.
+
+    Compared word by word: the compact layout reorders record fields into
+    rows, and the readable one prints nested lists as Python reprs.
+    """
+    from app.core.document_parser import is_empty_value
+    present = set(_WORDS.findall(compact.lower()))
+    missing = []
+    for line in readable.splitlines():
+        value = line.split(":", 1)[1] if ":" in line else line
+        value = value.strip()
+        if not value or is_empty_value(value):
+            continue
+        lost = [w for w in _WORDS.findall(value.lower()) if w not in present]
+        if lost:
+            missing.append(f"{value[:80]} (lost: {' '.join(lost[:8])})")
+    return missing
+
+
+def corpus_report(top):
+    from app.core.context_packer import estimate_tokens
+    from app.core.document_parser import render_data
+    from app.vectorstore.admin_content import load_index_documents
+
+    texts = {}
+    for doc in load_index_documents(BASE_DIR):
+        texts[doc.get("source") or doc.get("id") or str(len(texts))] = doc["text"]
+    for path in sorted((BASE_DIR / "Resources" / "json").glob("*.json")):
+        texts.setdefault(f"Resources/json/{path.name}", path.read_text(encoding="utf-8"))
+
+    rows = []
+    for name, text in texts.items():
+        try:
+            data = json.loads(text)
+        except ValueError:
+            continue
+        readable = estimate_tokens(render_data(data, "readable"))
+        compact = estimate_tokens(render_data(data, "compact"))
+        rows.append({"document": str(name), "readable": readable, "compact": compact})
+    rows.sort(key=lambda r: r["compact"] - r["readable"])
+    total_r = sum(r["readable"] for r in rows)
+    total_c = sum(r["compact"] for r in rows)
+    return {"documents": len(rows), "readable_tokens": total_r, "compact_tokens": total_c,
+            "saved": round(1 - total_c / total_r, 3) if total_r else 0,
+            "largest_savings": rows[:top], "grew": [r for r in rows if r["compact"] > r["readable"]]}
+
+
+def ask_both(readable_rows, compact_rows):
+    from app.llm.gemini_client import GEMINI_API_KEY, GeminiError, ask_gemini
+    if not GEMINI_API_KEY:
+        return None
+    answers = []
+    for r, c in zip(readable_rows, compact_rows):
+        try:
+            a, b = ask_gemini(r["prompt"]), ask_gemini(c["prompt"])
+        except GeminiError as e:
+            print(f"[WARNING] Skipping {r['query']!r}: {e}")
+            continue
+        answers.append({"query": r["query"], "identical": a == b, "same_text": _norm(a) == _norm(b)})
+    return answers
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compact vs readable rendering: tokens and regression")
+    parser.add_argument("--top", type=int, default=10, help="documents with the largest savings to list")
+    parser.add_argument("--ask", action="store_true", help="also compare Gemini answers for both modes")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    parser.add_argument("--dump", help=argparse.SUPPRESS)
+    parser.add_argument("--queries-json", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.dump:
+        rows = dump_contexts(json.loads(args.queries_json), args.dump)
+        print(json.dumps(rows, ensure_ascii=False))
+        return
+
+    corpus = corpus_report(args.top)
+    readable_rows = contexts("readable", FIXED_QUERIES)
+    compact_rows = contexts("compact", FIXED_QUERIES)
+
+    from app.core.context_packer import estimate_tokens
+    regression = []
+    for r, c in zip(readable_rows, compact_rows):
+        regression.append({
+            "query": r["query"], "intent": r["intent"],
+            "same_intent": r["intent"] == c["intent"],
+            "readable_tokens": estimate_tokens(r["context"]), "compact_tokens": estimate_tokens(c["context"]),
+            "missing": missing_values(r["context"], c["context"]),
+        })
+    failures = [g for g in regression if g["missing"] or not g["same_intent"]]
+    answers = ask_both(readable_rows, compact_rows) if args.ask else None
+
+    report = {"corpus": corpus, "regression": regression, "regression_failures": len(failures),
+              "answers": answers}
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+        sys.exit(1 if failures else 0)
+
+    print(f"corpus: {corpus['documents']} documents, readable {corpus['readable_tokens']} tokens -> "
+          f"compact {corpus['compact_tokens']} tokens ({corpus['saved']:.1%} saved)")
+    for r in corpus["largest_savings"]:
+        print(f"  {r['readable']:>6} -> {r['compact']:>6}  {r['document']}")
+    if corpus["grew"]:
+        print(f"  {len(corpus['grew'])} documents grew, e.g. {corpus['grew'][-1]['document']}")
+    print(f"regression ({len(regression)} fixed queries): {len(failures)} failures")
+    for g in regression:
+        status = "ok" if not g["missing"] and g["same_intent"] else "FAIL"
+        print(f"  {status:4} {g['intent']:>8} {g['readable_tokens']:>6} -> {g['compact_tokens']:>6}  {g['query']}")
+        for value in g["missing"][:5]:
+            print(f"         missing: {value[:100]!r}")
+    if args.ask:
+        if answers is None:
+            print("answers: skipped (GEMINI_API_KEY not set)")
+        else:
+            same = sum(a["same_text"] for a in answers)
+            print(f"answers: {same}/{len(answers)} the same (whitespace / punctuation aside)")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
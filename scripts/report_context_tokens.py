@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Prompt sizes with the old "first 3 items" join vs the token-budgeted packer.
+
+Each query is routed and retrieved the way /chat does it, then the context
+is built both ways and wrapped in the real prompt template. The report
+shows estimated context / prompt tokens per intent and what that costs at
+the prices in Resources/json/gemini_2_5_flash_costs.json.
+
+The pricing table is checked two ways: estimate_cost must reproduce the
+table's own input costs, and the table's assumed input tokens per query is
+set against the measured prompt size. With ``--count-api`` (needs
+GEMINI_API_KEY / GEMINI_API_URL) the character-based estimate is compared
+with Gemini's countTokens for every prompt.
+
+Examples:
+    python scripts/report_context_tokens.py
+    python scripts/report_context_tokens.py --queries chat_log.txt --json
+    python scripts/report_context_tokens.py --count-api
+"""
+from pathlib import Path
+import argparse
+import json
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.context_packer import estimate_cost, estimate_tokens, load_pricing, pack_context
+from app.core.intent import detect_intent
+from app.core.prompt_builder import build_prompt
+from app.core.retriever import retrieve
+from app.vectorstore.admin_content import load_index_documents
+from app.vectorstore.index import VectorIndex
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+QUERIES = [
+    "hod of cse", "who is dr. shivnath ghosh", "faculty working on machine learning",
+    "syllabus of bscm301", "what is in module 3 of semiconductor physics", "operating systems unit 4",
+    "holiday list", "exam rules", "minimum attendance required", "library timing",
+    "dress code policy", "is smoking allowed on campus", "who is the chancellor", "campus address",
+    "hostel rules", "what is the fee structure", "how do i get a bonafide certificate",
+    "what is the admission process", "is there a bus from howrah", "how many credits in a semester",
+]
+
+
+def count_api_tokens(prompt):
+    """Gemini countTokens for ``prompt`` (None when the API is not configured)."""
+    import requests
+    from app.llm.gemini_client import GEMINI_API_KEY, GEMINI_URL
+    if not GEMINI_API_KEY or not GEMINI_URL or ":generateContent" not in GEMINI_URL:
+        return None
+    url = GEMINI_URL.replace(":generateContent", ":countTokens")
+    r = requests.post(f"{url}?key={GEMINI_API_KEY}", json={"contents": [{"parts": [{"text": prompt}]}]},
+                      timeout=30)
+    if r.status_code != 200:
+        print(f"[WARNING] countTokens failed ({r.status_code}): {r.text[:200]}")
+        return None
+    return r.json().get("totalTokens")
+
+
+def mean(values):
+    return round(sum(values) / len(values), 1) if values else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Context / prompt token report, first-3 join vs packer")
+    parser.add_argument("--queries", type=Path, help="file with one query per line")
+    parser.add_argument("--count-api", action="store_true", help="compare estimates with Gemini countTokens")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    queries = QUERIES
+    if args.queries:
+        queries = [q.strip() for q in args.queries.read_text(encoding="utf-8").splitlines() if q.strip()]
+
+    docs = load_index_documents(BASE_DIR)
+    index = VectorIndex()
+    index.build(docs)
+    fallback = [d["text"] for d in docs]
+
+    rows = []
+    for query in queries:
+        intent = detect_intent(query)
+        hits = retrieve(query=query, intent=intent, vector_index=index, fallback_docs=fallback, with_scores=True)
+        items = [text for text, _ in hits]
+        old_context = "\n\n".join(str(item) for item in items[:3])
+        packed = pack_context(items, intent, scores=[score for _, score in hits])
+        old_prompt = build_prompt(query, old_context)
+        new_prompt = build_prompt(query, packed["context"])
+        row = {
+            "query": query, "intent": intent, "passages": len(items),
+            "old_context": estimate_tokens(old_context), "new_context": packed["tokens"],
+            "budget": packed["budget"], "packed": len(packed["items"]),
+            "truncated": packed["truncated"], "dropped": packed["dropped"],
+            "duplicates": packed["duplicates"],
+            "old_prompt": estimate_tokens(old_prompt), "new_prompt": estimate_tokens(new_prompt),
+        }
+        if args.count_api:
+            row["new_prompt_api"] = count_api_tokens(new_prompt)
+        rows.append(row)
+
+    per_intent = {}
+    for intent in sorted({r["intent"] for r in rows}):
+        group = [r for r in rows if r["intent"] == intent]
+        per_intent[intent] = {
+            "queries": len(group), "budget": group[0]["budget"],
+            "old_context": mean([r["old_context"] for r in group]),
+            "new_context": mean([r["new_context"] for r in group]),
+            "max_old_context": max(r["old_context"] for r in group),
+            "max_new_context": max(r["new_context"] for r in group),
+            "passages": mean([r["passages"] for r in group]),
+            "packed": mean([r["packed"] for r in group]),
+        }
+
+    pricing = load_pricing()
+    table = pricing["table"]
+    # estimate_cost must agree with the table's own arithmetic
+    table_errors = []
+    for volume, sizes in table.get("results", {}).items():
+        for size, row in sizes.items():
+            ours = estimate_cost(row["monthly_input_tokens"], row["monthly_output_tokens"])
+            if abs(ours - row["cost_total_usd"]) > 1e-6:
+                table_errors.append({"daily_queries": volume, "size": size,
+                                     "table": row["cost_total_usd"], "estimate": round(ours, 6)})
+    assumed = table.get("input_tokens_per_query")
+    measured_old = mean([r["old_prompt"] for r in rows])
+    measured_new = mean([r["new_prompt"] for r in rows])
+    days = table.get("days_per_month", 30)
+    monthly = [{
+        "daily_queries": volume,
+        "table_input_usd": round(estimate_cost(assumed * volume * days), 2) if assumed else None,
+        "old_input_usd": round(estimate_cost(measured_old * volume * days), 2),
+        "new_input_usd": round(estimate_cost(measured_new * volume * days), 2),
+    } for volume in table.get("daily_query_volumes", [])]
+
+    report = {
+        "queries": len(rows), "per_intent": per_intent,
+        "prompt_tokens": {"table_assumption": assumed, "old": measured_old, "new": measured_new},
+        "pricing": {"model": pricing["model"], "input_usd_per_1m": pricing["input_usd"],
+                    "output_usd_per_1m": pricing["output_usd"], "table_mismatches": table_errors},
+        "monthly_input_cost": monthly,
+    }
+    if args.count_api:
+        pairs = [(r["new_prompt"], r["new_prompt_api"]) for r in rows if r.get("new_prompt_api")]
+        report["count_api"] = {
+            "prompts": len(pairs),
+            "estimate_over_actual": round(sum(e for e, _ in pairs) / sum(a for _, a in pairs), 3) if pairs else None,
+        }
+
+    if args.json:
+        report["rows"] = rows
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"queries={len(rows)}  estimated context tokens (mean / max), first-3 join vs packer")
+    print(f"{'intent':>9} {'n':>3} {'budget':>6} {'old':>8} {'new':>8} {'old max':>8} {'new max':>8} {'passages':>8} {'packed':>7}")
+    for intent, g in per_intent.items():
+        print(f"{intent:>9} {g['queries']:>3} {g['budget']:>6} {g['old_context']:>8} {g['new_context']:>8} "
+              f"{g['max_old_context']:>8} {g['max_new_context']:>8} {g['passages']:>8} {g['packed']:>7}")
+    print(f"prompt tokens per query: table assumes {assumed}, measured old={measured_old} new={measured_new} "
+          f"(prompt template alone ~{estimate_tokens(build_prompt('', ''))})")
+    print(f"pricing {pricing['model']}: ${pricing['input_usd']}/1M in, ${pricing['output_usd']}/1M out; "
+          f"table rows reproduced: {'all' if not table_errors else f'{len(table_errors)} mismatches'}")
+    for m in monthly:
+        print(f"  {m['daily_queries']:>6}/day  monthly input: table ${m['table_input_usd']}  "
+              f"old ${m['old_input_usd']}  new ${m['new_input_usd']}")
+    if args.count_api:
+        c = report["count_api"]
+        print(f"countTokens: {c['prompts']} prompts, estimate/actual = {c['estimate_over_actual']}")
+
+
+if __name__ == "__main__":
+    main()
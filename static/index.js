@@ -1077,16 +1077,8 @@
         // Show typing indicator
         showTypingIndicator();
 
-        // Call the chat API (include credentials so session cookie is sent)
-        fetch("/chat", {
-          method: "POST",
-          credentials: 'same-origin',
-          headers: {
-            "Content-Type": "application/json",
-          },
-          body: JSON.stringify({ query: userInput }),
-        })
-          .then((response) => response.json())
+        // Stream the answer (falls back to plain /chat where streams are unsupported)
+        streamChat(userInput)
           .then((data) => {
             hideTypingIndicator();
             
@@ -1095,47 +1087,7 @@
             console.log("Has scholarship link:", data.has_scholarship_link);
             console.log("Needs disambiguation:", data.needs_disambiguation);
             
-            if (data.response) {
-              // Check if disambiguation is needed
-              if (data.needs_disambiguation && data.options) {
-                console.log("Showing disambiguation options");
-                addDisambiguationMessage(data.response, data.options);
-              }
-              // Check if this is a scholarship response with link
-              else if (data.has_scholarship_link && data.scholarship_slug) {
-                console.log("Calling addMessageWithScholarshipLink");
-                addMessageWithScholarshipLink(
-                  data.response,
-                  data.scholarship_slug,
-                  data.scholarship_name,
-                  data.scholarship_url
-                );
-              }
-              // Fallback: detect scholarship link text and render rich card
-              else {
-                const fallback = extractScholarshipFromText(data.response);
-                if (fallback.slug) {
-                  console.log("Detected scholarship link in text, upgrading to card");
-                  addMessageWithScholarshipLink(
-                    data.response,
-                    fallback.slug,
-                    data.scholarship_name || fallback.name || "Scholarship",
-                    data.scholarship_url || `/scholarship?highlight=${fallback.slug}`
-                  );
-                } else {
-                  console.log("Calling regular addMessage");
-                  const parsed = parseResponseForSuggestions(data.response);
-                  addMessage(parsed.main || data.response, "bot");
-                  if (parsed.suggestions.length) {
-                    addSuggestionBubble(parsed.suggestions);
-                  }
-                }
-              }
-            } else if (data.error) {
-              addMessage("Sorry, I encountered an error: " + data.error, "bot");
-            } else {
-              addMessage("Sorry, I could not process your request.", "bot");
-            }
+            renderChatResponse(data);
           })
           .catch((error) => {
             hideTypingIndicator();
@@ -1147,6 +1099,167 @@
           });
       }
 
+      function postChat(query) {
+        // Call the chat API (include credentials so session cookie is sent)
+        return fetch("/chat", {
+          method: "POST",
+          credentials: 'same-origin',
+          headers: {
+            "Content-Type": "application/json",
+          },
+          body: JSON.stringify({ query: query }),
+        }).then((response) => response.json());
+      }
+
+      // /chat/stream sends Server-Sent Events: "meta" first (intent and
+      // scholarship fields), "delta" pieces of the answer, then "done" (or
+      // "error"). LLM answers are shown as they arrive; the finished answer
+      // is rendered like a /chat response.
+      // Decided before sending: once /chat/stream is posted the answer is
+      // being generated, so it must not be asked for again over /chat.
+      const canStream = !!(window.ReadableStream && window.TextDecoder &&
+        window.Response && "body" in Response.prototype);
+
+      async function streamChat(query) {
+        if (!canStream) {
+          return postChat(query);
+        }
+        const response = await fetch("/chat/stream", {
+          method: "POST",
+          credentials: 'same-origin',
+          headers: {
+            "Content-Type": "application/json",
+            "Accept": "text/event-stream",
+          },
+          body: JSON.stringify({ query: query }),
+        });
+        if (!(response.headers.get("Content-Type") || "").startsWith("text/event-stream")) {
+          return response.json();
+        }
+
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        const chatlog = document.getElementById("chatlog");
+        let buffer = "";
+        let text = "";
+        let data = {};
+        let bubble = null;
+
+        while (true) {
+          const { value, done } = await reader.read();
+          if (done) break;
+          buffer += decoder.decode(value, { stream: true });
+
+          let end;
+          while ((end = buffer.indexOf("\n\n")) !== -1) {
+            const event = parseSseEvent(buffer.slice(0, end));
+            buffer = buffer.slice(end + 2);
+            if (!event) continue;
+
+            if (event.name === "meta") {
+              data = Object.assign(data, event.data);
+            } else if (event.name === "delta") {
+              text += event.data.text;
+              if (data.streaming) {
+                if (!bubble) {
+                  hideTypingIndicator();
+                  bubble = addStreamingMessage();
+                }
+                bubble.querySelector(".message-content").textContent = text;
+                chatlog.scrollTop = chatlog.scrollHeight;
+              }
+            } else if (event.name === "error") {
+              data.error = event.data.error;
+              text = event.data.response;
+            } else if (event.name === "done") {
+              console.log("Time to first token:", event.data.ttft_ms, "ms, total:", event.data.total_ms, "ms");
+            }
+          }
+        }
+
+        if (bubble) bubble.remove();
+        data.response = text;
+        return data;
+      }
+
+      function parseSseEvent(raw) {
+        let name = "message";
+        const lines = [];
+        raw.split("\n").forEach((line) => {
+          if (line.startsWith("event:")) name = line.slice(6).trim();
+          else if (line.startsWith("data:")) lines.push(line.slice(5).trim());
+        });
+        if (!lines.length) return null;
+        try {
+          return { name: name, data: JSON.parse(lines.join("\n")) };
+        } catch (e) {
+          console.warn("Bad stream event:", raw);
+          return null;
+        }
+      }
+
+      // Bot bubble filled in while an answer streams; replaced by the
+      // regular rendering once it is complete
+      function addStreamingMessage() {
+        const chatlog = document.getElementById("chatlog");
+        const messageDiv = document.createElement("div");
+        messageDiv.className = "message bot";
+        messageDiv.innerHTML = `
+          <div class="message-avatar">
+            <img src="/logo/Brainware_University.jpg" alt="Bot">
+          </div>
+          <div class="message-bubble">
+            <div class="message-content" style="white-space: pre-wrap;"></div>
+          </div>
+        `;
+        chatlog.appendChild(messageDiv);
+        return messageDiv;
+      }
+
+      function renderChatResponse(data) {
+        if (data.response) {
+          // Check if disambiguation is needed
+          if (data.needs_disambiguation && data.options) {
+            console.log("Showing disambiguation options");
+            addDisambiguationMessage(data.response, data.options);
+          }
+          // Check if this is a scholarship response with link
+          else if (data.has_scholarship_link && data.scholarship_slug) {
+            console.log("Calling addMessageWithScholarshipLink");
+            addMessageWithScholarshipLink(
+              data.response,
+              data.scholarship_slug,
+              data.scholarship_name,
+              data.scholarship_url
+            );
+          }
+          // Fallback: detect scholarship link text and render rich card
+          else {
+            const fallback = extractScholarshipFromText(data.response);
+            if (fallback.slug) {
+              console.log("Detected scholarship link in text, upgrading to card");
+              addMessageWithScholarshipLink(
+                data.response,
+                fallback.slug,
+                data.scholarship_name || fallback.name || "Scholarship",
+                data.scholarship_url || `/scholarship?highlight=${fallback.slug}`
+              );
+            } else {
+              console.log("Calling regular addMessage");
+              const parsed = parseResponseForSuggestions(data.response);
+              addMessage(parsed.main || data.response, "bot");
+              if (parsed.suggestions.length) {
+                addSuggestionBubble(parsed.suggestions);
+              }
+            }
+          }
+        } else if (data.error) {
+          addMessage("Sorry, I encountered an error: " + data.error, "bot");
+        } else {
+          addMessage("Sorry, I could not process your request.", "bot");
+        }
+      }
+
       function parseResponseForSuggestions(text) {
   const markers = [/would you like to know more about:?/i];
 
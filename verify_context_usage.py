@@ -9,7 +9,7 @@ from app.core.intent import detect_intent
 from app.core.retriever import retrieve
 from app.core.prompt_builder import build_prompt
 from app.vectorstore.index import VectorIndex
-from app.llm.gemini_client import ask_gemini
+from app.llm.gemini_client import ask_gemini, GeminiError
 from new_app import ALL_DOCS, VECTOR_INDEX
 import json
 
@@ -69,7 +69,10 @@ print(prompt[prompt.find("CONTEXT:"):prompt.find("CONTEXT:")+500] if "CONTEXT:"
 # Ask AI
 print("\n[STEP 6] Sending to Gemini AI...")
 print("-"*80)
-answer = ask_gemini(prompt)
+try:
+    answer = ask_gemini(prompt)
+except GeminiError as e:
+    answer = f"{type(e).__name__}: {e}"
 print("AI Response:")
 print("="*80)
 print(answer)